@@ -7,7 +7,7 @@ import sys
 
 import click
 
-from connect.cli.core.base import cli
+from connect.cli.core.base import cli, get_config_dir
 from connect.cli.core.constants import CAIRO_NOT_FOUND_ERROR
 from connect.cli.core.plugins import load_plugins
 
@@ -23,7 +23,7 @@ def main():
         pass
     print('')
     try:
-        load_plugins(cli)
+        load_plugins(cli, cache_dir=get_config_dir(sys.argv[1:]))
         cli(prog_name='ccli', standalone_mode=False)
     except OSError as oe:
         if 'no library called "cairo" was found' in str(oe):
@@ -4,9 +4,9 @@
 # Copyright (c) 2025 CloudBlue. All rights reserved.
 
 import click
-from connect.client import ClientError, ConnectClient
+from connect.client import ClientError
 
-from connect.cli.core.http import RequestLogger
+from connect.cli.core.http import ConnectClient, RequestLogger
 
 
 def add_account(config, api_key, endpoint):
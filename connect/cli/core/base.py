@@ -5,6 +5,7 @@ import click
 from connect.cli import get_version
 from connect.cli.core.account.commands import grp_account
 from connect.cli.core.config import pass_config
+from connect.cli.core.constants import DEFAULT_CONFIG_DIR
 from connect.cli.core.terminal import console
 from connect.cli.core.utils import check_for_updates
 
@@ -46,11 +47,67 @@ class CCliGroup(click.Group):
         return decorator
 
 
+class LazyGroup(click.Group):
+    """
+    Group that knows the name and short help of some of its subcommands
+    in advance and imports them only when they are actually resolved.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = {}
+
+    def add_lazy_command(self, name, loader, short_help=None):
+        self.commands.pop(name, None)
+        self.lazy_commands[name] = (loader, short_help)
+
+    def list_commands(self, ctx):
+        return sorted({*self.commands, *self.lazy_commands})
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            loader, _ = self.lazy_commands.pop(cmd_name)
+            self.add_command(loader(), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        commands = []
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                cmd = self.commands[name]
+                if not cmd.hidden:
+                    commands.append((name, cmd.get_short_help_str))
+            else:
+                _, short_help = self.lazy_commands[name]
+                commands.append(
+                    (name, click.Command(name, short_help=short_help).get_short_help_str),
+                )
+
+        if not commands:
+            return
+
+        limit = formatter.width - 6 - max(len(name) for name, _ in commands)
+        with formatter.section('Commands'):
+            formatter.write_dl([(name, short_help(limit)) for name, short_help in commands])
+
+
 def group(name=None, **attrs):
     attrs.setdefault('cls', CCliGroup)
     return click.command(name, **attrs)
 
 
+def get_config_dir(args):
+    """
+    Return the config directory set by the command line `args`, parsing just the
+    options of the root command, without running it.
+    """
+    try:
+        with cli.make_context('ccli', list(args), resilient_parsing=True) as ctx:
+            return ctx.params['config_dir']
+    except click.ClickException:
+        return DEFAULT_CONFIG_DIR
+
+
 def print_version(ctx, param, value):
     if not value or ctx.resilient_parsing:
         return
@@ -59,7 +116,7 @@ def print_version(ctx, param, value):
     ctx.exit()
 
 
-@click.group(context_settings={'help_option_names': ['-h', '--help']})
+@click.group(cls=LazyGroup, context_settings={'help_option_names': ['-h', '--help']})
 @click.option(
     '--version',
     is_flag=True,
@@ -70,7 +127,7 @@ def print_version(ctx, param, value):
 @click.option(
     '-c',
     '--config-dir',
-    default=os.path.join(os.path.expanduser('~'), '.ccli'),
+    default=DEFAULT_CONFIG_DIR,
     type=click.Path(file_okay=False),
     help='set the config directory.',
 )
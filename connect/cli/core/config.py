@@ -5,13 +5,13 @@
 
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
 from click import ClickException, make_pass_decorator
-from connect.client import ConnectClient
 
 from connect.cli.core.constants import DEFAULT_ENDPOINT
-from connect.cli.core.http import RequestLogger
+from connect.cli.core.http import ConnectClient, RequestLogger
 
 
 @dataclass
@@ -20,7 +20,27 @@ class Account:
     name: str
     api_key: str
     endpoint: str
-    client: ConnectClient
+    _client: Optional[ConnectClient] = field(default=None, repr=False, compare=False)
+
+    @property
+    def client(self):
+        """
+        The client is built the first time it is needed, since most commands
+        only use the client of the active account.
+        """
+        if self._client is None:
+            self._client = ConnectClient(
+                self.api_key,
+                endpoint=self.endpoint,
+                use_specs=False,
+                max_retries=3,
+                logger=RequestLogger(),
+            )
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
 
     def is_vendor(self):
         return self.id.startswith('VA-')
@@ -36,14 +56,7 @@ class Config(object):
         self._accounts = {}
 
     def add_account(self, id, name, api_key, endpoint=DEFAULT_ENDPOINT):
-        client = ConnectClient(
-            api_key,
-            endpoint=endpoint,
-            use_specs=False,
-            max_retries=3,
-            logger=RequestLogger(),
-        )
-        self._accounts[id] = Account(id, name, api_key, endpoint, client)
+        self._accounts[id] = Account(id, name, api_key, endpoint)
         if not self._active:
             self._active = self._accounts[id]
 
@@ -55,6 +68,10 @@ class Config(object):
     def accounts(self):
         return self._accounts
 
+    @property
+    def config_dir(self):
+        return os.path.dirname(self._config_path) if self._config_path else None
+
     def activate(self, id):
         account = self._accounts.get(id)
         if account:
@@ -86,16 +103,7 @@ class Config(object):
             data = json.load(f)
             active_account_id = data['active']
             for account_data in data['accounts']:
-                account = Account(
-                    **account_data,
-                    client=ConnectClient(
-                        account_data['api_key'],
-                        endpoint=account_data['endpoint'],
-                        use_specs=False,
-                        max_retries=3,
-                        logger=RequestLogger(),
-                    ),
-                )
+                account = Account(**account_data)
                 self._accounts[account.id] = account
                 if account.id == active_account_id:
                     self._active = account
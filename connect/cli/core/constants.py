@@ -3,11 +3,22 @@
 # This file is part of the CloudBlue Connect connect-cli.
 # Copyright (c) 2025 CloudBlue. All rights reserved.
 
+import os
+
+
 DEFAULT_ENDPOINT = 'https://api.connect.cloudblue.com/public/v1'
 
+DEFAULT_CONFIG_DIR = os.path.join(os.path.expanduser('~'), '.ccli')
+
 CAIRO_NOT_FOUND_ERROR = """Connect CLI depends on Cairo which is not present on the system.
 If so, please follow the instructions to install it at https://github.com/cloudblue/connect-cli
 and make sure your PATH environment variable includes also the Cairo shared libraries folder.
 """
 
 PYPI_JSON_API_URL = 'https://pypi.org/pypi/connect-cli/json'
+
+DEFAULT_HTTP_POOL_SIZE = 10
+
+PLUGINS_ENTRYPOINT_GROUP = 'connect.cli.plugins'
+
+PLUGINS_CACHE_FILE = 'plugins.json'
@@ -1,14 +1,28 @@
 import os
 import platform
+import threading
 from http import HTTPStatus
+from urllib.parse import urlparse
 
 import click
-from connect.client import ClientError, RequestLogger as _RequestLogger
+import requests
+from connect.client import (
+    ClientError,
+    ConnectClient as _ConnectClient,
+    RequestLogger as _RequestLogger,
+)
+from requests.adapters import HTTPAdapter
 
 from connect.cli import get_version
+from connect.cli.core.constants import DEFAULT_HTTP_POOL_SIZE
 from connect.cli.core.terminal import console
 
 
+_TRANSPORTS = {}
+_TRANSPORTS_LOCK = threading.Lock()
+_SESSIONS = threading.local()
+
+
 def get_user_agent():
     version = get_version()
     pimpl = platform.python_implementation()
@@ -40,8 +54,72 @@ def handle_http_error(res: ClientError):
 
 
 class RequestLogger(_RequestLogger):
+    _devnull = None
+
     def __init__(self):
         if not console.verbose or console.silent:
-            super().__init__(file=open(os.devnull, 'w'))
+            if RequestLogger._devnull is None:
+                RequestLogger._devnull = open(os.devnull, 'w')
+            super().__init__(file=RequestLogger._devnull)
         else:
             super().__init__(file=None)
+
+
+def get_pool_size():
+    """
+    Max number of connections kept alive per host, configurable
+    through the CCLI_HTTP_POOL_SIZE environment variable.
+    """
+    try:
+        return max(1, int(os.environ.get('CCLI_HTTP_POOL_SIZE', DEFAULT_HTTP_POOL_SIZE)))
+    except ValueError:
+        return DEFAULT_HTTP_POOL_SIZE
+
+
+def _get_origin(url):
+    parsed = urlparse(url)
+    return f'{parsed.scheme}://{parsed.netloc}'
+
+
+def get_transport(url):
+    """
+    Return the process-wide transport (and so the connection pool) for the
+    origin of the given url.
+    """
+    origin = _get_origin(url)
+    with _TRANSPORTS_LOCK:
+        transport = _TRANSPORTS.get(origin)
+        if not transport:
+            pool_size = get_pool_size()
+            transport = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _TRANSPORTS[origin] = transport
+    return transport
+
+
+def get_session(url):
+    """
+    Return a session, local to the current thread, that reuses the
+    process-wide transport of the given url for plain HTTP calls.
+    """
+    if not hasattr(_SESSIONS, 'session'):
+        _SESSIONS.session = requests.Session()
+    origin = _get_origin(url)
+    if origin not in _SESSIONS.session.adapters:
+        _SESSIONS.session.mount(origin, get_transport(url))
+    return _SESSIONS.session
+
+
+class ConnectClient(_ConnectClient):
+    """
+    ConnectClient whose sessions keep their connections in the process-wide
+    transport of the endpoint, so every client of a ccli run talking to the
+    same host reuses the same warm connections.
+    """
+
+    @property
+    def session(self):
+        if not hasattr(self._thread_locals, 'session'):
+            session = requests.Session()
+            session.mount(_get_origin(self.endpoint), get_transport(self.endpoint))
+            self._thread_locals.session = session
+        return self._thread_locals.session
@@ -2,26 +2,130 @@
 
 # This file is part of the CloudBlue Connect connect-cli.
 # Copyright (c) 2019-2025 CloudBlue. All Rights Reserved.
+import json
+import os
+import sys
+from importlib.metadata import EntryPoint
+
 import click
 
+from connect.cli import get_version
+from connect.cli.core.base import LazyGroup
+from connect.cli.core.constants import PLUGINS_CACHE_FILE, PLUGINS_ENTRYPOINT_GROUP
 from connect.cli.core.utils import iter_entry_points
 
 
-def load_plugins(cli):
-    @click.group(name='plugin', short_help='Third party plugins.')
+def _command_loader(entrypoint):
+    def load():
+        command_fn = entrypoint.load()
+        return command_fn()
+
+    return load
+
+
+def get_environment_fingerprint():
+    """
+    Identify the set of installed distributions without reading their metadata:
+    installing, upgrading or removing a package changes the modification time of
+    the directory it lives in.
+    """
+    paths = []
+    for path in sys.path:
+        if not path:
+            continue
+        try:
+            paths.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            continue
+    return {
+        'version': get_version(),
+        'python': sys.version,
+        'paths': paths,
+    }
+
+
+def read_plugins_cache(cache_dir, fingerprint):
+    try:
+        with open(os.path.join(cache_dir, PLUGINS_CACHE_FILE), 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    if not isinstance(data, dict) or data.get('fingerprint') != fingerprint:
+        return
+    return data.get('plugins')
+
+
+def write_plugins_cache(cache_dir, fingerprint, plugins):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(os.path.join(cache_dir, PLUGINS_CACHE_FILE), 'w') as f:
+            json.dump({'fingerprint': fingerprint, 'plugins': plugins}, f, indent=4)
+    except OSError:
+        pass
+
+
+def discover_plugins():
+    return [
+        {
+            'name': entrypoint.name,
+            'value': entrypoint.value,
+            'command': None,
+            'short_help': None,
+        }
+        for entrypoint in iter_entry_points(PLUGINS_ENTRYPOINT_GROUP)
+    ]
+
+
+def load_plugins(cli, cache_dir=None):
+    """
+    Register the commands of the plugins installed through the `connect.cli.plugins`
+    entry point. If `cache_dir` is given, the discovered entry points together with
+    the command name and short help read from them are cached there, so subsequent
+    runs neither scan the installed distributions nor import any plugin until it is
+    invoked.
+    """
+
+    @click.group(name='plugin', cls=LazyGroup, short_help='Third party plugins.')
     def grp_plugins():
         pass  # pragma: no cover
 
+    plugins = None
+    if cache_dir:
+        fingerprint = get_environment_fingerprint()
+        plugins = read_plugins_cache(cache_dir, fingerprint)
+    cache_hit = plugins is not None
+    if not cache_hit:
+        plugins = discover_plugins()
+
     has_3rd_party_plugins = False
 
-    for entrypoint in iter_entry_points('connect.cli.plugins'):
+    for plugin in plugins:
+        entrypoint = EntryPoint(plugin['name'], plugin['value'], PLUGINS_ENTRYPOINT_GROUP)
         if entrypoint.value.startswith('connect.cli.plugins.'):
-            command_fn = entrypoint.load()
-            cli.add_command(command_fn())
+            target = cli
         else:
             has_3rd_party_plugins = True
-            command_fn = entrypoint.load()
-            grp_plugins.add_command(command_fn())
+            target = grp_plugins
+        if plugin['command']:
+            target.add_lazy_command(
+                plugin['command'],
+                _command_loader(entrypoint),
+                plugin['short_help'],
+            )
+            continue
+        try:
+            command = _command_loader(entrypoint)()
+        except Exception:
+            # Listed by its entry point name, the error is raised when it is invoked.
+            target.add_lazy_command(entrypoint.name, _command_loader(entrypoint))
+            plugin['command'] = entrypoint.name
+            continue
+        target.add_command(command)
+        plugin['command'] = command.name
+        plugin['short_help'] = command.get_short_help_str()
 
     if has_3rd_party_plugins:
         cli.add_command(grp_plugins)
+
+    if cache_dir and not cache_hit:
+        write_plugins_cache(cache_dir, fingerprint, plugins)
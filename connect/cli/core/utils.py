@@ -13,6 +13,7 @@ from packaging.version import InvalidVersion, Version
 
 from connect.cli import get_version
 from connect.cli.core.constants import DEFAULT_ENDPOINT, PYPI_JSON_API_URL
+from connect.cli.core.http import get_session
 from connect.cli.core.terminal import console
 
 
@@ -52,7 +53,7 @@ def get_last_version_by_major(tags, major):
 
 def get_last_cli_version():
     try:
-        res = requests.get(PYPI_JSON_API_URL)
+        res = get_session(PYPI_JSON_API_URL).get(PYPI_JSON_API_URL)
         if res.status_code == 200:
             data = res.json()
             return data['info']['version']
@@ -62,7 +63,7 @@ def get_last_cli_version():
 
 def get_connect_version():
     try:
-        response = requests.get(DEFAULT_ENDPOINT)
+        response = get_session(DEFAULT_ENDPOINT).get(DEFAULT_ENDPOINT)
         return response.headers.get('Connect-Version')
     except requests.RequestException:
         return
@@ -76,7 +77,7 @@ def check_for_updates(*args):
     current = get_version()
     last_version = None
     try:
-        res = requests.get(PYPI_JSON_API_URL)
+        res = get_session(PYPI_JSON_API_URL).get(PYPI_JSON_API_URL)
         if res.status_code == 200:
             data = res.json()
             last_version = get_last_version_by_major(
@@ -9,7 +9,9 @@ import click
 from connect.cli.core import group
 from connect.cli.core.config import pass_config
 from connect.cli.core.terminal import console
+from connect.cli.plugins.customer.constants import DEFAULT_WORKERS, STREAM_FORMATS
 from connect.cli.plugins.customer.export import dump_customers
+from connect.cli.plugins.customer.rows import get_file_format
 from connect.cli.plugins.customer.sync import CustomerSynchronizer
 
 
@@ -20,7 +22,7 @@ def grp_customer():
 
 @grp_customer.command(
     name='export',
-    short_help='Export customers to an excel file.',
+    short_help='Export customers to an excel, CSV or NDJSON file.',
 )
 @click.option(
     '--output_path',
@@ -34,10 +36,36 @@ def grp_customer():
     '-o',
     'output_file',
     type=click.Path(exists=False, file_okay=True, dir_okay=False),
-    help='Output Excel file name.',
+    help='Output file name.',
+)
+@click.option(
+    '--incremental',
+    '-i',
+    is_flag=True,
+    help=(
+        'Update the file of the previous export with the customers created or updated '
+        'since then.'
+    ),
+)
+@click.option(
+    '--since',
+    'since',
+    type=click.DateTime(),
+    help=(
+        'Update the file of the previous export with the customers created or updated '
+        'since this time (UTC).'
+    ),
+)
+@click.option(
+    '--format',
+    '-f',
+    'output_format',
+    type=click.Choice(('xlsx',) + STREAM_FORMATS),
+    default='xlsx',
+    help='Format of the output file.',
 )
 @pass_config
-def cmd_export_customers(config, output_path, output_file):
+def cmd_export_customers(config, output_path, output_file, incremental, since, output_format):
     acc_id = config.active.id
 
     outfile = dump_customers(
@@ -45,6 +73,9 @@ def cmd_export_customers(config, output_path, output_file):
         output_file=output_file,
         output_path=output_path,
         account_id=acc_id,
+        incremental=incremental,
+        since=since.isoformat() if since else None,
+        output_format=output_format,
     )
 
     console.secho(
@@ -55,19 +86,36 @@ def cmd_export_customers(config, output_path, output_file):
 
 @grp_customer.command(
     name='sync',
-    short_help='Synchronize customers from an excel file.',
+    short_help='Synchronize customers from an excel, CSV or NDJSON file.',
 )
 @click.argument('input_file', metavar='input_file', nargs=1, required=True)  # noqa: E304
+@click.option(
+    '--workers',
+    '-w',
+    'workers',
+    type=click.IntRange(1),
+    default=DEFAULT_WORKERS,
+    help='Number of accounts created or updated concurrently.',
+)
+@click.option(
+    '--skip-unchanged/--no-skip-unchanged',
+    'skip_unchanged',
+    default=True,
+    show_default=True,
+    help='Skip the rows to update that already match the account, instead of updating them.',
+)
 @pass_config
-def cmd_sync_customers(config, input_file):
+def cmd_sync_customers(config, input_file, workers, skip_unchanged):
     acc_id = config.active.id
 
-    if '.xlsx' not in input_file:
+    if '.xlsx' not in input_file and get_file_format(input_file) not in STREAM_FORMATS:
         input_file = f'{input_file}/{input_file}.xlsx'
 
     synchronizer = CustomerSynchronizer(
         client=config.active.client,
         account_id=acc_id,
+        workers=workers,
+        skip_unchanged=skip_unchanged,
     )
     warnings.filterwarnings('ignore', category=UserWarning)
     synchronizer.open(input_file, 'Customers')
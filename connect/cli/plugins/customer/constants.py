@@ -20,3 +20,20 @@ COL_HEADERS = {
     'S': 'Technical Contact Email',
     'T': 'Technical Contact Phone',
 }
+
+PARENT_SEARCH_CRITERIA = ('id', 'external_id', 'external_uid')
+
+LOOKUP_CHUNK_SIZE = 100
+
+# Default number of accounts created or updated concurrently by sync.
+DEFAULT_WORKERS = 4
+
+# Suffix of the file, next to the exported workbook, that keeps the time of the
+# latest account change exported, so that the next export can be incremental.
+WATERMARK_SUFFIX = '.watermark.json'
+
+# Formats of the customers files read and written one row at a time.
+STREAM_FORMATS = ('csv', 'ndjson')
+
+# Number of rows of a CSV or NDJSON file synchronized at a time.
+STREAM_BATCH_SIZE = 1000
@@ -1,6 +1,11 @@
-from connect.client import ClientError
+import json
+import os
+from datetime import datetime, timezone
+
+from click import ClickException
+from connect.client import ClientError, R
 from iso3166 import countries
-from openpyxl import Workbook
+from openpyxl import Workbook, load_workbook
 from openpyxl.styles import PatternFill
 from openpyxl.styles.colors import Color
 from openpyxl.worksheet.datavalidation import DataValidation
@@ -8,46 +13,189 @@ from openpyxl.worksheet.datavalidation import DataValidation
 from connect.cli.core.http import handle_http_error
 from connect.cli.core.terminal import console
 from connect.cli.core.utils import validate_output_options
-from connect.cli.plugins.customer.constants import COL_HEADERS
+from connect.cli.plugins.customer.constants import COL_HEADERS, STREAM_FORMATS, WATERMARK_SUFFIX
+from connect.cli.plugins.customer.rows import CustomerRowWriter
+from connect.cli.plugins.shared.export import StreamingWorksheet
+
+
+def dump_customers(
+    client,
+    account_id,
+    output_file,
+    output_path=None,
+    incremental=False,
+    since=None,
+    output_format='xlsx',
+):
+    """
+    Export the tier accounts to an Excel file. Rows are streamed to a write-only
+    workbook as the accounts are fetched, and each column with a list of choices
+    has a single validation for all the rows, so time and memory do not grow with
+    the size of the sheet already written. With `output_format` set to `csv` or
+    `ndjson` the rows are written to a file of that format instead.
 
+    The time of the latest account change exported is kept next to the file. If
+    `incremental` is set, only the accounts created or updated since then, or
+    since `since` if given, are fetched and merged into the existing file.
+    """
+    if output_format in STREAM_FORMATS:
+        if incremental or since:
+            raise ClickException('Incremental exports are only supported for xlsx files.')
+        return _dump_customer_rows(client, account_id, output_file, output_path, output_format)
+    if incremental or since:
+        return _update_customers(client, account_id, output_file, output_path, since)
 
-def dump_customers(client, account_id, output_file, output_path=None):  # noqa: CCR001
     output_file = validate_output_options(
         output_path,
         output_file,
         default_dir_name=account_id,
         default_file_name='customers',
     )
+    wb = Workbook(write_only=True)
+    ws = StreamingWorksheet(wb.create_sheet('Customers'))
+    _prepare_worksheet(ws)
+    row_idx = 2
+    watermark = None
     try:
-        wb = Workbook()
-        _prepare_worksheet(wb.create_sheet('Customers'))
-        _add_countries(wb.create_sheet('Countries'))
-
-        customers = client.ns('tier').accounts.all()
-        row_idx = 2
-        count = customers.count()
-        with console.progress() as progress:
-            task = progress.add_task('Processing customer', total=count)
-            for customer in customers:
-                progress.update(
-                    task,
-                    description=f'Processing customer {customer["id"]}',
-                    advance=1,
-                )
-                _fill_customer_row(wb['Customers'], row_idx, customer)
-                row_idx += 1
-            progress.update(task, completed=count)
+        for customer in _iter_customers(client.ns('tier').accounts.all()):
+            _fill_customer_row(ws, row_idx, customer)
+            watermark = _get_watermark(watermark, customer)
+            row_idx += 1
     except ClientError as error:
         handle_http_error(error)
 
-    default_sheet = wb['Sheet']
-    wb.remove(default_sheet)
+    if row_idx > 2:
+        _add_validations(ws, row_idx - 1)
+    _add_countries(StreamingWorksheet(wb.create_sheet('Countries')))
     wb.save(output_file)
+    _write_watermark(output_file, watermark)
 
     return output_file
 
 
-def _fill_customer_row(ws, row_idx, customer):
+def _update_customers(client, account_id, output_file, output_path, since):
+    """
+    Merge the accounts created or updated since the watermark of a previous
+    export into its file: the rows of the accounts already exported are
+    located through an index of their positions by ID and overwritten, and
+    new accounts are appended.
+    """
+    output_file = os.path.join(
+        output_path or os.getcwd(),
+        account_id,
+        output_file or 'customers.xlsx',
+    )
+    if not os.path.isfile(output_file):
+        raise ClickException(
+            f'No previous export {output_file} was found, export the customers without '
+            '--incremental first.',
+        )
+    watermark = _read_watermark(output_file)
+    since = since or watermark
+    if not since:
+        raise ClickException(
+            f'The time of the previous export {output_file} is unknown, use --since to set it.',
+        )
+
+    wb = load_workbook(output_file)
+    ws = wb['Customers']
+    last_row = ws.max_row
+    rows = {ws.cell(row_idx, 1).value: row_idx for row_idx in range(2, last_row + 1)}
+    try:
+        customers = client.ns('tier').accounts.filter(
+            R().events.updated.at.ge(since) | R().events.created.at.ge(since),
+        )
+        for customer in _iter_customers(customers):
+            row_idx = rows.get(customer['id'])
+            if not row_idx:
+                last_row += 1
+                row_idx = rows[customer['id']] = last_row
+            _fill_customer_row(ws, row_idx, customer)
+            watermark = _get_watermark(watermark, customer)
+    except ClientError as error:
+        handle_http_error(error)
+
+    ws.data_validations.dataValidation = []
+    if last_row > 1:
+        _add_validations(ws, last_row)
+    wb.save(output_file)
+    _write_watermark(output_file, watermark)
+
+    return output_file
+
+
+def _dump_customer_rows(client, account_id, output_file, output_path, output_format):
+    """
+    Export the tier accounts to a CSV or NDJSON file, writing each account as it
+    is fetched.
+    """
+    output_file = validate_output_options(
+        output_path,
+        output_file or f'customers.{output_format}',
+        default_dir_name=account_id,
+        default_file_name='customers',
+    )
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = CustomerRowWriter(f, output_format)
+        writer.write_header()
+        try:
+            for customer in _iter_customers(client.ns('tier').accounts.all()):
+                writer.write(_get_customer_row(customer))
+        except ClientError as error:
+            handle_http_error(error)
+
+    return output_file
+
+
+def _iter_customers(customers):
+    count = customers.count()
+    with console.progress() as progress:
+        task = progress.add_task('Processing customer', total=count)
+        for customer in customers:
+            progress.update(
+                task,
+                description=f'Processing customer {customer["id"]}',
+                advance=1,
+            )
+            yield customer
+        progress.update(task, completed=count)
+
+
+def _get_watermark(watermark, customer):
+    events = customer.get('events', {})
+    for event in ('created', 'updated'):
+        at = events.get(event, {}).get('at')
+        if at and (not watermark or _to_utc(at) > _to_utc(watermark)):
+            watermark = at
+    return watermark
+
+
+def _to_utc(value):
+    if value.endswith('Z'):
+        # datetime.fromisoformat only parses the Z designator since Python 3.11
+        value = f'{value[:-1]}+00:00'
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def _read_watermark(output_file):
+    try:
+        with open(f'{os.path.splitext(output_file)[0]}{WATERMARK_SUFFIX}', 'r') as f:
+            return json.load(f)['updated_at']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_watermark(output_file, watermark):
+    if not watermark:
+        return
+    with open(f'{os.path.splitext(output_file)[0]}{WATERMARK_SUFFIX}', 'w') as f:
+        json.dump({'updated_at': watermark}, f, indent=4)
+
+
+def _add_validations(ws, last_row):
     action_validation = DataValidation(
         type='list',
         formula1='"-,create,update"',
@@ -69,39 +217,40 @@ def _fill_customer_row(ws, row_idx, customer):
 
     ws.add_data_validation(action_validation)
     ws.add_data_validation(search_criteria_validation)
+    action_validation.add(f'D2:D{last_row}')
+    search_criteria_validation.add(f'F2:F{last_row}')
+
+
+def _fill_customer_row(ws, row_idx, customer):
+    for col_idx, value in enumerate(_get_customer_row(customer), 1):
+        ws.cell(row_idx, col_idx, value=value)
 
-    ws.cell(row_idx, 1, value=customer.get('id', '-'))
-    ws.cell(row_idx, 2, value=customer.get('external_id', '-'))
-    ws.cell(row_idx, 3, value=customer.get('external_uid', '-'))
-    ws.cell(row_idx, 4, value='-')
-    ws.cell(row_idx, 5, value=customer['hub'].get('id', '-') if 'hub' in customer else '-')
-    ws.cell(row_idx, 6, value='id' if 'parent' in customer else '-')
-    ws.cell(row_idx, 7, value=customer['parent'].get('id', '-') if 'parent' in customer else '-')
-    ws.cell(row_idx, 8, value=customer.get('type', '-'))
-    ws.cell(row_idx, 9, value=customer.get('tax_id', '-'))
-    ws.cell(row_idx, 10, value=customer.get('name', '-'))
-    ws.cell(row_idx, 11, value=customer['contact_info'].get('address_line1', '-'))
-    ws.cell(row_idx, 12, value=customer['contact_info'].get('address_line2', '-'))
-    ws.cell(row_idx, 13, value=customer['contact_info'].get('city', '-'))
-    ws.cell(row_idx, 14, value=customer['contact_info'].get('state', '-'))
-    ws.cell(row_idx, 15, value=customer['contact_info'].get('zip', '-'))
-    ws.cell(row_idx, 16, value=customer['contact_info'].get('country', '-'))
-    ws.cell(row_idx, 17, value=customer['contact_info']['contact'].get('first_name', '-'))
-    ws.cell(row_idx, 18, value=customer['contact_info']['contact'].get('last_name', '-'))
-    ws.cell(row_idx, 19, value=customer['contact_info']['contact'].get('email', '-'))
-    ws.cell(
-        row_idx,
-        20,
-        value=_get_phone_number(
-            customer['contact_info']['contact'].get(
-                'phone_number',
-                '-',
-            ),
-        ),
-    )
 
-    action_validation.add(f'D{row_idx}')
-    search_criteria_validation.add(f'F{row_idx}')
+def _get_customer_row(customer):
+    contact_info = customer['contact_info']
+    contact = contact_info['contact']
+    return [
+        customer.get('id', '-'),
+        customer.get('external_id', '-'),
+        customer.get('external_uid', '-'),
+        '-',
+        customer['hub'].get('id', '-') if 'hub' in customer else '-',
+        'id' if 'parent' in customer else '-',
+        customer['parent'].get('id', '-') if 'parent' in customer else '-',
+        customer.get('type', '-'),
+        customer.get('tax_id', '-'),
+        customer.get('name', '-'),
+        contact_info.get('address_line1', '-'),
+        contact_info.get('address_line2', '-'),
+        contact_info.get('city', '-'),
+        contact_info.get('state', '-'),
+        contact_info.get('zip', '-'),
+        contact_info.get('country', '-'),
+        contact.get('first_name', '-'),
+        contact.get('last_name', '-'),
+        contact.get('email', '-'),
+        _get_phone_number(contact.get('phone_number', '-')),
+    ]
 
 
 def _get_phone_number(number):
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of the CloudBlue Connect connect-cli.
+# Copyright (c) 2019-2025 CloudBlue. All Rights Reserved.
+import csv
+import json
+import os
+
+from click import ClickException
+
+from connect.cli.plugins.customer.constants import COL_HEADERS, STREAM_FORMATS
+
+
+HEADERS = list(COL_HEADERS.values())
+
+
+def get_file_format(path):
+    """
+    Return the format of a customers file from its extension: `csv`, `ndjson` or,
+    for any other extension, `xlsx`.
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    return extension if extension in STREAM_FORMATS else 'xlsx'
+
+
+class CustomerRowWriter:
+    """
+    Write customer rows, lists with a value for each column of `COL_HEADERS`, to
+    a CSV file with a header row or to a NDJSON file with an object per row keyed
+    by column header.
+    """
+
+    def __init__(self, f, file_format):
+        self._f = f
+        self._format = file_format
+        self._csv = csv.writer(f) if file_format == 'csv' else None
+
+    def write_header(self):
+        if self._csv:
+            self._csv.writerow(HEADERS)
+
+    def write(self, values):
+        if self._csv:
+            self._csv.writerow(['' if value is None else value for value in values])
+        else:
+            self._f.write(json.dumps(dict(zip(HEADERS, values))))
+            self._f.write('\n')
+
+
+def read_customer_rows(f, file_format):
+    """
+    Yield the row number and the values of each customer row of a CSV or NDJSON
+    file, one at a time. Empty values are read as None, like empty cells of a
+    sheet.
+    """
+    if file_format == 'csv':
+        reader = csv.reader(f)
+        validate_header(next(reader, []))
+        for row_idx, values in enumerate(reader, 2):
+            if any(values):
+                yield row_idx, _normalize(values + [None] * (len(HEADERS) - len(values)))
+        return
+    for row_idx, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            raise ClickException(f'Line {row_idx} is not a valid JSON object.')
+        if not isinstance(data, dict):
+            raise ClickException(f'Line {row_idx} is not a valid JSON object.')
+        unknown = set(data) - set(HEADERS)
+        if unknown:
+            raise ClickException(
+                f'Line {row_idx} has unknown columns: {", ".join(sorted(unknown))}.',
+            )
+        yield row_idx, _normalize([data.get(header) for header in HEADERS])
+
+
+def validate_header(header):
+    for column, expected in COL_HEADERS.items():
+        idx = ord(column) - ord('A')
+        value = header[idx] if idx < len(header) else None
+        if value != expected:
+            raise ClickException(f'Column `{column}1` must be `{expected}` and is `{value}`.')
+
+
+def _normalize(values):
+    return [None if value == '' else value for value in values[: len(HEADERS)]]
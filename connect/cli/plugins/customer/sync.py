@@ -1,5 +1,10 @@
+import os
+import tempfile
 import uuid
-from collections import namedtuple
+from collections import defaultdict, namedtuple
+from functools import partial
+from itertools import islice
+from threading import Lock
 from zipfile import BadZipFile
 
 import phonenumbers
@@ -9,9 +14,17 @@ from openpyxl import load_workbook
 from openpyxl.utils.exceptions import InvalidFileException
 
 from connect.cli.core.terminal import console
-from connect.cli.plugins.customer.constants import COL_HEADERS
+from connect.cli.plugins.customer.constants import (
+    COL_HEADERS,
+    LOOKUP_CHUNK_SIZE,
+    PARENT_SEARCH_CRITERIA,
+    STREAM_BATCH_SIZE,
+    STREAM_FORMATS,
+)
+from connect.cli.plugins.customer.rows import CustomerRowWriter, get_file_format, read_customer_rows
 from connect.cli.plugins.shared.exceptions import SheetNotFoundError
 from connect.cli.plugins.shared.sync_stats import SynchronizerStatsSingleModule
+from connect.cli.plugins.shared.utils import run_dag
 
 
 fields = (v.replace(' ', '_').lower() for v in COL_HEADERS.values())
@@ -19,13 +32,37 @@ fields = (v.replace(' ', '_').lower() for v in COL_HEADERS.values())
 _RowData = namedtuple('RowData', fields)
 
 
+class _RowBatch:
+    """
+    Rows of a CSV or NDJSON file being synchronized, updated through the same
+    `cell` calls as a worksheet.
+    """
+
+    def __init__(self, rows):
+        self.rows = dict(rows)
+
+    def cell(self, row, column, value=None):
+        self.rows[row][column - 1] = value
+
+
 class CustomerSynchronizer:
-    def __init__(self, client, account_id):
+    def __init__(self, client, account_id, workers=1, skip_unchanged=False):
         self._client = client
+        self._workers = workers
+        self._skip_unchanged = skip_unchanged
         self._wb = None
+        self._format = 'xlsx'
+        self._input_file = None
+        self._output_file = None
         self.account_id = account_id
         self.hubs = ['HB-0000-0000']
         self.stats = SynchronizerStatsSingleModule('Customers')
+        self._parents = {}
+        self._parent_rows = {}
+        self._parent_errors = set()
+        self._parents_lock = Lock()
+        self._accounts = {}
+        self._account_errors = set()
 
     def populate_hubs(self):
         if self.account_id.startswith('PA-'):
@@ -35,6 +72,10 @@ class CustomerSynchronizer:
                     self.hubs.append(hub['id'])
 
     def open(self, input_file, worksheet):
+        self._format = get_file_format(input_file)
+        if self._format in STREAM_FORMATS:
+            self._open_rows(input_file)
+            return
         self._open_workbook(input_file)
         if worksheet not in self._wb.sheetnames:
             raise SheetNotFoundError(f'File does not contain {worksheet} to synchronize, skipping')
@@ -42,8 +83,19 @@ class CustomerSynchronizer:
         self._validate_worksheet_sheet(ws)
 
     def save(self, output_file):
+        if self._format in STREAM_FORMATS:
+            os.replace(self._output_file, output_file)
+            return
         self._wb.save(output_file)
 
+    def _open_rows(self, input_file):
+        try:
+            with open(input_file, 'r', newline='', encoding='utf-8') as f:
+                next(read_customer_rows(f, self._format), None)
+        except (OSError, UnicodeDecodeError) as e:
+            raise ClickException(f'{input_file} can not be read: {e}.')
+        self._input_file = input_file
+
     def _open_workbook(self, input_file):
         try:
             self._wb = load_workbook(
@@ -65,167 +117,342 @@ class CustomerSynchronizer:
                     f'and is `{cel.value}`.',
                 )
 
-    def sync(self):  # noqa: CCR001
-        ws = self._wb['Customers']
+    def sync(self):
         self.stats.reset()
-        parent_uuid = {}
-        parent_external_id = {}
-        parent_id = []
-
         self.populate_hubs()
         with console.progress() as progress:
-            task = progress.add_task('Processing item', total=ws.max_row - 1)
-            for row_idx in range(2, ws.max_row + 1):
-                data = _RowData(*[ws.cell(row_idx, col_idx).value for col_idx in range(1, 21)])
-                progress.update(
-                    task,
-                    description=f'Processing item {data.id or data.external_id or data.external_uid}',
-                    advance=1,
+            if self._format in STREAM_FORMATS:
+                self._sync_stream(progress)
+                return
+            ws = self._wb['Customers']
+            rows = [
+                (
+                    row_idx,
+                    _RowData(*[ws.cell(row_idx, col_idx).value for col_idx in range(1, 21)]),
                 )
-                if data.action == '-':
-                    self.stats.skipped()
-                    continue
-                row_errors = self._validate_row(data)
-                if row_errors:
-                    self.stats.error(row_errors, row_idx)
-                    continue
-                if data.parent_search_criteria and not data.parent_search_value:
-                    self.stats.error('Parent search value is needed if criteria is set', row_idx)
-                    continue
-                if data.hub_id and (data.hub_id != '' or data.hub_id != '-'):
-                    if data.hub_id not in self.hubs:
-                        self.stats.error(
-                            f'Accounts on hub {data.hub_id} can not be modified',
-                            row_idx,
-                        )
-                        continue
-                name = f'{data.technical_contact_first_name} {data.technical_contact_last_name}'
-                model = {
-                    'type': data.type,
-                    'name': data.company_name if data.company_name else name,
-                    'contact_info': {
-                        'address_line1': data.address_line_1,
-                        'address_line2': data.address_line_2,
-                        'city': data.city,
-                        'country': data.country,
-                        'postal_code': data.zip,
-                        'state': data.state,
-                        'contact': {
-                            'first_name': data.technical_contact_first_name,
-                            'last_name': data.technical_contact_last_name,
-                            'email': data.technical_contact_email,
-                        },
-                    },
+                for row_idx in range(2, ws.max_row + 1)
+            ]
+            task = progress.add_task('Processing item', total=len(rows))
+            self._sync_rows(ws, rows, progress, task)
+
+    def _sync_stream(self, progress):
+        """
+        Synchronize a CSV or NDJSON file in batches of rows, writing each batch
+        with the IDs of the accounts created to a file that replaces the input one
+        when saved, so that memory does not grow with the size of the file.
+        """
+        fd, self._output_file = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self._input_file)),
+            suffix=f'.{self._format}',
+        )
+        task = progress.add_task('Processing item', total=None)
+        try:
+            with open(self._input_file, 'r', newline='', encoding='utf-8') as src:
+                with os.fdopen(fd, 'w', newline='', encoding='utf-8') as dst:
+                    writer = CustomerRowWriter(dst, self._format)
+                    writer.write_header()
+                    self._sync_batches(
+                        read_customer_rows(src, self._format), writer, progress, task
+                    )
+        except BaseException:
+            os.remove(self._output_file)
+            raise
+
+    def _sync_batches(self, rows, writer, progress, task):
+        while True:
+            batch = _RowBatch(islice(rows, STREAM_BATCH_SIZE))
+            if not batch.rows:
+                return
+            self._sync_rows(
+                batch,
+                [(row_idx, _RowData(*values)) for row_idx, values in batch.rows.items()],
+                progress,
+                task,
+            )
+            for values in batch.rows.values():
+                writer.write(values)
+
+    def _sync_rows(self, ws, rows, progress, task):
+        self._fetch_accounts(rows)
+        self._resolve_parents(rows)
+        if self._workers == 1:
+            for row_idx, data in rows:
+                self._advance(progress, task, data)
+                self._sync_row(ws, row_idx, data)()
+            return
+
+        records = {}
+
+        def sync_row(row_idx, data):
+            records[row_idx] = self._sync_row(ws, row_idx, data)
+            self._advance(progress, task, data)
+
+        dependencies = self._get_row_dependencies(rows)
+        run_dag(
+            {
+                row_idx: (partial(sync_row, row_idx, data), dependencies.get(row_idx, ()))
+                for row_idx, data in rows
+            },
+            self._workers,
+        )
+        for row_idx, _ in rows:
+            records[row_idx]()
+
+    @staticmethod
+    def _advance(progress, task, data):
+        progress.update(
+            task,
+            description=f'Processing item {data.id or data.external_id or data.external_uid}',
+            advance=1,
+        )
+
+    def _get_row_dependencies(self, rows):
+        """
+        Return the rows each row has to wait for: all the previous rows that create
+        the parent the row refers to. Rows with no parent created in a previous row do
+        not depend on any other row, and the parents created by later rows are
+        ignored when they are searched, like when the rows are synchronized in order.
+        """
+        creators = {}
+        dependencies = {}
+        for row_idx, data in rows:
+            if data.action not in ('create', 'update'):
+                continue
+            if data.parent_search_criteria in ('external_id', 'external_uid'):
+                parent_rows = creators.get(
+                    (data.parent_search_criteria, str(data.parent_search_value)),
+                )
+                if parent_rows:
+                    dependencies[row_idx] = tuple(parent_rows)
+            if data.action == 'create':
+                for criteria in ('external_id', 'external_uid'):
+                    value = getattr(data, criteria)
+                    if value:
+                        creators.setdefault((criteria, str(value)), []).append(row_idx)
+        return dependencies
+
+    def _sync_row(self, ws, row_idx, data):  # noqa: CCR001
+        """
+        Create or update the account of a row. Since rows may be synchronized
+        concurrently, the outcome is not recorded here: a callable that records it
+        in the stats and in the sheet is returned instead.
+        """
+        if data.action == '-':
+            return self.stats.skipped
+        row_errors = self._validate_row(data)
+        if row_errors:
+            return partial(self.stats.error, row_errors, row_idx)
+        if data.parent_search_criteria and not data.parent_search_value:
+            return partial(
+                self.stats.error,
+                'Parent search value is needed if criteria is set',
+                row_idx,
+            )
+        if data.hub_id and (data.hub_id != '' or data.hub_id != '-'):
+            if data.hub_id not in self.hubs:
+                return partial(
+                    self.stats.error,
+                    f'Accounts on hub {data.hub_id} can not be modified',
+                    row_idx,
+                )
+        name = f'{data.technical_contact_first_name} {data.technical_contact_last_name}'
+        model = {
+            'type': data.type,
+            'name': data.company_name if data.company_name else name,
+            'contact_info': {
+                'address_line1': data.address_line_1,
+                'address_line2': data.address_line_2,
+                'city': data.city,
+                'country': data.country,
+                'postal_code': data.zip,
+                'state': data.state,
+                'contact': {
+                    'first_name': data.technical_contact_first_name,
+                    'last_name': data.technical_contact_last_name,
+                    'email': data.technical_contact_email,
+                },
+            },
+        }
+        if data.external_id:
+            model['external_id'] = data.external_id
+        if data.external_uid:
+            model['external_uid'] = data.external_uid
+        else:
+            model['external_uid'] = str(uuid.uuid4())
+        if data.technical_contact_phone:
+            try:
+                phone = phonenumbers.parse(data.technical_contact_phone, data.country)
+                phone_number = {
+                    'country_code': f'+{str(phone.country_code)}',
+                    'area_code': '',
+                    'extension': str(phone.extension) if phone.extension else '-',
+                    'phone_number': str(phone.national_number),
                 }
-                if data.external_id:
-                    model['external_id'] = data.external_id
-                if data.external_uid:
-                    model['external_uid'] = data.external_uid
-                else:
-                    model['external_uid'] = str(uuid.uuid4())
-                if data.technical_contact_phone:
-                    try:
-                        phone = phonenumbers.parse(data.technical_contact_phone, data.country)
-                        phone_number = {
-                            'country_code': f'+{str(phone.country_code)}',
-                            'area_code': '',
-                            'extension': str(phone.extension) if phone.extension else '-',
-                            'phone_number': str(phone.national_number),
-                        }
-                        model['contact_info']['contact']['phone_number'] = phone_number
-                    except Exception:
-                        pass
-                if data.parent_search_criteria != '-':
-                    model['parent'] = {}
-                    if data.parent_search_criteria == 'id':
-                        if data.parent_search_value not in parent_id:
-                            try:
-                                pacc = (
-                                    self._client.ns('tier').accounts[data.parent_search_value].get()
-                                )
-                                parent_id.append(pacc['id'])
-                            except ClientError:
-                                self.stats.error(
-                                    f'Parent with id {data.parent_search_value} does not exist',
-                                    row_idx,
-                                )
-                                continue
-                        model['parent']['id'] = data.parent_search_value
-                    elif data.parent_search_criteria == 'external_id':
-                        if data.parent_search_value not in parent_external_id:
-                            try:
-                                r = R().external_id.eq(str(data.parent_search_value))
-                                pacc = self._client.ns('tier').accounts.filter(r).all()
-                                pacc_count = pacc.count()
-                                if pacc_count == 0:
-                                    self.stats.error(
-                                        f'Parent with external_id {data.parent_search_value} not found',
-                                        row_idx,
-                                    )
-                                    continue
-                                elif pacc_count > 1:
-                                    self.stats.error(
-                                        f'More than one Parent with external_id {data.parent_search_value}',
-                                        row_idx,
-                                    )
-                                    continue
-                                parent_external_id[data.parent_search_value] = pacc[0]['id']
-                            except ClientError:
-                                self.stats.error(
-                                    'Error when obtaining parent data from Connect',
-                                    row_idx,
-                                )
-                                continue
-                        model['parent']['id'] = parent_external_id[data.parent_search_value]
-                    else:
-                        if data.parent_search_value not in parent_uuid:
-                            try:
-                                r = R().external_uid.eq(str(data.parent_search_value))
-                                pacc = self._client.ns('tier').accounts.filter(r).all()
-                                if pacc.count() == 0:
-                                    self.stats.error(
-                                        f'Parent with external_uid {data.parent_search_value} not found',
-                                        row_idx,
-                                    )
-                                    continue
-                                elif pacc.count() > 1:
-                                    self.stats.error(
-                                        f'More than one Parent with external_uid {data.parent_search_value}',
-                                        row_idx,
-                                    )
-                                    continue
-                                parent_uuid[data.parent_search_value] = pacc[0]['id']
-                            except ClientError:
-                                self.stats.error(
-                                    'Error when obtaining parent data from Connect',
-                                    row_idx,
-                                )
-                                continue
-                        model['parent']['id'] = parent_uuid[data.parent_search_value]
-                if data.action == 'create':
-                    try:
-                        account = self._client.ns('tier').accounts.create(model)
-                    except ClientError as e:
-                        self.stats.error(
-                            f'Error when creating account: {str(e)}',
-                            row_idx,
-                        )
-                        continue
-                    self.stats.created()
-                    self._update_sheet_row(ws, row_idx, account)
-                else:
-                    try:
-                        model['id'] = data.id
-                        account = self._client.ns('tier').accounts[data.id].update(model)
-                    except ClientError as e:
-                        self.stats.error(
-                            f'Error when updating account: {str(e)}',
-                            row_idx,
-                        )
-                        continue
-                    self.stats.updated()
-                    self._update_sheet_row(ws, row_idx, account)
-            progress.update(task, completed=ws.max_row - 1)
+                model['contact_info']['contact']['phone_number'] = phone_number
+            except Exception:
+                pass
+        if data.parent_search_criteria != '-':
+            parent_id, error = self._get_parent_id(
+                data.parent_search_criteria,
+                data.parent_search_value,
+                row_idx,
+            )
+            if error:
+                return partial(self.stats.error, error, row_idx)
+            model['parent'] = {'id': parent_id}
+        if data.action == 'create':
+            try:
+                account = self._client.ns('tier').accounts.create(model)
+            except ClientError as e:
+                return partial(self.stats.error, f'Error when creating account: {str(e)}', row_idx)
+            self._index_parent(account, row_idx)
+            return partial(self._record_row, self.stats.created, ws, row_idx, account)
+        if self._skip_unchanged and self._is_unchanged(model, self._accounts[data.id]):
+            return partial(
+                self._record_row,
+                self.stats.unchanged,
+                ws,
+                row_idx,
+                self._accounts[data.id],
+            )
+        try:
+            model['id'] = data.id
+            account = self._client.ns('tier').accounts[data.id].update(model)
+        except ClientError as e:
+            return partial(self.stats.error, f'Error when updating account: {str(e)}', row_idx)
+        return partial(self._record_row, self.stats.updated, ws, row_idx, account)
+
+    def _record_row(self, count, ws, row_idx, account):
+        count()
+        self._update_sheet_row(ws, row_idx, account)
+
+    def _resolve_parents(self, rows):
+        """
+        Look up every distinct parent the rows to create or update refer to with
+        chunked `in()` queries, instead of one or two queries per row. Each value
+        searched is indexed with the IDs of the accounts found, so parents that do
+        not exist are indexed with no IDs.
+        """
+        self._parents = {}
+        self._parent_rows = {}
+        self._parent_errors = set()
+        values = defaultdict(set)
+        for _, data in rows:
+            if (
+                data.action in ('create', 'update')
+                and data.parent_search_criteria in PARENT_SEARCH_CRITERIA
+                and data.parent_search_value
+            ):
+                values[data.parent_search_criteria].add(str(data.parent_search_value))
+
+        for criteria, criteria_values in values.items():
+            for chunk, found in self._lookup_accounts(criteria, criteria_values):
+                if found is None:
+                    self._parent_errors.update((criteria, value) for value in chunk)
+                    continue
+                for value in chunk:
+                    self._parents[(criteria, value)] = []
+                for account in found:
+                    self._parents.setdefault((criteria, str(account.get(criteria))), []).append(
+                        account['id'],
+                    )
+
+    def _fetch_accounts(self, rows):
+        """
+        Fetch the accounts to update with chunked `in()` queries, so that their
+        existence is checked without a request per row and, if skipping unchanged
+        rows, the rows that would not change them are skipped. The IDs of the chunks whose query failed are kept
+        apart, so their rows report the error instead of a missing account.
+        """
+        self._accounts = {}
+        self._account_errors = set()
+        ids = {
+            data.id
+            for _, data in rows
+            if data.action == 'update' and isinstance(data.id, str) and data.id.startswith('TA-')
+        }
+        for chunk, found in self._lookup_accounts('id', ids):
+            if found is None:
+                self._account_errors.update(chunk)
+                continue
+            for account in found:
+                self._accounts[account['id']] = account
+
+    def _lookup_accounts(self, field, values):
+        """
+        Look up the accounts whose `field` is one of `values` with an `in()` query
+        per chunk of values, yielding each chunk with the accounts found or with
+        None if the query failed.
+        """
+        accounts = self._client.ns('tier').accounts
+        values = sorted(values)
+        for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+            chunk = values[start : start + LOOKUP_CHUNK_SIZE]
+            try:
+                yield chunk, list(accounts.filter(R().n(field).in_(chunk)))
+            except ClientError:
+                yield chunk, None
+
+    def _index_parent(self, account, row_idx):
+        """
+        Make an account created in the sheet by the row `row_idx` available as parent
+        of the next rows.
+        """
+        with self._parents_lock:
+            self._parent_rows[account['id']] = row_idx
+            for criteria in PARENT_SEARCH_CRITERIA:
+                if account.get(criteria):
+                    ids = self._parents.setdefault((criteria, str(account[criteria])), [])
+                    if account['id'] not in ids:
+                        ids.append(account['id'])
+
+    def _get_parent_id(self, criteria, value, row_idx):
+        """
+        Return the ID of the parent account of the row `row_idx` found by `criteria`
+        and an error if it can not be found. Only the accounts that existed before
+        the sync or that were created by previous rows are searched. Like in the
+        sheet validation, any criteria other than `id` and `external_id` searches by
+        `external_uid`.
+        """
+        if criteria not in ('id', 'external_id'):
+            criteria = 'external_uid'
+        key = (criteria, str(value))
+        with self._parents_lock:
+            ids = [
+                parent_id
+                for parent_id in self._parents.get(key, [])
+                if self._parent_rows.get(parent_id, 0) < row_idx
+            ]
+        if criteria == 'id':
+            if key in self._parent_errors or not ids:
+                return None, f'Parent with id {value} does not exist'
+            return ids[0], None
+        if key in self._parent_errors:
+            return None, 'Error when obtaining parent data from Connect'
+        if not ids:
+            return None, f'Parent with {criteria} {value} not found'
+        if len(ids) > 1:
+            return None, f'More than one Parent with {criteria} {value}'
+        return ids[0], None
+
+    @classmethod
+    def _is_unchanged(cls, model, account):
+        """
+        Tell whether updating `account` with `model` would leave it as it is.
+        Empty values match missing ones, and values are compared as text.
+        """
+        for key, value in model.items():
+            current = account.get(key) if isinstance(account, dict) else None
+            if isinstance(value, dict):
+                if not cls._is_unchanged(value, current or {}):
+                    return False
+            elif cls._normalize(value) != cls._normalize(current):
+                return False
+        return True
+
+    @staticmethod
+    def _normalize(value):
+        return None if value in (None, '', '-') else str(value)
 
     @staticmethod
     def _update_sheet_row(ws, row_idx, account):
@@ -269,11 +496,11 @@ class CustomerSynchronizer:
         if row.action == 'update' and not row.id.startswith('TA-'):
             errors.append('Update operation requires account ID to be set')
             return errors
-        if row.action == 'update':
-            try:
-                self._client.ns('tier').accounts[row.id].get()
-            except ClientError:
-                errors.append(
-                    f'Account with id {row.id} does not exist',
-                )
-                return errors
+        if row.action == 'update' and row.id in self._account_errors:
+            errors.append('Error when obtaining account data from Connect')
+            return errors
+        if row.action == 'update' and row.id not in self._accounts:
+            errors.append(
+                f'Account with id {row.id} does not exist',
+            )
+            return errors
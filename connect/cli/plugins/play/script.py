@@ -5,8 +5,7 @@
 import re
 from typing import List
 
-from connect.client import ConnectClient
-
+from connect.cli.core.http import ConnectClient
 from connect.cli.plugins.play.context import Context
 
 
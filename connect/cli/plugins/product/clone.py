@@ -1,11 +1,16 @@
-from datetime import datetime
-from tempfile import TemporaryDirectory
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from functools import partial
+from io import BytesIO
 
 from click import ClickException
 from connect.client import ClientError
 from openpyxl import load_workbook
 
-from connect.cli.plugins.product.export import dump_product
+from connect.cli.plugins.product.constants import DEFAULT_WORKERS
+from connect.cli.plugins.product.export import RemoteMedia, export_product_workbook
 from connect.cli.plugins.product.sync import (
     ActionsSynchronizer,
     CapabilitiesSynchronizer,
@@ -14,165 +19,382 @@ from connect.cli.plugins.product.sync import (
     MediaSynchronizer,
     MessageSynchronizer,
     ParamsSynchronizer,
+    ProductDocument,
     TemplatesSynchronizer,
 )
+from connect.cli.plugins.shared.base import WorkbookSession
 from connect.cli.plugins.shared.translations_synchronizers import sync_product_translations
-from connect.cli.plugins.shared.utils import get_translation_attributes_sheets
+from connect.cli.plugins.shared.utils import (
+    get_translation_attributes_sheets,
+    run_concurrently,
+    run_dag,
+    split_workers,
+)
 
 
-class _TempDir:
-    # ponytail: stdlib stand-in for the archived pyfilesystem2 TempFS, which broke
-    # on setuptools>=81 (pkg_resources removed). Cleaned up on garbage collection.
-    def __init__(self, identifier):
-        self._tmp = TemporaryDirectory(suffix=identifier)
-        self.root_path = self._tmp.name
+CLONES_DIR = 'clones'
+MAPPED_SHEETS = (
+    'Items',
+    'Templates',
+    'Ordering Parameters',
+    'Fulfillment Parameters',
+    'Configuration Parameters',
+    'Actions',
+)
 
 
-class ProductCloner:
-    def __init__(self, config, source_account, destination_account, product_id, progress, stats):
-        self.fs = _TempDir(f'_clone_{product_id}')
-        self.config = config
-        self.source_account = source_account if source_account else config.active.id
-        self.destination_account = destination_account if destination_account else config.active.id
-        self.product_id = product_id
-        self.stats = stats
-        self.progress = progress
-        self.destination_product = None
-        self.wb = None
+class CloneIdMap:
+    """
+    IDs of the items, parameters, templates and actions of a cloned product mapped
+    to the IDs of their clones, kept in the config directory so that the clone can
+    be updated incrementally later. `updated_at` is the latest time a resource of
+    the source product was seen created or updated, in UTC.
+    """
+
+    def __init__(self, path, destination_product=None, updated_at=None, ids=None):
+        self.path = path
+        self.destination_product = destination_product
+        self.updated_at = updated_at
+        self.ids = ids or {}
 
-    def dump(self):
-        dump_product(
-            client=self.config.active.client,
-            product_id=self.product_id,
-            output_path=self.fs.root_path,
-            progress=self.progress,
-            output_file='',
+    @staticmethod
+    def get_path(config, product_id, destination_account):
+        return os.path.join(
+            config.config_dir, CLONES_DIR, f'{product_id}-{destination_account}.json'
         )
 
-    def inject(self):  # noqa: CCR001
+    @classmethod
+    def load(cls, config, product_id, destination_account):
+        path = cls.get_path(config, product_id, destination_account)
         try:
-            self.config.activate(self.destination_account)
-            input_file = f'{self.fs.root_path}/{self.product_id}/{self.product_id}.xlsx'
-            synchronizer = GeneralSynchronizer(
-                self.config.active.client,
-                None,
-            )
-
-            synchronizer.open(input_file, 'General Information')
-            synchronizer.sync()
-
-            synchronizer = CapabilitiesSynchronizer(
-                self.config.active.client,
-                self.progress,
-                self.stats,
-            )
-            synchronizer.open(input_file, 'Capabilities')
-            synchronizer.sync()
-
-            synchronizer = ItemSynchronizer(
-                self.config.active.client,
-                self.progress,
-                self.stats,
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            raise ClickException(
+                f'No previous clone of {product_id} to account {destination_account} was found, '
+                'clone it without --incremental first.',
             )
-            product_id = synchronizer.open(input_file, 'Items')
-            items = self.config.active.client.products[product_id].items.all()
-            for item in items:
-                self.config.active.client.products[product_id].items[item['id']].delete()
-            synchronizer.sync()
-
-            templates = self.config.active.client.products[product_id].templates.all()
-            sample_templates = []
-            for template in templates:
-                sample_templates.append(template['id'])
+        return cls(path, data['destination_product'], data['updated_at'], data['ids'])
 
-            synchronizer = TemplatesSynchronizer(
-                self.config.active.client,
-                self.progress,
-                self.stats,
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(
+                {
+                    'destination_product': self.destination_product,
+                    'updated_at': self.updated_at,
+                    'ids': self.ids,
+                },
+                f,
+                indent=4,
             )
 
-            synchronizer.open(input_file, 'Templates')
-            synchronizer.sync()
-
-            for template in sample_templates:
-                try:
-                    self.config.active.client.products[product_id].templates[template].delete()
-                except ClientError:
-                    # done intentionally till fulfillment in progress template not on public api
-                    pass
-
-            synchronizer = ParamsSynchronizer(
-                self.config.active.client,
-                self.progress,
-                self.stats,
-            )
 
-            synchronizer.open(input_file, 'Ordering Parameters')
-            synchronizer.sync()
+class ProductCloner:
+    """
+    Clone a product by exporting it to a workbook kept in memory and synchronizing
+    that workbook to the new product. Nothing is written to disk: media files are
+    read from the source product as they are uploaded to the new one. If
+    `workbook_file` is given, the workbook synchronized to the new product is
+    saved there, to help debugging a clone. Up to `workers` resources are cloned
+    concurrently.
+
+    The source product is read once: `for_destination` returns cloners of the
+    same product to other accounts that reuse what `dump` read.
+
+    The IDs of the cloned resources are saved in a `CloneIdMap`. If `incremental`
+    is set, the product of the previous clone is updated instead of creating a new
+    one, with just the items, parameters, templates and actions of the source
+    product created or updated since then.
+    """
+
+    def __init__(
+        self,
+        config,
+        source_account,
+        destination_account,
+        product_id,
+        progress,
+        stats,
+        workbook_file=None,
+        workers=DEFAULT_WORKERS,
+        incremental=False,
+    ):
+        self.config = config
+        self.source_account = source_account if source_account else config.active.id
+        self.destination_account = destination_account if destination_account else config.active.id
+        self.product_id = product_id
+        self.stats = stats
+        self.progress = progress
+        self.workbook_file = workbook_file
+        self.workers = workers
+        self._sheet_workers = workers
+        self.incremental = incremental
+        self.id_map = None
+        self.destination_product = None
+        self.wb = None
+        self.media = RemoteMedia()
+        self._source_workbook = None
+        self._source_workbook_lock = threading.Lock()
+        self._source_ids = {}
+        self._source_updated_at = None
 
-            synchronizer.open(input_file, 'Fulfillment Parameters')
-            synchronizer.sync()
+    @property
+    def input_file(self):
+        return f'{self.product_id}.xlsx'
 
-            synchronizer.open(input_file, 'Configuration Parameters')
-            synchronizer.sync()
+    @property
+    def source_client(self):
+        return self.config.accounts[self.source_account].client
 
-            synchronizer = ActionsSynchronizer(
-                self.config.active.client,
-                self.progress,
-                self.stats,
-            )
+    @property
+    def destination_client(self):
+        return self.config.accounts[self.destination_account].client
 
-            synchronizer.open(input_file, 'Actions')
-            synchronizer.sync()
+    def dump(self, updated_since=None):
+        """
+        Export the source product. In incremental mode only what changed since the
+        previous clone, or since `updated_since` if given, is exported.
+        """
+        if self.incremental and not updated_since:
+            updated_since = self._get_id_map().updated_at
+        self.wb = export_product_workbook(
+            self.source_client,
+            self.product_id,
+            None,
+            self.progress,
+            remote_media=self.media,
+            updated_since=updated_since,
+        )
 
-            synchronizer = MediaSynchronizer(
-                self.config.active.client,
-                self.progress,
-                self.stats,
+    def _get_id_map(self):
+        if self.id_map is None:
+            self.id_map = CloneIdMap.load(self.config, self.product_id, self.destination_account)
+        return self.id_map
+
+    def for_destination(
+        self,
+        destination_account,
+        stats,
+        workbook_file=None,
+        incremental=False,
+        workers=None,
+    ):
+        """
+        Return a cloner of the dumped product to `destination_account` that works on
+        its own copy of the workbook and shares the media files, so the source product
+        is not read again. It must be called before the product is created. The cloner
+        uses `workers` threads, or as many as this one if not given.
+        """
+        cloner = ProductCloner(
+            self.config,
+            self.source_account,
+            destination_account,
+            self.product_id,
+            self.progress,
+            stats,
+            workbook_file=workbook_file,
+            workers=workers or self.workers,
+            incremental=incremental,
+        )
+        cloner.wb = load_workbook(BytesIO(self._get_source_workbook()))
+        cloner.media = self.media
+        return cloner
+
+    def _get_source_workbook(self):
+        with self._source_workbook_lock:
+            if self._source_workbook is None:
+                data = BytesIO()
+                self.wb.save(data)
+                self._source_workbook = data.getvalue()
+            return self._source_workbook
+
+    def inject(self):
+        """
+        Synchronize the cloned workbook to the new product. Each stage runs as soon
+        as the stages it depends on are done, so independent resources are created
+        concurrently, while their writes to the workbook are applied on this thread.
+        The `workers` are split between the stages and the rows of each stage.
+        The time every stage took is added to the clone stats.
+        In incremental mode only the items, parameters, templates and actions are
+        synchronized. The IDs of the cloned resources are saved afterwards.
+        """
+        try:
+            client = self.destination_client
+            session = WorkbookSession(self.input_file, workbook=self.wb, media=self.media)
+            if self.incremental:
+                stages = self._get_incremental_stages(client, session)
+            else:
+                stages = self._get_stages(client, session)
+            stage_workers, self._sheet_workers = split_workers(self.workers, len(stages))
+            self.stats.timings.update(
+                session.run(
+                    partial(
+                        run_dag,
+                        stages,
+                        stage_workers,
+                        self.progress,
+                        f'Cloning product to {self.destination_account}',
+                    ),
+                ),
             )
-
-            synchronizer.open(input_file, 'Media')
-            synchronizer.sync()
-
-            sync_product_translations(
-                self.config.active.client,
-                self.progress,
-                input_file,
-                self.stats,
-                save=False,
-                is_clone=True,
+        except ClientError as e:
+            raise ClickException(f'Error while cloning product: {str(e)}')
+        self._save_id_map()
+
+    def _get_stages(self, client, session):
+        return {
+            'General Information': (partial(self._inject_general, client, session), ()),
+            'Items': (partial(self._inject_items, client, session), ('General Information',)),
+            'Templates': (
+                partial(self._inject_templates, client, session),
+                ('General Information',),
+            ),
+            'Parameters': (
+                partial(self._inject_params, client, session),
+                ('General Information',),
+            ),
+            'Actions': (
+                partial(self._inject_sheet, ActionsSynchronizer, client, session, 'Actions'),
+                ('General Information',),
+            ),
+            'Media': (
+                partial(self._inject_sheet, MediaSynchronizer, client, session, 'Media'),
+                ('General Information',),
+            ),
+            'Messages': (
+                partial(self._inject_sheet, MessageSynchronizer, client, session, 'Messages'),
+                ('General Information',),
+            ),
+            'Translations': (
+                partial(
+                    sync_product_translations,
+                    client,
+                    self.progress,
+                    session,
+                    self.stats,
+                    save=False,
+                    is_clone=True,
+                ),
+                ('Items', 'Templates', 'Parameters', 'Actions', 'Media'),
+            ),
+        }
+
+    def _get_incremental_stages(self, client, session):
+        return {
+            'Items': (partial(self._inject_sheet, ItemSynchronizer, client, session, 'Items'), ()),
+            'Templates': (
+                partial(self._inject_sheet, TemplatesSynchronizer, client, session, 'Templates'),
+                (),
+            ),
+            'Parameters': (partial(self._inject_params, client, session), ()),
+            'Actions': (
+                partial(self._inject_sheet, ActionsSynchronizer, client, session, 'Actions'),
+                (),
+            ),
+        }
+
+    def _save_id_map(self):
+        if self.id_map is None:
+            self.id_map = CloneIdMap(
+                CloneIdMap.get_path(self.config, self.product_id, self.destination_account),
             )
+        self.id_map.destination_product = self.destination_product
+        for sheet, source_ids in self._source_ids.items():
+            ws = self.wb[sheet]
+            for row, source_id in source_ids.items():
+                destination_id = ws.cell(row, 1).value
+                if destination_id:
+                    self.id_map.ids[source_id] = destination_id
+        self.id_map.updated_at = max(
+            filter(None, (self.id_map.updated_at, self._source_updated_at)),
+            default=None,
+        )
+        self.id_map.save()
+
+    def _inject_general(self, client, session):
+        synchronizer = GeneralSynchronizer(client, None)
+        product_id = synchronizer.open(session, 'General Information')
+        document = ProductDocument(client, product_id)
+        synchronizer.sync(document)
+
+        synchronizer = CapabilitiesSynchronizer(
+            client,
+            self.progress,
+            self.stats,
+            document=document,
+        )
+        synchronizer.open(session, 'Capabilities')
+        synchronizer.sync()
+        document.save()
+
+    def _inject_items(self, client, session):
+        synchronizer = ItemSynchronizer(client, self.progress, self.stats, self._sheet_workers)
+        synchronizer.open(session, 'Items')
+        items = client.products[self._get_destination_product_id()].items
+        run_concurrently(
+            {item['id']: items[item['id']].delete for item in items.all()},
+            self._sheet_workers,
+        )
+        synchronizer.sync()
+
+    def _inject_templates(self, client, session):
+        synchronizer = TemplatesSynchronizer(client, self.progress, self.stats, self._sheet_workers)
+        synchronizer.open(session, 'Templates')
+        templates = client.products[self._get_destination_product_id()].templates
+        sample_templates = [template['id'] for template in templates.all()]
+        synchronizer.sync()
+
+        def delete_template(template_id):
+            try:
+                templates[template_id].delete()
+            except ClientError:
+                # done intentionally till fulfillment in progress template not on public api
+                pass
+
+        run_concurrently(
+            {template: partial(delete_template, template) for template in sample_templates},
+            self._sheet_workers,
+        )
 
-            synchronizer = MessageSynchronizer(
-                self.config.active.client,
-                self.progress,
-                self.stats,
-            )
-            synchronizer.open(input_file, 'Messages')
+    def _inject_params(self, client, session):
+        synchronizer = ParamsSynchronizer(client, self.progress, self.stats, self._sheet_workers)
+        for worksheet in (
+            'Ordering Parameters',
+            'Fulfillment Parameters',
+            'Configuration Parameters',
+        ):
+            synchronizer.open(session, worksheet)
             synchronizer.sync()
 
-            self.config.activate(self.source_account)
-        except ClientError as e:
-            raise ClickException(f'Error while cloning product: {str(e)}')
+    def _inject_sheet(self, synchronizer_class, client, session, worksheet):
+        synchronizer = synchronizer_class(client, self.progress, self.stats, self._sheet_workers)
+        synchronizer.open(session, worksheet)
+        synchronizer.sync()
 
-    def load_wb(self):
-        self.wb = load_workbook(
-            f'{self.fs.root_path}/{self.product_id}/{self.product_id}.xlsx',
-            data_only=True,
-        )
+    def _get_destination_product_id(self):
+        return self.wb['General Information']['B5'].value
 
     def create_product(self, name=None):
+        """
+        Create the product the source one is cloned to. In incremental mode the
+        product of the previous clone is used instead.
+        """
+        if self.incremental:
+            self.destination_product = self._get_id_map().destination_product
+            self.wb['General Information']['B5'].value = self.destination_product
+            return
         if not name:
             time = datetime.today().strftime('%Y-%m-%d-%H:%M:%S')
             name = f'Clone of {self.product_id} {time}'
         ws = self.wb['General Information']
         ws['B6'].value = name
-        self.config.activate(self.destination_account)
+        client = self.destination_client
 
         try:
-            category = self._get_cat_id(self.config.active.client, ws['B8'].value)
+            category = self._get_cat_id(client, ws['B8'].value)
             primary_locale_id = self._get_primary_locale_id(ws['B14'].value)
-            product = self.config.active.client.products.create(
+            product = client.products.create(
                 {
                     'name': name,
                     'category': {
@@ -187,11 +409,12 @@ class ProductCloner:
                 ws['B6'].value = name
             ws['B5'].value = product['id']
             self.destination_product = product['id']
-            self.wb.save(f'{self.fs.root_path}/{self.product_id}/{self.product_id}.xlsx')
         except ClientError as e:
             raise ClickException(f'Error on product creation: {str(e)}')
 
     def clean_wb(self):
+        self._read_source_ids()
+
         ws = self.wb['Capabilities']
         for row in range(2, 12):
             ws[f'B{row}'].value = 'update'
@@ -252,7 +475,54 @@ class ProductCloner:
             ws[f'A{row}'].value = ''
             ws[f'B{row}'].value = 'create'
 
-        self.wb.save(f'{self.fs.root_path}/{self.product_id}/{self.product_id}.xlsx')
+        if self.incremental:
+            self._apply_id_map()
+
+        if self.workbook_file:
+            self.wb.save(self.workbook_file)
+
+    def _read_source_ids(self):
+        """
+        Keep the IDs of the source resources by row, and the latest time any of them
+        was created or updated, before they are overwritten by the clone.
+        """
+        timestamps = []
+        for sheet in MAPPED_SHEETS:
+            ws = self.wb[sheet]
+            columns = [cell.column for cell in ws[1] if cell.value in ('Created', 'Modified')]
+            source_ids = {}
+            for row in range(2, ws.max_row + 1):
+                if ws.cell(row, 1).value:
+                    source_ids[row] = ws.cell(row, 1).value
+                    timestamps.extend(ws.cell(row, column).value for column in columns)
+            self._source_ids[sheet] = source_ids
+        self._source_updated_at = max(
+            filter(None, map(self._to_utc, timestamps)),
+            default=None,
+        )
+
+    def _apply_id_map(self):
+        id_map = self._get_id_map()
+        for sheet, source_ids in self._source_ids.items():
+            ws = self.wb[sheet]
+            for row, source_id in source_ids.items():
+                destination_id = id_map.ids.get(source_id)
+                if destination_id:
+                    ws[f'A{row}'].value = destination_id
+                    ws[f'C{row}'].value = 'update'
+
+    @staticmethod
+    def _to_utc(value):
+        if isinstance(value, str) and value.endswith('Z'):
+            # datetime.fromisoformat only parses the Z designator since Python 3.11
+            value = f'{value[:-1]}+00:00'
+        try:
+            timestamp = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+        if timestamp.tzinfo:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        return timestamp.isoformat(timespec='seconds')
 
     @staticmethod
     def _get_cat_id(client, category_name):
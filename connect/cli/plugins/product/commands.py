@@ -3,6 +3,7 @@
 # This file is part of the CloudBlue Connect connect-cli.
 # Copyright (c) 2019-2025 CloudBlue. All Rights Reserved.
 
+import os
 from functools import partial
 
 import click
@@ -12,7 +13,8 @@ from connect.client import ClientError, R
 from connect.cli.core import group
 from connect.cli.core.config import pass_config
 from connect.cli.core.terminal import console
-from connect.cli.plugins.product.clone import ProductCloner
+from connect.cli.plugins.product.clone import CloneIdMap, ProductCloner
+from connect.cli.plugins.product.constants import DEFAULT_WORKERS
 from connect.cli.plugins.product.export import dump_product
 from connect.cli.plugins.product.sync import (
     ActionsSynchronizer,
@@ -23,12 +25,15 @@ from connect.cli.plugins.product.sync import (
     MediaSynchronizer,
     MessageSynchronizer,
     ParamsSynchronizer,
+    ProductDocument,
     StaticResourcesSynchronizer,
     TemplatesSynchronizer,
 )
+from connect.cli.plugins.shared.base import WorkbookSession
 from connect.cli.plugins.shared.exceptions import SheetNotFoundError
-from connect.cli.plugins.shared.sync_stats import SynchronizerStats
+from connect.cli.plugins.shared.sync_stats import CombinedSynchronizerStats, SynchronizerStats
 from connect.cli.plugins.shared.translations_synchronizers import sync_product_translations
+from connect.cli.plugins.shared.utils import run_concurrently, split_workers
 
 
 @group(name='product', short_help='Manage product definitions.')
@@ -90,8 +95,22 @@ def cmd_list_products(config, query):
     type=click.Path(exists=True, file_okay=False, dir_okay=True),
     help='Directory where to store the export.',
 )
+@click.option(
+    '--workers',
+    '-w',
+    'workers',
+    type=click.IntRange(1),
+    default=DEFAULT_WORKERS,
+    help='Number of concurrent requests used to fetch the product.',
+)
+@click.option(
+    '--write-only',
+    'write_only',
+    is_flag=True,
+    help='Stream the rows to the excel file to reduce the memory used by large products.',
+)
 @pass_config
-def cmd_export_products(config, product_id, output_file, output_path):
+def cmd_export_products(config, product_id, output_file, output_path, workers, write_only):
     with console.progress() as progress:
         outfile = dump_product(
             config.active.client,
@@ -99,6 +118,8 @@ def cmd_export_products(config, product_id, output_file, output_path):
             output_file,
             progress,
             output_path,
+            workers,
+            write_only,
         )
 
     console.secho(
@@ -112,52 +133,98 @@ def cmd_export_products(config, product_id, output_file, output_path):
     short_help='Synchronize a product from an excel file.',
 )
 @click.argument('input_file', metavar='input_file', nargs=1, required=True)  # noqa: E304
+@click.option(
+    '--checkpoint',
+    '-k',
+    'checkpoint',
+    type=click.IntRange(1),
+    help='Save the input file every N synchronized sheets instead of only at the end.',
+)
+@click.option(
+    '--workers',
+    '-w',
+    'workers',
+    type=click.IntRange(1),
+    default=DEFAULT_WORKERS,
+    help='Number of rows of a sheet synchronized concurrently.',
+)
+@click.option(
+    '--plan',
+    'plan',
+    is_flag=True,
+    help='Show what would be created, updated or deleted without changing the product.',
+)
+@click.option(
+    '--skip-unchanged/--no-skip-unchanged',
+    'skip_unchanged',
+    default=True,
+    show_default=True,
+    help=(
+        'Skip the rows to update that are unchanged since the export or already match '
+        'the product, instead of updating them.'
+    ),
+)
 @pass_config
-def cmd_sync_products(config, input_file):
+def cmd_sync_products(config, input_file, checkpoint, workers, plan, skip_unchanged):
     if '.xlsx' not in input_file:
         input_file = f'{input_file}/{input_file}.xlsx'
 
-    synchronizer = GeneralSynchronizer(config.active.client, None)
-    product_id = synchronizer.open(input_file, 'General Information')
+    with WorkbookSession(input_file, checkpoint) as session:
+        synchronizer = GeneralSynchronizer(config.active.client, None)
+        product_id = synchronizer.open(session, 'General Information')
 
-    console.confirm(
-        f'Are you sure you want to synchronize the product {product_id} ?',
-        abort=True,
-    )
-    console.echo('')
-
-    with console.progress() as progress:
-        general_errors = synchronizer.sync()
-        if general_errors:
-            errors = '\n'.join(general_errors)
-            raise ClickException(
-                f'Error synchronizing general product information: {errors}',
+        if not plan:
+            console.confirm(
+                f'Are you sure you want to synchronize the product {product_id} ?',
+                abort=True,
             )
-
-        stats = SynchronizerStats(
-            header=f'Results of synchronizing {product_id}',
-        )
-
-        sync_tasks = [
-            item_sync,
-            capabilities_sync,
-            static_resources_sync,
-            templates_sync,
-            partial(params_sync, 'Ordering Parameters'),
-            partial(params_sync, 'Fulfillment Parameters'),
-            partial(params_sync, 'Configuration Parameters'),
-            actions_sync,
-            media_sync,
-            config_values_sync,
-            messages_sync,
-        ]
-        for task in sync_tasks:
-            try:
-                task(config.active.client, progress, input_file, stats)
-            except SheetNotFoundError as e:
-                console.secho(str(e), fg='blue')
-
-        sync_product_translations(config.active.client, progress, input_file, stats)
+            console.echo('')
+
+        with console.progress() as progress:
+            if plan:
+                stats = SynchronizerStats(
+                    operation='Plan',
+                    header=f'Plan of synchronizing {product_id}',
+                )
+            else:
+                stats = SynchronizerStats(
+                    header=f'Results of synchronizing {product_id}',
+                )
+                document = ProductDocument(config.active.client, product_id)
+                _raise_general_errors(synchronizer.sync(document))
+                for task in (capabilities_sync, static_resources_sync):
+                    try:
+                        task(config.active.client, progress, session, stats, document)
+                    except SheetNotFoundError as e:
+                        console.secho(str(e), fg='blue')
+                try:
+                    document.save()
+                except ClientError as e:
+                    stats['General Information'].error(
+                        f'Error while updating general product information: {str(e)}',
+                        1,
+                    )
+
+            options = {'workers': workers, 'plan': plan, 'skip_unchanged': skip_unchanged}
+            sync_tasks = [
+                partial(item_sync, **options),
+                partial(templates_sync, **options),
+                partial(params_sync, 'Ordering Parameters', **options),
+                partial(params_sync, 'Fulfillment Parameters', **options),
+                partial(params_sync, 'Configuration Parameters', **options),
+                partial(actions_sync, **options),
+                partial(media_sync, workers=workers, plan=plan),
+                partial(config_values_sync, plan=plan),
+                partial(messages_sync, **options),
+            ]
+            for task in sync_tasks:
+                try:
+                    task(config.active.client, progress, session, stats)
+                except SheetNotFoundError as e:
+                    console.secho(str(e), fg='blue')
+
+            if not plan:
+                sync_product_translations(config.active.client, progress, session, stats)
 
     stats.print()
 
@@ -176,8 +243,9 @@ def cmd_sync_products(config, input_file):
 @click.option(
     '--destination_account',
     '-d',
-    'destination_account',
-    help='Destination account ID',
+    'destination_accounts',
+    multiple=True,
+    help='Destination account ID, repeat it to clone the product to several accounts.',
 )
 @click.option(
     '--new-product-name',
@@ -185,8 +253,40 @@ def cmd_sync_products(config, input_file):
     'name',
     help='Cloned product name',
 )
+@click.option(
+    '--save-workbook',
+    'workbook_file',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Save the workbook the product is cloned from to this file, for debugging.',
+)
+@click.option(
+    '--workers',
+    '-w',
+    'workers',
+    type=click.IntRange(1),
+    default=DEFAULT_WORKERS,
+    help='Number of resources cloned concurrently.',
+)
+@click.option(
+    '--incremental',
+    '-i',
+    is_flag=True,
+    help=(
+        'Update the product of the previous clone with the items, parameters, templates '
+        'and actions changed since then.'
+    ),
+)
 @pass_config
-def cmd_clone_products(config, source_product_id, source_account, destination_account, name):
+def cmd_clone_products(
+    config,
+    source_product_id,
+    source_account,
+    destination_accounts,
+    name,
+    workbook_file,
+    workers,
+    incremental,
+):
     if not config.active.is_vendor():
         raise ClickException(
             'The clone command is only available for vendor accounts.',
@@ -195,11 +295,10 @@ def cmd_clone_products(config, source_product_id, source_account, destination_ac
         raise ClickException(
             f'New product name can not exceed 32 characters, provided as name {name}',
         )
-    if destination_account:
+    destination_accounts = list(dict.fromkeys(destination_accounts)) or [config.active.id]
+    for destination_account in destination_accounts:
         if not config.exists(destination_account):
             raise ClickException(f'The destination account {destination_account} does not exist.')
-    else:
-        destination_account = config.active.id
 
     if source_account:
         if not config.exists(source_account):
@@ -218,6 +317,40 @@ def cmd_clone_products(config, source_product_id, source_account, destination_ac
     except ClientError:
         raise ClickException(f'Product {source_product_id} does not exist')
 
+    if len(destination_accounts) == 1:
+        _clone_product(
+            config,
+            source_product_id,
+            source_account,
+            destination_accounts[0],
+            name,
+            workbook_file,
+            workers,
+            incremental,
+        )
+    else:
+        _clone_product_to_accounts(
+            config,
+            source_product_id,
+            source_account,
+            destination_accounts,
+            name,
+            workbook_file,
+            workers,
+            incremental,
+        )
+
+
+def _clone_product(
+    config,
+    source_product_id,
+    source_account,
+    destination_account,
+    name,
+    workbook_file,
+    workers,
+    incremental,
+):
     stats = SynchronizerStats(
         operation='Clone',
         header=f'Results of cloning {source_product_id}',
@@ -231,6 +364,9 @@ def cmd_clone_products(config, source_product_id, source_account, destination_ac
             product_id=source_product_id,
             progress=progress,
             stats=stats,
+            workbook_file=workbook_file,
+            workers=workers,
+            incremental=incremental,
         )
 
         status.update(
@@ -240,7 +376,6 @@ def cmd_clone_products(config, source_product_id, source_account, destination_ac
         )
 
         synchronizer.dump()
-        synchronizer.load_wb()
 
         status.update(
             f'Creating new Product on account {synchronizer.destination_account}',
@@ -273,61 +408,217 @@ def cmd_clone_products(config, source_product_id, source_account, destination_ac
     stats.print()
 
 
-def media_sync(client, progress, input_file, stats):
-    synchronizer = MediaSynchronizer(client, progress, stats)
+def _clone_product_to_accounts(
+    config,
+    source_product_id,
+    source_account,
+    destination_accounts,
+    name,
+    workbook_file,
+    workers,
+    incremental,
+):
+    """
+    Read the source product once and clone it to up to `workers` destination
+    accounts at the same time, each one through the client of its account. The
+    `workers` are split between the destinations, so at most `workers` threads are
+    used in total. A destination that fails is reported in the results and does not
+    stop the others.
+    In incremental mode, the source product is read since the earliest previous
+    clone to any of the destinations.
+    """
+    updated_since = None
+    if incremental:
+        watermarks = [
+            CloneIdMap.load(config, source_product_id, account).updated_at
+            for account in destination_accounts
+        ]
+        updated_since = None if None in watermarks else min(watermarks)
+    stats = CombinedSynchronizerStats(
+        destination_accounts,
+        operation='Clone',
+        header=f'Results of cloning {source_product_id}',
+        target_column='Account',
+    )
+    destination_products = {}
+
+    with console.status_progress() as (status, progress):
+        source = ProductCloner(
+            config=config,
+            source_account=source_account,
+            destination_account=None,
+            product_id=source_product_id,
+            progress=progress,
+            stats=None,
+            workers=workers,
+        )
+
+        status.update(
+            f'Dumping Product {source.product_id} from account {source.source_account}',
+            fg='blue',
+        )
+
+        source.dump(updated_since=updated_since)
+
+        status.update(
+            f'Cloning Product to accounts {", ".join(destination_accounts)}',
+            fg='blue',
+        )
+
+        destination_workers, cloner_workers = split_workers(workers, len(destination_accounts))
+
+        def clone(destination_account):
+            synchronizer = None
+            try:
+                synchronizer = source.for_destination(
+                    destination_account,
+                    stats[destination_account],
+                    workbook_file=_get_destination_workbook_file(
+                        workbook_file,
+                        destination_account,
+                    ),
+                    incremental=incremental,
+                    workers=cloner_workers,
+                )
+                synchronizer.create_product(name=name)
+                synchronizer.clean_wb()
+                synchronizer.inject()
+            except ClickException as e:
+                stats[destination_account]['Clone'].error(e.message)
+            except Exception as e:
+                stats[destination_account]['Clone'].error(f'{type(e).__name__}: {e}')
+            if synchronizer:
+                destination_products[destination_account] = synchronizer.destination_product
+
+        run_concurrently(
+            {account: partial(clone, account) for account in destination_accounts},
+            destination_workers,
+        )
+
+        status.update('Done', fg='green')
+    console.echo()
+    for destination_account in destination_accounts:
+        if destination_products.get(destination_account):
+            console.secho(
+                f'New product id {destination_products[destination_account]} '
+                f'on account {destination_account}',
+                fg='green',
+            )
+    console.echo()
+    stats.print()
+
+
+def _get_destination_workbook_file(workbook_file, destination_account):
+    if not workbook_file:
+        return None
+    base, ext = os.path.splitext(workbook_file)
+    return f'{base}_{destination_account}{ext}'
+
+
+def media_sync(client, progress, input_file, stats, workers=1, plan=False):
+    synchronizer = MediaSynchronizer(client, progress, stats, workers, plan)
     synchronizer.open(input_file, 'Media')
     synchronizer.sync()
     synchronizer.save(input_file)
 
 
-def actions_sync(client, progress, input_file, stats):
-    synchronizer = ActionsSynchronizer(client, progress, stats)
+def actions_sync(
+    client,
+    progress,
+    input_file,
+    stats,
+    workers=1,
+    plan=False,
+    skip_unchanged=False,
+):
+    synchronizer = ActionsSynchronizer(client, progress, stats, workers, plan, skip_unchanged)
     synchronizer.open(input_file, 'Actions')
     synchronizer.sync()
     synchronizer.save(input_file)
 
 
-def templates_sync(client, progress, input_file, stats):
-    synchronizer = TemplatesSynchronizer(client, progress, stats)
+def templates_sync(
+    client,
+    progress,
+    input_file,
+    stats,
+    workers=1,
+    plan=False,
+    skip_unchanged=False,
+):
+    synchronizer = TemplatesSynchronizer(client, progress, stats, workers, plan, skip_unchanged)
     synchronizer.open(input_file, 'Templates')
     synchronizer.sync()
     synchronizer.save(input_file)
 
 
-def params_sync(worksheet, client, progress, input_file, stats):
-    synchronizer = ParamsSynchronizer(client, progress, stats)
+def params_sync(
+    worksheet,
+    client,
+    progress,
+    input_file,
+    stats,
+    workers=1,
+    plan=False,
+    skip_unchanged=False,
+):
+    synchronizer = ParamsSynchronizer(client, progress, stats, workers, plan, skip_unchanged)
     synchronizer.open(input_file, worksheet)
     synchronizer.sync()
     synchronizer.save(input_file)
 
 
-def static_resources_sync(client, progress, input_file, stats):
-    synchronizer = StaticResourcesSynchronizer(client, progress, stats)
+def _raise_general_errors(general_errors):
+    if general_errors:
+        errors = '\n'.join(general_errors)
+        raise ClickException(
+            f'Error synchronizing general product information: {errors}',
+        )
+
+
+def static_resources_sync(client, progress, input_file, stats, document=None):
+    synchronizer = StaticResourcesSynchronizer(client, progress, stats, document=document)
     synchronizer.open(input_file, 'Embedding Static Resources')
     synchronizer.sync()
 
 
-def capabilities_sync(client, progress, input_file, stats):
-    synchronizer = CapabilitiesSynchronizer(client, progress, stats)
+def capabilities_sync(client, progress, input_file, stats, document=None):
+    synchronizer = CapabilitiesSynchronizer(client, progress, stats, document=document)
     synchronizer.open(input_file, 'Capabilities')
     synchronizer.sync()
 
 
-def config_values_sync(client, progress, input_file, stats):
-    synchronizer = ConfigurationValuesSynchronizer(client, progress, stats)
+def config_values_sync(client, progress, input_file, stats, plan=False):
+    synchronizer = ConfigurationValuesSynchronizer(client, progress, stats, plan)
     synchronizer.open(input_file, 'Configuration')
     synchronizer.sync()
 
 
-def item_sync(client, progress, input_file, stats):
-    synchronizer = ItemSynchronizer(client, progress, stats)
+def item_sync(
+    client,
+    progress,
+    input_file,
+    stats,
+    workers=1,
+    plan=False,
+    skip_unchanged=False,
+):
+    synchronizer = ItemSynchronizer(client, progress, stats, workers, plan, skip_unchanged)
     synchronizer.open(input_file, 'Items')
     synchronizer.sync()
     synchronizer.save(input_file)
 
 
-def messages_sync(client, progress, input_file, stats):
-    synchronizer = MessageSynchronizer(client, progress, stats)
+def messages_sync(
+    client,
+    progress,
+    input_file,
+    stats,
+    workers=1,
+    plan=False,
+    skip_unchanged=False,
+):
+    synchronizer = MessageSynchronizer(client, progress, stats, workers, plan, skip_unchanged)
     synchronizer.open(input_file, 'Messages')
     synchronizer.sync()
     synchronizer.save(input_file)
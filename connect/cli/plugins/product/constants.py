@@ -59,3 +59,6 @@ CAPABILITIES = (
     'Tier Accounts Sync',
     'Administrative Hold',
 )
+
+# Default number of concurrent HTTP calls issued by export and sync.
+DEFAULT_WORKERS = 4
@@ -4,12 +4,17 @@
 # Copyright (c) 2019-2025 CloudBlue. All Rights Reserved.
 
 import copy
+import hashlib
 import json
 import os
+import tempfile
+import threading
 from datetime import datetime
+from functools import partial
+from io import BytesIO
+from types import SimpleNamespace
 from urllib import parse
 
-import requests
 from click import ClickException
 from connect.client import ClientError, R
 from openpyxl import Workbook
@@ -18,29 +23,48 @@ from openpyxl.styles.colors import WHITE, Color
 from openpyxl.utils import quote_sheetname
 from openpyxl.worksheet.datavalidation import DataValidation
 
-from connect.cli.core.http import format_http_status, handle_http_error
+from connect.cli.core.http import format_http_status, get_session, handle_http_error
 from connect.cli.core.utils import validate_output_options
 from connect.cli.plugins.product.constants import (
     BILLING_PERIOD,
     COMMITMENT,
+    DEFAULT_WORKERS,
     PARAM_TYPES,
     PRECISIONS,
 )
 from connect.cli.plugins.product.utils import get_json_object_for_param
-from connect.cli.plugins.shared.export import alter_attributes_sheet, get_translation_workbook
+from connect.cli.plugins.shared.constants import (
+    ACTIONS_HEADERS,
+    ITEMS_COLS_HEADERS,
+    MESSAGES_HEADERS,
+    PARAMS_COLS_HEADERS,
+    ROW_HASHES_SHEET,
+    TEMPLATES_HEADERS,
+)
+from connect.cli.plugins.shared.export import (
+    StreamingWorksheet,
+    alter_attributes_sheet,
+    get_translation_workbook,
+    stream_worksheet,
+)
 from connect.cli.plugins.shared.utils import (
     fill_translation_row,
     get_col_headers_by_ws_type,
     get_col_limit_by_ws_type,
+    get_row_hash,
+    run_concurrently,
     setup_locale_data_validation,
 )
 
 
-def _setup_locales_list(ws, client):
+TOP_LEFT = Alignment(horizontal='left', vertical='top')
+WRAP_TEXT = Alignment(wrap_text=True)
+
+
+def _setup_locales_list(ws, locales):
     """
     Fill list of locales to use with DataValidation.
     """
-    locales = client.ns('localization').locales.all()
     locales_list = [f"{locale['id']} ({locale['name']})" for locale in locales]
     ws['AB1'].value = 'Locales'
     for idx, loc in enumerate(locales_list, 2):
@@ -55,7 +79,15 @@ def _primary_translation_str(trans):
     return f'{trans["locale"]["id"]} ({trans["locale"]["name"]})' if trans else ''
 
 
-def _setup_cover_sheet(ws, product, location, client, media_path):
+def _get_icon_file_name(product):
+    return f'{product["id"]}.{product["icon"].split(".")[-1]}'
+
+
+def _get_media_file_name(media):
+    return f'{media["id"]}.{media["thumbnail"].split(".")[-1]}'
+
+
+def _setup_cover_sheet(ws, product, primary_translation, categories):
     ws.title = 'General Information'
     ws.column_dimensions['A'].width = 50
     ws.column_dimensions['B'].width = 180
@@ -82,50 +114,24 @@ def _setup_cover_sheet(ws, product, location, client, media_path):
     ws['B8'].value = product['category']['name']
     ws['A9'].value = 'Product Icon file name'
     ws['A9'].font = Font(sz=14)
-    ws['B9'].value = f'{product["id"]}.{product["icon"].split(".")[-1]}'
-    _dump_image(
-        f'{location}{product["icon"]}',
-        f'{product["id"]}.{product["icon"].split(".")[-1]}',
-        media_path,
-    )
+    ws['B9'].value = _get_icon_file_name(product)
     ws['A10'].value = 'Product Short Description'
-    ws['A10'].alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ws['A10'].alignment = TOP_LEFT
     ws['B10'].value = product['short_description']
-    ws['B10'].alignment = Alignment(
-        wrap_text=True,
-    )
+    ws['B10'].alignment = WRAP_TEXT
     ws['A11'].value = 'Product Detailed Description'
-    ws['A11'].alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ws['A11'].alignment = TOP_LEFT
     ws['B11'].value = product['detailed_description']
-    ws['B11'].alignment = Alignment(
-        wrap_text=True,
-    )
+    ws['B11'].alignment = WRAP_TEXT
     ws['A12'].value = 'Embedding description'
     ws['B12'].value = product['customer_ui_settings']['description']
-    ws['B12'].alignment = Alignment(
-        wrap_text=True,
-    )
+    ws['B12'].alignment = WRAP_TEXT
     ws['A13'].value = 'Embedding getting started'
     ws['B13'].value = product['customer_ui_settings']['getting_started']
-    ws['B13'].alignment = Alignment(
-        wrap_text=True,
-    )
+    ws['B13'].alignment = WRAP_TEXT
     ws['A14'].value = 'Primary Translation Locale'
-    primary_translation = (
-        client.ns('localization')
-        .translations.filter(context__instance_id=product['id'], primary=True)
-        .first()
-    )
-
     ws['B14'].value = _primary_translation_str(primary_translation)
 
-    categories = client.categories.all()
     unassignable_cat = ['Cloud Services', 'All Categories']
     categories_list = [cat['name'] for cat in categories if cat['name'] not in unassignable_cat]
     ws['AA1'].value = 'Categories'
@@ -140,8 +146,31 @@ def _setup_cover_sheet(ws, product, location, client, media_path):
     categories_validation.add('B8')
 
 
+def _create_sheet(wb, title):
+    ws = wb.create_sheet(title)
+    if wb.write_only:
+        return StreamingWorksheet(ws)
+    return ws
+
+
+def _build_sheet(wb, title, fill):
+    """
+    Create a sheet and fill it with `fill(ws)`. Sheets of write-only workbooks
+    are filled in a scratch workbook first, since they don't allow random access.
+    """
+    if not wb.write_only:
+        ws = wb.create_sheet(title)
+        fill(ws)
+        return ws
+    ws = Workbook().active
+    ws.title = title
+    fill(ws)
+    stream_worksheet(ws, wb.create_sheet(title))
+    return ws
+
+
 def _dump_image(image_location, image_name, media_path):
-    image = requests.get(image_location)
+    image = get_session(image_location).get(image_location)
     if image.status_code == 200:
         with open(os.path.join(media_path, image_name), 'wb') as f:
             f.write(image.content)
@@ -149,6 +178,75 @@ def _dump_image(image_location, image_name, media_path):
         raise ClickException(f'Error obtaining image from {image_location}')
 
 
+class RemoteMedia:
+    """
+    Media files of a product that are read from their location when they are
+    opened instead of being downloaded to a folder. Each location is downloaded
+    only once, and files with the same content are kept only once: in memory if
+    they are up to `MEMORY_SIZE` bytes, or else in a temporary file.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    MEMORY_SIZE = 1024 * 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locations = {}
+        self._location_locks = {}
+        self._digests = {}
+        self._contents = {}
+        self._tmp_dir = None
+
+    def add(self, file_name, location):
+        self._locations[file_name] = location
+
+    def exists(self, file_name):
+        return file_name in self._locations
+
+    def open(self, file_name):
+        content = self._get_content(self._locations[file_name])
+        if isinstance(content, bytes):
+            return BytesIO(content)
+        return open(content, 'rb')
+
+    def _get_content(self, location):
+        with self._lock:
+            location_lock = self._location_locks.setdefault(location, threading.Lock())
+        with location_lock:
+            if location not in self._digests:
+                digest, content = self._download(location)
+                with self._lock:
+                    if digest in self._contents and not isinstance(content, bytes):
+                        os.remove(content)
+                    self._contents.setdefault(digest, content)
+                    self._digests[location] = digest
+            return self._contents[self._digests[location]]
+
+    def _download(self, location):
+        response = get_session(location).get(location, stream=True)
+        if response.status_code != 200:
+            raise ClickException(f'Error obtaining image from {location}')
+        digest = hashlib.sha256()
+        f = BytesIO()
+        for chunk in response.iter_content(self.CHUNK_SIZE):
+            digest.update(chunk)
+            if isinstance(f, BytesIO) and f.tell() + len(chunk) > self.MEMORY_SIZE:
+                f = self._spill(f)
+            f.write(chunk)
+        if isinstance(f, BytesIO):
+            return digest.hexdigest(), f.getvalue()
+        f.close()
+        return digest.hexdigest(), f.name
+
+    def _spill(self, buffer):
+        with self._lock:
+            if self._tmp_dir is None:
+                self._tmp_dir = tempfile.TemporaryDirectory(prefix='ccli-media-')
+        f = tempfile.NamedTemporaryFile(dir=self._tmp_dir.name, delete=False)
+        f.write(buffer.getvalue())
+        return f
+
+
 def _setup_ws_header(ws, ws_type=None):  # noqa: CCR001
     if not ws_type:
         ws_type = 'items'
@@ -215,147 +313,78 @@ def _calculate_commitment(item):
 
 
 def _fill_param_row(ws, row_idx, param):
-    ws.cell(row_idx, 1, value=param['id']).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 2, value=param['name']).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 3, value='-').alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 4, value=param['title']).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 5, value=param['description']).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 6, value=param['phase']).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 7, value=param['scope']).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 8, value=param['type']).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ws.cell(row_idx, 1, value=param['id']).alignment = TOP_LEFT
+    ws.cell(row_idx, 2, value=param['name']).alignment = TOP_LEFT
+    ws.cell(row_idx, 3, value='-').alignment = TOP_LEFT
+    ws.cell(row_idx, 4, value=param['title']).alignment = TOP_LEFT
+    ws.cell(row_idx, 5, value=param['description']).alignment = TOP_LEFT
+    ws.cell(row_idx, 6, value=param['phase']).alignment = TOP_LEFT
+    ws.cell(row_idx, 7, value=param['scope']).alignment = TOP_LEFT
+    ws.cell(row_idx, 8, value=param['type']).alignment = TOP_LEFT
     ws.cell(
         row_idx,
         9,
         value=param['constraints']['required'] if param['constraints']['required'] else '-',
-    ).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ).alignment = TOP_LEFT
     ws.cell(
         row_idx,
         10,
         value=param['constraints']['unique'] if param['constraints']['unique'] else '-',
-    ).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ).alignment = TOP_LEFT
     ws.cell(
         row_idx,
         11,
         value=param['constraints']['hidden'] if param['constraints']['hidden'] else '-',
-    ).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ).alignment = TOP_LEFT
     ws.cell(
         row_idx,
         12,
         value=get_json_object_for_param(param),
-    ).alignment = Alignment(
-        wrap_text=True,
-    )
+    ).alignment = WRAP_TEXT
     events = param.get('events', {})
     ws.cell(
         row_idx,
         13,
         value=events.get('created', {}).get('at', '-'),
-    ).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ).alignment = TOP_LEFT
     ws.cell(
         row_idx,
         14,
         value=events.get('updated', {}).get('at', '-'),
-    ).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ).alignment = TOP_LEFT
 
 
-def _fill_media_row(ws, row_idx, media, location, product, media_path):
+def _fill_media_row(ws, row_idx, media):
     ws.cell(row_idx, 1, value=media['position'])
     ws.cell(row_idx, 2, value=media['id'])
     ws.cell(row_idx, 3, value='-')
     ws.cell(row_idx, 4, value=media['type'])
-    ws.cell(row_idx, 5, value=f'{media["id"]}.{media["thumbnail"].split(".")[-1]}')
-    _dump_image(
-        f'{location}{media["thumbnail"]}',
-        f'{media["id"]}.{media["thumbnail"].split(".")[-1]}',
-        media_path,
-    )
+    ws.cell(row_idx, 5, value=_get_media_file_name(media))
     ws.cell(row_idx, 6, value='-' if media['type'] == 'image' else media['url'])
 
 
 def _fill_template_row(ws, row_idx, template):
-    ws.cell(row_idx, 1, value=template['id']).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 2, value=template['title']).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 3, value='-').alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 4, value=template['scope']).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ws.cell(row_idx, 1, value=template['id']).alignment = TOP_LEFT
+    ws.cell(row_idx, 2, value=template['title']).alignment = TOP_LEFT
+    ws.cell(row_idx, 3, value='-').alignment = TOP_LEFT
+    ws.cell(row_idx, 4, value=template['scope']).alignment = TOP_LEFT
     ws.cell(
         row_idx,
         5,
         value=template['type'] if 'type' in template else 'fulfillment',
-    ).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
-    ws.cell(row_idx, 6, value=template['body']).alignment = Alignment(
-        wrap_text=True,
-    )
+    ).alignment = TOP_LEFT
+    ws.cell(row_idx, 6, value=template['body']).alignment = WRAP_TEXT
     events = template.get('events', {})
     ws.cell(
         row_idx,
         7,
         value=events.get('created', {}).get('at', '-'),
-    ).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ).alignment = TOP_LEFT
     ws.cell(
         row_idx,
         8,
         value=events.get('updated', {}).get('at', '-'),
-    ).alignment = Alignment(
-        horizontal='left',
-        vertical='top',
-    )
+    ).alignment = TOP_LEFT
 
 
 def _fill_action_row(ws, row_idx, action):
@@ -391,7 +420,7 @@ def _fill_configuration_row(ws, row_idx, configuration, conf_id):
     if 'structured_value' in configuration:
         value = configuration['structured_value']
         value = json.dumps(value, indent=4, sort_keys=True)
-        ws.cell(row_idx, 9, value=value).alignment = Alignment(wrap_text=True)
+        ws.cell(row_idx, 9, value=value).alignment = WRAP_TEXT
     elif 'value' in configuration:
         ws.cell(row_idx, 9, value=configuration['value'])
     else:
@@ -432,13 +461,12 @@ def _calculate_configuration_id(configuration):
     return conf_id
 
 
-def _dump_actions(ws, client, product_id, progress):
+def _dump_actions(ws, actions, progress):
     _setup_ws_header(ws, 'actions')
 
     row_idx = 2
 
-    actions = client.products[product_id].actions.all()
-    count = actions.count()
+    count = len(actions)
 
     action_validation = DataValidation(
         type='list',
@@ -461,20 +489,20 @@ def _dump_actions(ws, client, product_id, progress):
     for action in actions:
         progress.update(task, description=f'Processing action {action["id"]}', advance=1)
         _fill_action_row(ws, row_idx, action)
-        action_validation.add(f'C{row_idx}')
-        scope_validation.add(f'G{row_idx}')
         row_idx += 1
 
+    if count > 0:
+        action_validation.add(f'C2:C{row_idx - 1}')
+        scope_validation.add(f'G2:G{row_idx - 1}')
     progress.update(task, completed=count)
 
 
-def _dump_configuration(ws, client, product_id, progress):
+def _dump_configuration(ws, configurations, progress):
     _setup_ws_header(ws, 'configurations')
 
     row_idx = 2
 
-    configurations = client.products[product_id].configurations.all()
-    count = configurations.count()
+    count = len(configurations)
 
     action_validation = DataValidation(
         type='list',
@@ -497,21 +525,18 @@ def _dump_configuration(ws, client, product_id, progress):
             advance=1,
         )
         _fill_configuration_row(ws, row_idx, configuration, conf_id)
-        action_validation.add(f'D{row_idx}')
         row_idx += 1
 
+    action_validation.add(f'D2:D{row_idx - 1}')
     progress.update(task, completed=count)
 
 
-def _dump_parameters(ws, client, product_id, param_type, progress):
+def _dump_parameters(ws, params, param_type, progress):
     _setup_ws_header(ws, 'params')
 
-    rql = R().phase.eq(param_type)
-
     row_idx = 2
 
-    params = client.products[product_id].parameters.filter(rql)
-    count = params.count()
+    count = len(params)
 
     if count == 0:
         # Product without params is strange, but may exist
@@ -557,26 +582,23 @@ def _dump_parameters(ws, client, product_id, param_type, progress):
             advance=1,
         )
         _fill_param_row(ws, row_idx, param)
-        action_validation.add(f'C{row_idx}')
         if param['phase'] == 'configuration':
             configuration_scope_validation.add(f'G{row_idx}')
         else:
             ordering_fulfillment_scope_validation.add(f'G{row_idx}')
-        type_validation.add(f'H{row_idx}')
-        bool_validation.add(f'I{row_idx}')
-        bool_validation.add(f'J{row_idx}')
-        bool_validation.add(f'K{row_idx}')
         row_idx += 1
 
+    action_validation.add(f'C2:C{row_idx - 1}')
+    type_validation.add(f'H2:H{row_idx - 1}')
+    bool_validation.add(f'I2:K{row_idx - 1}')
     progress.update(task, completed=count)
 
 
-def _dump_media(ws, client, product_id, media_location, media_path, progress):
+def _dump_media(ws, medias, progress):
     _setup_ws_header(ws, 'media')
     row_idx = 2
 
-    medias = client.products[product_id].media.all()
-    count = medias.count()
+    count = len(medias)
     action_validation = DataValidation(
         type='list',
         formula1='"-,create,update,delete"',
@@ -594,11 +616,12 @@ def _dump_media(ws, client, product_id, media_location, media_path, progress):
     task = progress.add_task('Processing media', total=count)
     for media in medias:
         progress.update(task, description=f'Processing media {media["id"]}', advance=1)
-        _fill_media_row(ws, row_idx, media, media_location, product_id, media_path)
-        action_validation.add(f'C{row_idx}')
-        type_validation.add(f'D{row_idx}')
+        _fill_media_row(ws, row_idx, media)
         row_idx += 1
 
+    if count > 0:
+        action_validation.add(f'C2:C{row_idx - 1}')
+        type_validation.add(f'D2:D{row_idx - 1}')
     progress.update(task, completed=count)
 
 
@@ -797,7 +820,7 @@ def _dump_capabilities(ws, product, progress):  # noqa: CCR001
     progress.update(task, advance=1)
 
 
-def _dump_templates(ws, client, product_id, progress):
+def _dump_templates(ws, templates, progress):
     _setup_ws_header(ws, 'templates')
 
     row_idx = 2
@@ -818,8 +841,7 @@ def _dump_templates(ws, client, product_id, progress):
         allow_blank=False,
     )
 
-    templates = client.products[product_id].templates.all()
-    count = templates.count()
+    count = len(templates)
 
     if count > 0:
         ws.add_data_validation(action_validation)
@@ -831,23 +853,23 @@ def _dump_templates(ws, client, product_id, progress):
     for template in templates:
         progress.update(task, description=f'Processing template {template["id"]}', advance=1)
         _fill_template_row(ws, row_idx, template)
-        action_validation.add(f'C{row_idx}')
-        scope_validation.add(f'D{row_idx}')
-        type_validation.add(f'E{row_idx}')
         row_idx += 1
 
+    if count > 0:
+        action_validation.add(f'C2:C{row_idx - 1}')
+        scope_validation.add(f'D2:D{row_idx - 1}')
+        type_validation.add(f'E2:E{row_idx - 1}')
     progress.update(task, completed=count)
 
 
-def _dump_items(ws, client, product_id, progress):
+def _dump_items(ws, items, product_id, progress, updated_since=None):
     _setup_ws_header(ws, 'items')
 
     row_idx = 2
 
-    items = client.products[product_id].items.all()
-    count = items.count()
+    count = len(items)
 
-    if count == 0:
+    if count == 0 and not updated_since:
         raise ClickException(f'The product {product_id} doesn\'t have items.')
 
     action_validation = DataValidation(
@@ -889,27 +911,25 @@ def _dump_items(ws, client, product_id, progress):
     for item in items:
         progress.update(task, description=f'Processing item {item["id"]}', advance=1)
         _fill_item_row(ws, row_idx, item)
-        action_validation.add(f'C{row_idx}')
-        type_validation.add(f'F{row_idx}')
-        precision_validation.add(f'G{row_idx}')
-        period_validation.add(f'I{row_idx}')
-        commitment_validation.add(f'J{row_idx}')
         row_idx += 1
 
+    if count:
+        action_validation.add(f'C2:C{row_idx - 1}')
+        type_validation.add(f'F2:F{row_idx - 1}')
+        precision_validation.add(f'G2:G{row_idx - 1}')
+        period_validation.add(f'I2:I{row_idx - 1}')
+        commitment_validation.add(f'J2:J{row_idx - 1}')
     progress.update(task, completed=count)
 
 
-def _dump_translations(wb, client, product_id, progress):
-    ws = wb.create_sheet('Translations')
+def _dump_translations(wb, general_ws, translations, attributes, progress):
+    ws = _create_sheet(wb, 'Translations')
     _setup_ws_header(ws, 'translations')
     ws.column_dimensions['F'].width = 30
     ws.column_dimensions['J'].width = 15
     ws.column_dimensions['K'].width = 15
 
-    rql = R().context.instance_id.eq(product_id)
-
-    translations = client.ns('localization').translations.filter(rql)
-    count = translations.count()
+    count = len(translations)
 
     action_validation = DataValidation(
         type='list',
@@ -940,21 +960,23 @@ def _dump_translations(wb, client, product_id, progress):
         else:
             action_validation.add(ws[f'B{row_idx}'])
         disabled_enabled.add(ws[f'I{row_idx}'])
-        _dump_translation_attr(wb, client, translation)
+        _dump_translation_attr(wb, translation, attributes[translation['id']])
 
-    setup_locale_data_validation(wb['General Information'], ws)
+    if translations:
+        setup_locale_data_validation(general_ws, ws)
     progress.update(task, completed=count)
 
 
-def _dump_translation_attr(wb, client, translation):
-    external_wb = get_translation_workbook(client, translation['id'])
-    attr_ws = wb.create_sheet(f'{translation["locale"]["id"]} ({translation["id"]})')
-    for row in external_wb['Attributes']:
-        for cell in row:
-            attr_ws[cell.coordinate].value = cell.value
-            attr_ws[cell.coordinate].alignment = copy.copy(cell.alignment)
-    alter_attributes_sheet(attr_ws)
-    _setup_ws_header(attr_ws, '_attributes')
+def _dump_translation_attr(wb, translation, external_wb):
+    def fill(attr_ws):
+        for row in external_wb['Attributes']:
+            for cell in row:
+                attr_ws[cell.coordinate].value = cell.value
+                attr_ws[cell.coordinate].alignment = copy.copy(cell.alignment)
+        alter_attributes_sheet(attr_ws)
+        _setup_ws_header(attr_ws, '_attributes')
+
+    _build_sheet(wb, f'{translation["locale"]["id"]} ({translation["id"]})', fill)
 
 
 def _fill_product_message_row(ws, row_idx, msg):
@@ -965,13 +987,12 @@ def _fill_product_message_row(ws, row_idx, msg):
     ws.cell(row_idx, 5, value=msg['auto'])
 
 
-def _dump_product_messages(ws, client, product_id, progress):
+def _dump_product_messages(ws, messages, progress):
     _setup_ws_header(ws, 'messages')
 
     row_idx = 2
 
-    messages = client.products[product_id].messages.all()
-    count = messages.count()
+    count = len(messages)
 
     action_validation = DataValidation(
         type='list',
@@ -987,80 +1008,220 @@ def _dump_product_messages(ws, client, product_id, progress):
     for msg in messages:
         progress.update(task, description=f'Processing message {msg["id"]}', advance=1)
         _fill_product_message_row(ws, row_idx, msg)
-        action_validation.add(f'B{row_idx}')
         row_idx += 1
 
+    if count > 0:
+        action_validation.add(f'B2:B{row_idx - 1}')
     progress.update(task, completed=count)
 
 
-def dump_product(  # noqa: CCR001
+class _RowRecorder:
+    """
+    Stand-in for a worksheet that records the values a `_fill_*_row` function
+    writes to a row.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def cell(self, row, column, value=None):
+        self.values[column] = value
+        return SimpleNamespace()
+
+
+def _get_exported_row_hash(fill, obj, headers):
+    recorder = _RowRecorder()
+    fill(recorder, 2, obj)
+    return get_row_hash(
+        recorder.values.get(col_idx)
+        for col_idx, header in enumerate(headers.values(), start=1)
+        if header != 'Action'
+    )
+
+
+def _dump_row_hashes(wb, data):
+    """
+    Store in a hidden sheet the hash of every exported row, but its action, of
+    the sheets whose unchanged rows can be skipped by the synchronization.
+    """
+    ws = wb.create_sheet(ROW_HASHES_SHEET)
+    ws.sheet_state = 'hidden'
+    ws.append(['Sheet', 'Hash'])
+    sheets = (
+        ('Templates', _fill_template_row, TEMPLATES_HEADERS, data['templates']),
+        ('Items', _fill_item_row, ITEMS_COLS_HEADERS, data['items']),
+        ('Ordering Parameters', _fill_param_row, PARAMS_COLS_HEADERS, data['ordering']),
+        ('Fulfillment Parameters', _fill_param_row, PARAMS_COLS_HEADERS, data['fulfillment']),
+        ('Configuration Parameters', _fill_param_row, PARAMS_COLS_HEADERS, data['configuration']),
+        ('Actions', _fill_action_row, ACTIONS_HEADERS, data['actions']),
+        ('Messages', _fill_product_message_row, MESSAGES_HEADERS, data['messages']),
+    )
+    for title, fill, headers, objects in sheets:
+        for obj in objects:
+            ws.append([title, _get_exported_row_hash(fill, obj, headers)])
+
+
+def _fetch_product_data(  # noqa: CCR001
+    client,
+    product,
+    media_location,
+    media_path,
+    progress,
+    workers,
+    remote_media=None,
+    updated_since=None,
+):
+    """
+    Fetch concurrently every collection of the product that is exported and then
+    the media files and translation attributes they reference, so that the sheets
+    can be written afterwards without any further network round trip. If
+    `remote_media` is given, the media files are added to it instead of being
+    downloaded. If `updated_since` is given, only the items, parameters, templates
+    and actions created or updated since then are fetched, and the media,
+    configurations, translations and messages are not.
+    """
+    product_id = product['id']
+    product_rs = client.products[product_id]
+    localization = client.ns('localization')
+
+    def fetch_changes(collection, query=None):
+        if updated_since:
+            changed = R().events.updated.at.ge(updated_since) | R().events.created.at.ge(
+                updated_since,
+            )
+            query = query & changed if query else changed
+        return lambda: list(collection.filter(query) if query else collection.all())
+
+    def fetch_unless_incremental(fetch):
+        return (lambda: []) if updated_since else fetch
+
+    data = run_concurrently(
+        {
+            'locales': lambda: list(localization.locales.all()),
+            'categories': lambda: list(client.categories.all()),
+            'primary_translation': lambda: localization.translations.filter(
+                context__instance_id=product_id,
+                primary=True,
+            ).first(),
+            'media': fetch_unless_incremental(lambda: list(product_rs.media.all())),
+            'templates': fetch_changes(product_rs.templates),
+            'items': fetch_changes(product_rs.items),
+            'ordering': fetch_changes(product_rs.parameters, R().phase.eq('ordering')),
+            'fulfillment': fetch_changes(product_rs.parameters, R().phase.eq('fulfillment')),
+            'configuration': fetch_changes(product_rs.parameters, R().phase.eq('configuration')),
+            'actions': fetch_changes(product_rs.actions),
+            'configurations': fetch_unless_incremental(
+                lambda: list(product_rs.configurations.all()),
+            ),
+            'translations': fetch_unless_incremental(
+                lambda: list(
+                    localization.translations.filter(R().context.instance_id.eq(product_id)),
+                ),
+            ),
+            'messages': fetch_unless_incremental(lambda: list(product_rs.messages.all())),
+        },
+        workers,
+        progress,
+        'Fetching product data',
+    )
+
+    def download_image(location, name):
+        if remote_media is not None:
+            return partial(remote_media.add, name, f'{media_location}{location}')
+        return lambda: _dump_image(f'{media_location}{location}', name, media_path)
+
+    def fetch_attributes(translation_id):
+        return lambda: get_translation_workbook(client, translation_id)
+
+    downloads = {('icon',): download_image(product['icon'], _get_icon_file_name(product))}
+    for media in data['media']:
+        downloads[('media', media['id'])] = download_image(
+            media['thumbnail'],
+            _get_media_file_name(media),
+        )
+    for translation in data['translations']:
+        downloads[('attributes', translation['id'])] = fetch_attributes(translation['id'])
+
+    results = run_concurrently(downloads, workers, progress, 'Downloading media and attributes')
+    data['attributes'] = {key[1]: value for key, value in results.items() if key[0] == 'attributes'}
+    return data
+
+
+def export_product_workbook(
     client,
     product_id,
-    output_file,
+    media_path,
     progress,
-    output_path=None,
+    workers=DEFAULT_WORKERS,
+    write_only=False,
+    remote_media=None,
+    updated_since=None,
 ):
-    output_file = validate_output_options(output_path, output_file, default_dir_name=product_id)
-    media_path = os.path.join(os.path.dirname(output_file), 'media')
-    if not os.path.exists(media_path):
-        os.mkdir(media_path)
+    """
+    Build the Excel workbook of a product in memory, downloading its icon and
+    media files to `media_path` or, if `remote_media` is given, adding them to it.
+    If `updated_since` is given, the workbook only has the items, parameters,
+    templates and actions created or updated since then.
+    """
     try:
         product = client.products[product_id].get()
-        wb = Workbook()
-
-        _setup_locales_list(wb.active, client)
 
         connect_api_location = parse.urlparse(client.endpoint)
         media_location = f'{connect_api_location.scheme}://{connect_api_location.netloc}'
-        _setup_cover_sheet(
-            wb.active,
-            product,
-            media_location,
+        data = _fetch_product_data(
             client,
-            media_path,
-        )
-        _dump_capabilities(wb.create_sheet('Capabilities'), product, progress)
-        _dump_external_static_links(
-            wb.create_sheet('Embedding Static Resources'),
             product,
-            progress,
-        )
-        _dump_media(
-            wb.create_sheet('Media'),
-            client,
-            product_id,
             media_location,
             media_path,
             progress,
+            workers,
+            remote_media,
+            updated_since,
         )
-        _dump_templates(wb.create_sheet('Templates'), client, product_id, progress)
-        _dump_items(wb.create_sheet('Items'), client, product_id, progress)
-        _dump_parameters(
-            wb.create_sheet('Ordering Parameters'),
-            client,
-            product_id,
-            'ordering',
-            progress,
+
+        wb = Workbook(write_only=write_only)
+
+        def setup_cover_sheet(ws):
+            _setup_locales_list(ws, data['locales'])
+            _setup_cover_sheet(ws, product, data['primary_translation'], data['categories'])
+
+        if write_only:
+            general_ws = _build_sheet(wb, 'General Information', setup_cover_sheet)
+        else:
+            general_ws = wb.active
+            setup_cover_sheet(general_ws)
+        _build_sheet(
+            wb,
+            'Capabilities',
+            lambda ws: _dump_capabilities(ws, product, progress),
         )
-        _dump_parameters(
-            wb.create_sheet('Fulfillment Parameters'),
-            client,
-            product_id,
-            'fulfillment',
+        _dump_external_static_links(
+            _create_sheet(wb, 'Embedding Static Resources'),
+            product,
             progress,
         )
-        _dump_parameters(
-            wb.create_sheet('Configuration Parameters'),
-            client,
+        _dump_media(_create_sheet(wb, 'Media'), data['media'], progress)
+        _dump_templates(_create_sheet(wb, 'Templates'), data['templates'], progress)
+        _dump_items(
+            _create_sheet(wb, 'Items'),
+            data['items'],
             product_id,
-            'configuration',
             progress,
+            updated_since,
         )
-        _dump_actions(wb.create_sheet('Actions'), client, product_id, progress)
-        _dump_configuration(wb.create_sheet('Configuration'), client, product_id, progress)
-        _dump_translations(wb, client, product_id, progress)
-        _dump_product_messages(wb.create_sheet('Messages'), client, product_id, progress)
-        wb.save(output_file)
+        for param_type in ('ordering', 'fulfillment', 'configuration'):
+            _dump_parameters(
+                _create_sheet(wb, f'{param_type.capitalize()} Parameters'),
+                data[param_type],
+                param_type,
+                progress,
+            )
+        _dump_actions(_create_sheet(wb, 'Actions'), data['actions'], progress)
+        _dump_configuration(_create_sheet(wb, 'Configuration'), data['configurations'], progress)
+        _dump_translations(wb, general_ws, data['translations'], data['attributes'], progress)
+        _dump_product_messages(_create_sheet(wb, 'Messages'), data['messages'], progress)
+        _dump_row_hashes(wb, data)
+        return wb
 
     except ClientError as error:
         status = format_http_status(error.status_code)
@@ -1069,4 +1230,26 @@ def dump_product(  # noqa: CCR001
 
         handle_http_error(error)
 
+
+def dump_product(
+    client,
+    product_id,
+    output_file,
+    progress,
+    output_path=None,
+    workers=DEFAULT_WORKERS,
+    write_only=False,
+):
+    """
+    Export a product to an Excel workbook. With `write_only` the rows of each
+    sheet are streamed to the file as they are written instead of being kept
+    in memory until the workbook is saved, which bounds the memory needed to
+    export products with a large number of items, parameters or translations.
+    """
+    output_file = validate_output_options(output_path, output_file, default_dir_name=product_id)
+    media_path = os.path.join(os.path.dirname(output_file), 'media')
+    if not os.path.exists(media_path):
+        os.mkdir(media_path)
+    wb = export_product_workbook(client, product_id, media_path, progress, workers, write_only)
+    wb.save(output_file)
     return output_file
@@ -3,7 +3,10 @@ from connect.cli.plugins.product.sync.capabilities import CapabilitiesSynchroniz
 from connect.cli.plugins.product.sync.configuration_values import (  # noqa: F401
     ConfigurationValuesSynchronizer,
 )
-from connect.cli.plugins.product.sync.general import GeneralSynchronizer  # noqa: F401
+from connect.cli.plugins.product.sync.general import (  # noqa: F401
+    GeneralSynchronizer,
+    ProductDocument,
+)
 from connect.cli.plugins.product.sync.items import ItemSynchronizer  # noqa: F401
 from connect.cli.plugins.product.sync.media import MediaSynchronizer  # noqa: F401
 from connect.cli.plugins.product.sync.messages import MessageSynchronizer  # noqa: F401
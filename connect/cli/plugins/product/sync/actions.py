@@ -4,6 +4,7 @@
 # Copyright (c) 2025 CloudBlue. All rights reserved.
 
 import re
+import threading
 from collections import namedtuple
 from functools import partial
 
@@ -19,79 +20,108 @@ _RowData = namedtuple('RowData', fields)
 
 
 class ActionsSynchronizer(ProductSynchronizer):
-    def __init__(self, client, progress, stats):
-        super().__init__(client, progress)
+    def __init__(self, client, progress, stats, workers=1, plan=False, skip_unchanged=False):
+        super().__init__(client, progress, workers, plan, skip_unchanged)
         self._mstats = stats['Actions']
+        self._actions = None
+        self._actions_lock = threading.Lock()
 
-    def sync(self):  # noqa: CCR001
+    def sync(self):
         ws = self._wb['Actions']
         task = self._progress.add_task('Processing action', total=ws.max_row - 1)
-        actions = self._get_actions()
+        self._execute_rows(task, self._iter_rows(ws, task))
+        self._progress.update(task, completed=ws.max_row - 1)
+
+    def _iter_rows(self, ws, task):
         for row_idx in range(2, ws.max_row + 1):
             data = _RowData(*[ws.cell(row_idx, col_idx).value for col_idx in range(1, 10)])
-            self._progress.update(
-                task,
-                description=f'Processing action {data.verbose_id or data.id}',
-                advance=1,
-            )
-            if data.action == '-':
-                self._mstats.skipped()
-                continue
-            row_errors = self._validate_row(data)
-
-            if row_errors:
-                self._mstats.error(row_errors, row_idx)
-                continue
-
-            if data.action == 'delete':
-                try:
-                    self._client.products[self._product_id].actions[data.verbose_id].delete()
-                    self._update_sheet_row(ws, row_idx, action='delete')
-                    self._mstats.deleted()
-                except ClientError as e:
-                    if e.status_code == 404:
-                        self._mstats.deleted()
-                        continue
-                    self._mstats.error(str(e), row_idx)
-                    continue
-
-            payload = {
-                'action': data.id,
-                'type': 'button',
-                'scope': data.scope,
-                'description': data.description,
-                'title': data.title,
-            }
-
-            if data.action == 'update':
-                try:
-                    action = (
-                        self._client.products[self._product_id]
-                        .actions[data.verbose_id]
-                        .update(payload)
-                    )
-                    self._update_sheet_row(ws, row_idx, action)
-                    self._mstats.updated()
-                except Exception as e:
-                    self._mstats.error(str(e), row_idx)
-
-            if data.action == 'create':
-                try:
-
-                    def _check_if_matches(data, x):
-                        return x['action'] == data.id
-
-                    original_action = list(filter(partial(_check_if_matches, data), actions))
-                    if original_action:
-                        self._updated_or_skipped(ws, row_idx, original_action[0], payload)
-                        continue
-                    payload['name'] = data.name
-                    action = self._client.products[self._product_id].actions.create(payload)
-                    self._update_sheet_row(ws, row_idx, action)
-                    self._mstats.created()
-                except ClientError as e:
-                    self._mstats.error(str(e), row_idx)
-        self._progress.update(task, completed=ws.max_row - 1)
+            yield data.id, partial(self._sync_row, ws, task, row_idx, data)
+
+    def _sync_row(self, ws, task, row_idx, data):  # noqa: CCR001
+        self._progress.update(
+            task,
+            description=f'Processing action {data.verbose_id or data.id}',
+        )
+        if data.action == '-':
+            return self._mstats.skipped
+        row_errors = self._validate_row(data)
+
+        if row_errors:
+            return partial(self._mstats.error, row_errors, row_idx)
+        if data.action == 'update' and self._is_unchanged_since_export(data):
+            return self._mstats.unchanged
+
+        if data.action == 'delete':
+            if self._plan:
+                return self._mstats.deleted
+            try:
+                self._client.products[self._product_id].actions[data.verbose_id].delete()
+            except ClientError as e:
+                if e.status_code == 404:
+                    return self._mstats.deleted
+                return partial(self._mstats.error, str(e), row_idx)
+
+            def record_deleted():
+                self._update_sheet_row(ws, row_idx, action='delete')
+                self._mstats.deleted()
+
+            return record_deleted
+
+        payload = {
+            'action': data.id,
+            'type': 'button',
+            'scope': data.scope,
+            'description': data.description,
+            'title': data.title,
+        }
+
+        if data.action == 'update':
+            if self._skip_unchanged:
+                original = next(
+                    (a for a in self._get_actions() if a['id'] == data.verbose_id),
+                    None,
+                )
+                if original and self._is_unchanged(original, payload):
+                    return self._mstats.unchanged
+            if self._plan:
+                return self._mstats.updated
+            try:
+                action = (
+                    self._client.products[self._product_id].actions[data.verbose_id].update(payload)
+                )
+            except Exception as e:
+                return partial(self._mstats.error, str(e), row_idx)
+            return partial(self._record_updated, ws, row_idx, action)
+
+        if data.action == 'create':
+            try:
+
+                def _check_if_matches(data, x):
+                    return x['action'] == data.id
+
+                original_action = list(
+                    filter(partial(_check_if_matches, data), self._get_actions())
+                )
+                if original_action:
+                    return self._updated_or_skipped(ws, row_idx, original_action[0], payload)
+                if self._plan:
+                    return self._mstats.created
+                payload['name'] = data.name
+                action = self._client.products[self._product_id].actions.create(payload)
+            except ClientError as e:
+                return partial(self._mstats.error, str(e), row_idx)
+            with self._actions_lock:
+                self._actions.append(action)
+
+            def record_created():
+                self._update_sheet_row(ws, row_idx, action)
+                self._mstats.created()
+
+            return record_created
+
+    def _record_updated(self, ws, row_idx, action):
+        self._update_sheet_row(ws, row_idx, action)
+        self._mstats.updated()
 
     @staticmethod
     def _update_sheet_row(ws, row_idx, action=None):
@@ -139,20 +169,27 @@ class ActionsSynchronizer(ProductSynchronizer):
         return errors
 
     def _get_actions(self):
-        return (self._client.products[self._product_id].actions).all()
+        with self._actions_lock:
+            if self._actions is None:
+                self._actions = list(self._client.products[self._product_id].actions.all())
+            return self._actions
 
     def _updated_or_skipped(self, ws, row_idx, original, payload):
         original_filter = {k: v for k, v in original.items() if k in payload.keys()}
         if original_filter == payload:
-            self._update_sheet_row(ws, row_idx)
-            self._mstats.skipped()
-        else:
-            action = (
-                self._client.products[self._product_id]
-                .actions[original['id']]
-                .update(
-                    payload,
-                )
+
+            def record_skipped():
+                self._update_sheet_row(ws, row_idx)
+                self._mstats.skipped()
+
+            return record_skipped
+        if self._plan:
+            return self._mstats.updated
+        action = (
+            self._client.products[self._product_id]
+            .actions[original['id']]
+            .update(
+                payload,
             )
-            self._update_sheet_row(ws, row_idx, action)
-            self._mstats.updated()
+        )
+        return partial(self._record_updated, ws, row_idx, action)
@@ -1,7 +1,8 @@
 from collections import namedtuple
+from functools import partial
 
 from connect.cli.plugins.product.constants import CAPABILITIES
-from connect.cli.plugins.product.utils import cleanup_product_for_update
+from connect.cli.plugins.product.sync.general import ProductDocument
 from connect.cli.plugins.shared.base import ProductSynchronizer
 from connect.cli.plugins.shared.constants import CAPABILITIES_COLS_HEADERS
 
@@ -12,14 +13,17 @@ _RowData = namedtuple('RowData', fields)
 
 
 class CapabilitiesSynchronizer(ProductSynchronizer):
-    def __init__(self, client, progress, stats):
+    def __init__(self, client, progress, stats, document=None):
         super().__init__(client, progress)
         self._mstats = stats['Capabilities']
+        self._document = document
 
     def sync(self):  # noqa: CCR001
         ws = self._wb['Capabilities']
+        document = self._document or ProductDocument(self._client, self._product_id)
 
         task = self._progress.add_task('Processing Product capabilities', total=ws.max_row - 1)
+        updated_rows = []
         for row_idx in range(2, ws.max_row + 1):
             data = _RowData(*[ws.cell(row_idx, col_idx).value for col_idx in range(1, 4)])
             self._progress.update(
@@ -36,7 +40,7 @@ class CapabilitiesSynchronizer(ProductSynchronizer):
                 self._mstats.error(row_errors, row_idx)
                 continue
 
-            product = cleanup_product_for_update(self._client.products[self._product_id].get())
+            product = document.product
 
             if data.action == 'update':
                 update = True
@@ -169,12 +173,26 @@ class CapabilitiesSynchronizer(ProductSynchronizer):
                                 'inquiring_validation'
                             ] = False
                     if update:
-                        self._client.products[self._product_id].update(product)
-                    self._mstats.updated()
+                        document.modified()
+                    updated_rows.append(row_idx)
 
                 except Exception as e:
                     self._mstats.error(str(e), row_idx)
         self._progress.update(task, completed=ws.max_row - 1)
+        document.on_save(partial(self._record_saved, updated_rows))
+        if self._document is None:
+            try:
+                document.save()
+            except Exception:
+                # Already recorded against the rows by _record_saved.
+                pass
+
+    def _record_saved(self, rows, error):
+        for row_idx in rows:
+            if error:
+                self._mstats.error(str(error), row_idx)
+            else:
+                self._mstats.updated()
 
     @staticmethod
     def _validate_row(data):
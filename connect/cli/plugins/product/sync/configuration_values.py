@@ -12,8 +12,8 @@ _RowData = namedtuple('RowData', fields)
 
 
 class ConfigurationValuesSynchronizer(ProductSynchronizer):
-    def __init__(self, client, progress, stats):
-        super().__init__(client, progress)
+    def __init__(self, client, progress, stats, plan=False):
+        super().__init__(client, progress, plan=plan)
         self._mstats = stats['Configuration']
 
     def sync(self):  # noqa: CCR001
@@ -57,6 +57,13 @@ class ConfigurationValuesSynchronizer(ProductSynchronizer):
                 except Exception:
                     payload['value'] = str(data.value)
 
+            if self._plan:
+                if data.action == 'delete':
+                    self._mstats.deleted()
+                else:
+                    self._mstats.updated()
+                continue
+
             try:
                 self._client.products[self._product_id].configurations.create(payload)
                 if data.action == 'delete':
@@ -1,5 +1,6 @@
 import json
-import os
+import threading
+import weakref
 from mimetypes import guess_type
 
 from click import ClickException
@@ -9,15 +10,87 @@ from connect.cli.plugins.product.utils import cleanup_product_for_update
 from connect.cli.plugins.shared.base import ProductSynchronizer
 
 
+_categories = weakref.WeakKeyDictionary()
+_categories_lock = threading.Lock()
+
+
+class ProductDocument:
+    """
+    Product changed by the General Information, Capabilities and Embedding Static
+    Resources sheets. The product is fetched once, the synchronizers of these sheets
+    apply their changes to it in memory and it is updated with a single request
+    when saved. The synchronizers record the outcome of their rows once it is saved
+    through the callbacks registered with `on_save`.
+    """
+
+    def __init__(self, client, product_id):
+        self._client = client
+        self._product_id = product_id
+        self._product = None
+        self._icon = None
+        self._modified = False
+        self._callbacks = []
+
+    @property
+    def product(self):
+        if self._product is None:
+            self._product = cleanup_product_for_update(
+                self._client.products[self._product_id].get(),
+            )
+        return self._product
+
+    def modified(self):
+        self._modified = True
+
+    def set_icon(self, name, data, content_type):
+        self._icon = (name, data, content_type)
+        self._modified = True
+
+    def on_save(self, callback):
+        """
+        Call `callback` when the document is saved, with the error the product
+        update failed with or None if it succeeded.
+        """
+        self._callbacks.append(callback)
+
+    def save(self):
+        callbacks, self._callbacks = self._callbacks, []
+        try:
+            self._update()
+        except Exception as e:
+            for callback in callbacks:
+                callback(e)
+            raise
+        for callback in callbacks:
+            callback(None)
+
+    def _update(self):
+        if not self._modified:
+            return
+        if self._icon:
+            product = dict(
+                self.product,
+                customer_ui_settings=json.dumps(self.product['customer_ui_settings']),
+            )
+            self._client.products[self._product_id].update(
+                files={
+                    'body': (None, json.dumps(product), 'application/json'),
+                    'icon': self._icon,
+                },
+            )
+        else:
+            self._client.products[self._product_id].update(self.product)
+        self._icon = None
+        self._modified = False
+
+
 class GeneralSynchronizer(ProductSynchronizer):
     def __init__(self, client, progress):
         self._category = None
-        self._media_path = None
         super(GeneralSynchronizer, self).__init__(client, progress)
 
     def open(self, input_file, worksheet):
         self._open_workbook(input_file)
-        self._media_path = input_file.rsplit('/', 1)[0]
         if worksheet not in self._wb.sheetnames:
             raise ClickException(f'File does not contain {worksheet} to synchronize')
         ws = self._wb['General Information']
@@ -26,7 +99,7 @@ class GeneralSynchronizer(ProductSynchronizer):
                 'Input file has invalid format and could not read product id from it',
             )
         product_id = ws['B5'].value
-        if not self._client.products[product_id].exists():
+        if not self._product_exists(product_id):
             raise ClickException(f'Product {product_id} not found, create it first.')
         errors = self._validate_general(ws)
         if errors:
@@ -51,13 +124,7 @@ class GeneralSynchronizer(ProductSynchronizer):
             errors.append(
                 'A9 must be `Product Icon file name` and B9 contain the value',
             )
-        if (ws['B9'] and ws['B9'].value) and not os.path.isfile(
-            os.path.join(
-                self._media_path,
-                'media',
-                ws['B9'].value,
-            ),
-        ):
+        if (ws['B9'] and ws['B9'].value) and not self._media_file_exists(ws['B9'].value):
             errors.append(
                 f'File {ws["B9"].value} does not exist in the media folder',
             )
@@ -83,15 +150,24 @@ class GeneralSynchronizer(ProductSynchronizer):
         return errors
 
     def _assign_cat_id(self, category_name):
-        categories = self._client.categories.all()
-        for category in categories:
-            if category['name'] == category_name:
-                self._category = category['id']
-                return category['id']
+        with _categories_lock:
+            if self._client not in _categories:
+                _categories[self._client] = {}
+                for category in self._client.categories.all():
+                    _categories[self._client].setdefault(category['name'], category['id'])
+            self._category = _categories[self._client].get(category_name)
+        return self._category
 
-    def sync(self):
+    def sync(self, document=None):
+        """
+        Apply the General Information sheet to `document`. If no document is given,
+        the product is updated right away.
+        """
         errors = []
-        product = cleanup_product_for_update(self._client.products[self._product_id].get())
+        own_document = document is None
+        if own_document:
+            document = ProductDocument(self._client, self._product_id)
+        product = document.product
         ws = self._wb['General Information']
         product['short_description'] = ws['B10'].value.replace('\n', '')
         product['detailed_description'] = ws['B11'].value
@@ -102,25 +178,14 @@ class GeneralSynchronizer(ProductSynchronizer):
         product['category']['id'] = self._category
         # Solution for v22 to avoid issue while updating capabilities
         del product['capabilities']['subscription']['change']['editable_ordering_parameters']
-        product['customer_ui_settings'] = json.dumps(product['customer_ui_settings'])
         image_name = ws['B9'].value
-        image_data = open(
-            os.path.join(
-                self._media_path,
-                'media',
-                ws['B9'].value,
-            ),
-            'rb',
-        )
+        image_data = self._open_media_file(image_name)
         image_type, _ = guess_type(image_name)
-        data = {
-            'body': (None, json.dumps(product), 'application/json'),
-            'icon': (image_name, image_data, image_type),
-        }
+        document.set_icon(image_name, image_data, image_type)
+        if not own_document:
+            return errors
         try:
-            self._client.products[self._product_id].update(
-                files=data,
-            )
+            document.save()
         except ClientError as e:
             errors.append(
                 f'Error while updating general product information: {str(e)}',
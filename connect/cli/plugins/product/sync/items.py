@@ -3,16 +3,18 @@
 # This file is part of the CloudBlue Connect connect-cli.
 # Copyright (c) 2025 CloudBlue. All rights reserved.
 
+import threading
+import weakref
 from collections import namedtuple
+from functools import partial
 
-from connect.client.rql import R
+from connect.client import ClientError
 
+from connect.cli.core.http import handle_http_error
 from connect.cli.plugins.product.api import (
     create_item,
     create_unit,
     delete_item,
-    get_item,
-    get_item_by_mpn,
     update_item,
 )
 from connect.cli.plugins.product.constants import (
@@ -29,132 +31,207 @@ fields = (v.replace(' ', '_').lower() for v in ITEMS_COLS_HEADERS.values())
 
 _RowData = namedtuple('RowData', fields)
 
+_units_indexes = weakref.WeakKeyDictionary()
+_units_indexes_lock = threading.Lock()
+
+
+class _UnitsIndex:
+    """
+    Units of an account indexed by ID and by type and description, the units of
+    the account taking precedence over the shared ones. Units created through the
+    index are added to it, so that each of them is created only once.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_description = {}
+        units = list(client.ns('settings').units.all())
+        for unit in sorted(units, key=lambda unit: 'owner' not in unit):
+            self._add(unit)
+
+    def get(self, unit_type, unit):
+        with self._lock:
+            return self._by_id.get(unit) or self._by_description.get((unit_type, unit))
+
+    def get_or_create(self, unit_type, unit):
+        with self._lock:
+            unit_id = self._by_id.get(unit) or self._by_description.get((unit_type, unit))
+            if not unit_id:
+                created = create_unit(
+                    self._client,
+                    {
+                        'description': unit,
+                        'type': unit_type,
+                        'unit': 'unit' if unit_type == 'reservation' else 'unit-h',
+                    },
+                )
+                self._add(dict(created, description=unit, type=unit_type))
+                unit_id = created['id']
+            return unit_id
 
-class ItemSynchronizer(ProductSynchronizer):
-    def __init__(self, client, progress, stats):
-        self._units = []
-        self._shared_units = []
+    def _add(self, unit):
+        self._by_id.setdefault(unit['id'], unit['id'])
+        self._by_description.setdefault((unit['type'], unit['description']), unit['id'])
+
+
+def _get_units_index(client):
+    """
+    Return the units index of the account of `client`, shared by all the item
+    synchronizers using the same client.
+    """
+    with _units_indexes_lock:
+        if client not in _units_indexes:
+            _units_indexes[client] = _UnitsIndex(client)
+        return _units_indexes[client]
 
-        for unit in client.ns('settings').units.all():
-            if 'owner' in unit:
-                self._units.append(unit)
-            else:
-                self._shared_units.append(unit)
 
+class ItemSynchronizer(ProductSynchronizer):
+    def __init__(self, client, progress, stats, workers=1, plan=False, skip_unchanged=False):
+        self._units = _get_units_index(client)
+        self._items_by_id = None
+        self._items_by_mpn = None
+        self._items_lock = threading.RLock()
         self._mstats = stats['Items']
-        super().__init__(client, progress)
+        super().__init__(client, progress, workers, plan, skip_unchanged)
 
-    def sync(self):  # noqa: CCR001
+    def sync(self):
         ws = self._wb['Items']
 
         task = self._progress.add_task('Processing item', total=ws.max_row - 1)
+        self._execute_rows(task, self._iter_rows(ws, task))
+        self._progress.update(task, completed=ws.max_row - 1)
+
+    def _iter_rows(self, ws, task):
         for row_idx in range(2, ws.max_row + 1):
             data = _RowData(*[ws.cell(row_idx, col_idx).value for col_idx in range(1, 14)])
-            self._progress.update(
-                task,
-                description=f'Processing item {data.id or data.mpn}',
-                advance=1,
+            key = data.mpn or data.id
+            yield key and str(key), partial(self._sync_row, ws, task, row_idx, data)
+
+    def _sync_row(self, ws, task, row_idx, data):
+        self._progress.update(task, description=f'Processing item {data.id or data.mpn}')
+        if data.action == '-':
+            return self._mstats.skipped
+        row_errors = self._validate_row(data)
+        if row_errors:
+            return partial(self._mstats.error, row_errors, row_idx)
+        if data.action == 'update' and self._is_unchanged_since_export(data):
+            return self._mstats.unchanged
+        if data.action == 'create':
+            return self._create_row(ws, task, row_idx, data)
+        if data.action == 'update':
+            return self._update_row(ws, task, row_idx, data)
+        if data.action == 'delete':
+            return self._delete_row(task, row_idx, data)
+
+    def _create_row(self, ws, task, row_idx, data):
+        item = self._get_indexed_items()[1].get(str(data.mpn))
+        if item:
+            return partial(
+                self._mstats.error,
+                f'Cannot create item: item with MPN `{data.mpn}`'
+                f' already exists with ID `{item["id"]}`.',
+                row_idx,
+            )
+        if self._plan:
+            return self._mstats.created
+        self._progress.update(
+            task,
+            description=f'Creating item {data[1]}',
+        )
+        try:
+            item = create_item(
+                self._client,
+                self._product_id,
+                self._get_item_payload(data),
+            )
+        except Exception as e:
+            return partial(self._mstats.error, str(e), row_idx)
+        self._index_item(item)
+
+        def record():
+            self._mstats.created()
+            self._update_sheet_row(ws, row_idx, item)
+
+        return record
+
+    def _update_row(self, ws, task, row_idx, data):
+        item = self._get_item(data)
+
+        if not item:
+            field = 'ID' if data.id else 'MPN'
+            value = data.id if data.id else data.mpn
+            return partial(
+                self._mstats.error,
+                f'Cannot update item: item with {field} `{value}` the item does not exist.',
+                row_idx,
+            )
+
+        self._progress.update(
+            task,
+            description=f"Updating item {item['id']}",
+        )
+        if item['status'] == 'published':
+            payload = {
+                'name': data.name,
+                'mpn': data.mpn,
+                'description': data.description,
+                'ui': {'visibility': True},
+            }
+        else:
+            payload = self._get_item_payload(data)
+            if item['type'] == 'ppu':
+                del payload['period']
+        if self._skip_unchanged and self._is_unchanged(item, payload):
+            return self._mstats.unchanged
+        if self._plan:
+            return self._mstats.updated
+        try:
+            item = update_item(
+                self._client,
+                self._product_id,
+                item['id'],
+                payload,
+            )
+        except Exception as e:
+            return partial(self._mstats.error, str(e), row_idx)
+        self._index_item(item)
+
+        def record():
+            self._mstats.updated()
+            self._update_sheet_row(ws, row_idx, item)
+
+        return record
+
+    def _delete_row(self, task, row_idx, data):
+        item = self._get_item(data)
+
+        if not item:
+            field = 'ID' if data.id else 'MPN'
+            value = data.id if data.id else data.mpn
+            return partial(
+                self._mstats.error,
+                f'Cannot delete item: item with {field} `{value}` the item does not exist.',
+                row_idx,
             )
-            if data.action == '-':
-                self._mstats.skipped()
-                continue
-            row_errors = self._validate_row(data)
-            if row_errors:
-                self._mstats.error(row_errors, row_idx)
-                continue
-
-            if data.action == 'create':
-                rql = R().mpn.eq(data.mpn)
-                item = self._client.products[self._product_id].items.filter(rql).first()
-                if item:
-                    self._mstats.error(
-                        f'Cannot create item: item with MPN `{data.mpn}`'
-                        f' already exists with ID `{item["id"]}`.',
-                        row_idx,
-                    )
-                    continue
-                self._progress.update(
-                    task,
-                    description=f'Creating item {data[1]}',
-                )
-                try:
-                    item = create_item(
-                        self._client,
-                        self._product_id,
-                        self._get_item_payload(data),
-                    )
-                    self._mstats.created()
-                    self._update_sheet_row(ws, row_idx, item)
-                except Exception as e:
-                    self._mstats.error(str(e), row_idx)
-
-            if data.action == 'update':
-                item = self._get_item(data)
-
-                if not item:
-                    field = 'ID' if data.id else 'MPN'
-                    value = data.id if data.id else data.mpn
-                    self._mstats.error(
-                        f'Cannot update item: item with {field} `{value}` '
-                        f'the item does not exist.',
-                        row_idx,
-                    )
-                    continue
-
-                self._progress.update(
-                    task,
-                    description=f"Updating item {item['id']}",
-                )
-                if item['status'] == 'published':
-                    payload = {
-                        'name': data.name,
-                        'mpn': data.mpn,
-                        'description': data.description,
-                        'ui': {'visibility': True},
-                    }
-                else:
-                    payload = self._get_item_payload(data)
-                    if item['type'] == 'ppu':
-                        del payload['period']
-                try:
-                    item = update_item(
-                        self._client,
-                        self._product_id,
-                        item['id'],
-                        payload,
-                    )
-                    self._mstats.updated()
-                    self._update_sheet_row(ws, row_idx, item)
-                except Exception as e:
-                    self._mstats.error(str(e), row_idx)
-
-            if data.action == 'delete':
-                item = self._get_item(data)
-
-                if not item:
-                    field = 'ID' if data.id else 'MPN'
-                    value = data.id if data.id else data.mpn
-                    self._mstats.error(
-                        f'Cannot delete item: item with {field} `{value}` '
-                        f'the item does not exist.',
-                        row_idx,
-                    )
-                    continue
-
-                self._progress.update(
-                    task,
-                    description=f"Deleting item {item['id']}",
-                )
-                try:
-                    delete_item(
-                        self._client,
-                        self._product_id,
-                        item['id'],
-                    )
-                    self._mstats.deleted()
-                except Exception as e:
-                    self._mstats.error(str(e), row_idx)
-        self._progress.update(task, completed=ws.max_row - 1)
+
+        if self._plan:
+            return self._mstats.deleted
+        self._progress.update(
+            task,
+            description=f"Deleting item {item['id']}",
+        )
+        try:
+            delete_item(
+                self._client,
+                self._product_id,
+                item['id'],
+            )
+        except Exception as e:
+            return partial(self._mstats.error, str(e), row_idx)
+        self._unindex_item(item)
+        return self._mstats.deleted
 
     @staticmethod
     def _validate_commitment(row):
@@ -276,33 +353,52 @@ class ItemSynchronizer(ProductSynchronizer):
         return f'years_{count}'
 
     def _get_or_create_unit(self, data):
-        for unit in self._units:
-            if unit['id'] == data.unit:
-                return unit['id']
-            if unit['type'] == data.type and unit['description'] == data.unit:
-                return unit['id']
-
-        for unit in self._shared_units:
-            if unit['id'] == data.unit:
-                return unit['id']
-            if unit['type'] == data.type and unit['description'] == data.unit:
-                return unit['id']
-
-        created = create_unit(
-            self._client,
-            {
-                'description': data.unit,
-                'type': data.type,
-                'unit': 'unit' if data.type == 'reservation' else 'unit-h',
-            },
-        )
-        return created['id']
+        if self._plan:
+            return self._units.get(data.type, data.unit)
+        return self._units.get_or_create(data.type, data.unit)
+
+    def _get_indexed_items(self):
+        """
+        Return the items of the product indexed by ID and by MPN. The items are
+        fetched the first time a row needs them, so that rows are matched with
+        their item without a request per row.
+        """
+        with self._items_lock:
+            if self._items_by_id is None:
+                items_by_id = {}
+                try:
+                    for item in self._client.products[self._product_id].items.all():
+                        items_by_id[item['id']] = item
+                except ClientError as error:
+                    handle_http_error(error)
+                self._items_by_id = {}
+                self._items_by_mpn = {}
+                for item in items_by_id.values():
+                    self._index_item(item)
+            return self._items_by_id, self._items_by_mpn
+
+    def _index_item(self, item):
+        with self._items_lock:
+            if self._items_by_id is None:
+                return
+            previous = self._items_by_id.get(item['id'])
+            if previous and self._items_by_mpn.get(str(previous['mpn'])) is previous:
+                del self._items_by_mpn[str(previous['mpn'])]
+            self._items_by_id[item['id']] = item
+            self._items_by_mpn[str(item['mpn'])] = item
+
+    def _unindex_item(self, item):
+        with self._items_lock:
+            self._items_by_id.pop(item['id'], None)
+            if self._items_by_mpn.get(str(item['mpn'])) is item:
+                del self._items_by_mpn[str(item['mpn'])]
 
     def _get_item(self, data):
+        items_by_id, items_by_mpn = self._get_indexed_items()
         if data.id:
-            return get_item(self._client, self._product_id, data.id)
+            return items_by_id.get(data.id)
         elif data.mpn:
-            return get_item_by_mpn(self._client, self._product_id, data.mpn)
+            return items_by_mpn.get(str(data.mpn))
 
     def _get_item_payload(self, data):
         commitment = {
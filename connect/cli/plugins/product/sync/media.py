@@ -3,8 +3,9 @@
 # This file is part of the CloudBlue Connect connect-cli.
 # Copyright (c) 2025 CloudBlue. All rights reserved.
 import json
-import os
+import threading
 from collections import namedtuple
+from functools import partial
 from mimetypes import guess_type
 from urllib.parse import urlparse
 
@@ -20,89 +21,105 @@ _RowData = namedtuple('RowData', fields)
 
 
 class MediaSynchronizer(ProductSynchronizer):
-    def __init__(self, client, progress, stats):
-        self._media_path = None
+    def __init__(self, client, progress, stats, workers=1, plan=False):
         self._mstats = stats['Media']
-        super(MediaSynchronizer, self).__init__(client, progress)
+        self._media_ids = None
+        self._media_lock = threading.Lock()
+        super(MediaSynchronizer, self).__init__(client, progress, workers, plan)
 
-    def open(self, input_file, worksheet):
-        self._media_path = input_file.rsplit('/', 1)[0]
-        return super(MediaSynchronizer, self).open(input_file, worksheet)
-
-    def sync(self):  # noqa: CCR001
+    def sync(self):
         ws = self._wb['Media']
 
         task = self._progress.add_task('Processing Media', total=ws.max_row - 1)
+        self._execute_rows(task, self._iter_rows(ws, task))
+        self._progress.update(task, completed=ws.max_row - 1)
+
+    def _iter_rows(self, ws, task):
         for row_idx in range(2, ws.max_row + 1):
             data = _RowData(*[ws.cell(row_idx, col_idx).value for col_idx in range(1, 7)])
-            self._progress.update(
-                task,
-                description=f'Processing Media {data.id or data.position or "New"}',
-                advance=1,
-            )
-
-            if data.action == '-':
-                self._mstats.skipped()
-                continue
-            row_errors = self._validate_row(data)
-
-            if row_errors:
-                self._mstats.error(row_errors, row_idx)
-                continue
-            if data.action == 'delete':
-                try:
-                    self._client.products[self._product_id].media[data.id].delete()
-                    self._mstats.deleted()
-                    continue
-                except ClientError as e:
-                    if e.status_code == 404:
-                        self._mstats.deleted()
-                    else:
-                        self._mstats.error(str(e), row_idx)
-                    continue
-
-            image_data = open(
-                os.path.join(
-                    self._media_path,
-                    'media',
-                    data.image_file,
-                ),
-                'rb',
-            )
-            image_type, _ = guess_type(data.image_file)
-            body = {
-                'type': data.type,
-                'position': str(data.position),
-            }
-
-            if data.type != 'image':
-                body['url'] = data.video_url_location
-
-            payload = {
-                'body': (None, json.dumps(body), 'application/json'),
-                'thumbnail': (data.image_file, image_data, image_type),
-            }
-
+            yield data.id, partial(self._sync_row, ws, task, row_idx, data)
+
+    def _sync_row(self, ws, task, row_idx, data):  # noqa: CCR001
+        self._progress.update(
+            task,
+            description=f'Processing Media {data.id or data.position or "New"}',
+        )
+
+        if data.action == '-':
+            return self._mstats.skipped
+        row_errors = self._validate_row(data)
+
+        if row_errors:
+            return partial(self._mstats.error, row_errors, row_idx)
+        if self._plan:
+            return self._plan_row(row_idx, data)
+        if data.action == 'delete':
             try:
-                if data.action == 'update':
-                    media = (
-                        self._client.products[self._product_id]
-                        .media[data.id]
-                        .update(
-                            files=payload,
-                        )
-                    )
-                    self._update_sheet_row(ws, row_idx, media)
-                    self._mstats.updated()
-                else:
-                    media = self._client.products[self._product_id].media.create(
+                self._client.products[self._product_id].media[data.id].delete()
+            except ClientError as e:
+                if e.status_code != 404:
+                    return partial(self._mstats.error, str(e), row_idx)
+            return self._mstats.deleted
+
+        image_data = self._open_media_file(data.image_file)
+        image_type, _ = guess_type(data.image_file)
+        body = {
+            'type': data.type,
+            'position': str(data.position),
+        }
+
+        if data.type != 'image':
+            body['url'] = data.video_url_location
+
+        payload = {
+            'body': (None, json.dumps(body), 'application/json'),
+            'thumbnail': (data.image_file, image_data, image_type),
+        }
+
+        try:
+            if data.action == 'update':
+                media = (
+                    self._client.products[self._product_id]
+                    .media[data.id]
+                    .update(
                         files=payload,
                     )
-                    self._update_sheet_row(ws, row_idx, media)
-                    self._mstats.created()
-            except Exception as e:
-                self._mstats.error(str(e), row_idx)
-        self._progress.update(task, completed=ws.max_row - 1)
+                )
+                stat = self._mstats.updated
+            else:
+                media = self._client.products[self._product_id].media.create(
+                    files=payload,
+                )
+                stat = self._mstats.created
+        except Exception as e:
+            return partial(self._mstats.error, str(e), row_idx)
+
+        def record_synced():
+            self._update_sheet_row(ws, row_idx, media)
+            stat()
+
+        return record_synced
+
+    def _plan_row(self, row_idx, data):
+        if data.action == 'create':
+            return self._mstats.created
+        if data.action == 'delete':
+            return self._mstats.deleted
+        if data.id not in self._get_media_ids():
+            return partial(
+                self._mstats.error,
+                f'Cannot update media: media with ID `{data.id}` does not exist.',
+                row_idx,
+            )
+        return self._mstats.updated
+
+    def _get_media_ids(self):
+        with self._media_lock:
+            if self._media_ids is None:
+                self._media_ids = {
+                    media['id'] for media in self._client.products[self._product_id].media.all()
+                }
+            return self._media_ids
 
     @staticmethod
     def _update_sheet_row(ws, row_idx, media):
@@ -125,7 +142,7 @@ class MediaSynchronizer(ProductSynchronizer):
             errors.append(
                 f'Media can be either image or video type, provided {data.type}',
             )
-        elif not os.path.isfile(os.path.join(self._media_path, 'media', data.image_file)):
+        elif not self._media_file_exists(data.image_file):
             errors.append(
                 f'Image file is not found, please check that file {data.image_file} exists '
                 'in media folder',
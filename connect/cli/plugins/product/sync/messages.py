@@ -3,7 +3,9 @@
 # This file is part of the CloudBlue Connect connect-cli.
 # Copyright (c) 2025 CloudBlue. All Rights Reserved.
 
+import threading
 from collections import namedtuple
+from functools import partial
 
 from connect.client.rql import R
 from connect.client import ClientError, R
@@ -19,11 +21,29 @@ _RowData = namedtuple('RowData', fields)
 
 
 class MessageSynchronizer(ProductSynchronizer):
-    def __init__(self, client, progress, stats):
+    def __init__(self, client, progress, stats, workers=1, plan=False, skip_unchanged=False):
         self._mstats = stats['Messages']
-        super().__init__(client, progress)
+        self._messages = None
+        self._messages_lock = threading.Lock()
+        super().__init__(client, progress, workers, plan, skip_unchanged)
+
+    def _get_messages(self):
+        """
+        Return the messages of the product indexed by ID and by external ID, listing
+        them with a single request the first time they are needed.
+        """
+        with self._messages_lock:
+            if self._messages is None:
+                messages = list(self._client.products[self._product_id].messages.all())
+                self._messages = (
+                    {message['id']: message for message in messages},
+                    {message['external_id']: message for message in messages},
+                )
+            return self._messages
 
     def _get_message(self, message_id):
+        if self._plan:
+            return self._get_messages()[0].get(message_id)
         try:
             res = self._client.products[self._product_id].messages[message_id].get()
         except ClientError as error:
@@ -32,9 +52,13 @@ class MessageSynchronizer(ProductSynchronizer):
             handle_http_error(error)
         return res
 
+    @staticmethod
+    def _get_payload(data):
+        return {'external_id': data.external_id, 'value': data.value, 'auto': data.auto}
+
     def _create_message(self, data):
         try:
-            payload = {'external_id': data.external_id, 'value': data.value, 'auto': data.auto}
+            payload = self._get_payload(data)
             res = self._client.products[self._product_id].messages.create(payload)
         except ClientError as error:
             handle_http_error(error)
@@ -42,7 +66,7 @@ class MessageSynchronizer(ProductSynchronizer):
 
     def _update_message(self, data):
         try:
-            payload = {'external_id': data.external_id, 'value': data.value, 'auto': data.auto}
+            payload = self._get_payload(data)
             res = self._client.products[self._product_id].messages[data.id].update(payload)
         except ClientError as error:
             handle_http_error(error)
@@ -56,92 +80,120 @@ class MessageSynchronizer(ProductSynchronizer):
         return res
 
     def _process_create(self, row_idx, data, task):
-        rql = R().external_id.eq(data.external_id)
-        message = self._client.products[self._product_id].messages.filter(rql).first()
+        if self._plan:
+            message = self._get_messages()[1].get(data.external_id)
+        else:
+            rql = R().external_id.eq(data.external_id)
+            message = self._client.products[self._product_id].messages.filter(rql).first()
         if message:
-            self._mstats.error(
+            return partial(
+                self._mstats.error,
                 f'Cannot create message: message with external_id `{data.external_id}`'
                 f' already exists with ID `{message["id"]}`.',
                 row_idx,
             )
-        else:
-            self._progress.update(
-                task,
-                description=f'Creating message {data.external_id}',
-            )
-            try:
-                new_message = self._create_message(data)
-                self._mstats.created()
-                self._update_sheet_row(self._ws, row_idx, new_message)
-            except Exception as e:
-                self._mstats.error(str(e), row_idx)
+        if self._plan:
+            return self._mstats.created
+        self._progress.update(
+            task,
+            description=f'Creating message {data.external_id}',
+        )
+        try:
+            new_message = self._create_message(data)
+        except Exception as e:
+            return partial(self._mstats.error, str(e), row_idx)
+
+        def record_created():
+            self._mstats.created()
+            self._update_sheet_row(self._ws, row_idx, new_message)
+
+        return record_created
 
     def _process_update(self, row_idx, data, task):
-        if not self._get_message(data.id):
-            self._mstats.error(
+        message = self._get_message(data.id)
+        if not message:
+            return partial(
+                self._mstats.error,
                 f'Cannot update message: message with ID `{data.id}` ' 'does not exist.',
                 row_idx,
             )
-        else:
-            self._progress.update(
-                task,
-                description=f'Updating message {data.id}',
+        if self._skip_unchanged and self._is_unchanged(message, self._get_payload(data)):
+            return self._mstats.unchanged
+        if self._plan:
+            return self._mstats.updated
+        self._progress.update(
+            task,
+            description=f'Updating message {data.id}',
+        )
+        try:
+            updated_message = self._update_message(
+                data,
             )
-            try:
-                updated_message = self._update_message(
-                    data,
-                )
-                self._mstats.updated()
-                self._update_sheet_row(self._ws, row_idx, updated_message)
-            except Exception as e:
-                self._mstats.error(str(e), row_idx)
+        except Exception as e:
+            return partial(self._mstats.error, str(e), row_idx)
+
+        def record_updated():
+            self._mstats.updated()
+            self._update_sheet_row(self._ws, row_idx, updated_message)
+
+        return record_updated
 
     def _process_delete(self, row_idx, data, task):
         if not self._get_message(data.id):
-            self._mstats.error(
+            return partial(
+                self._mstats.error,
                 f'Cannot delete message: message with ID `{data.id}` ' 'does not exist.',
                 row_idx,
             )
-        else:
-            self._progress.update(
-                task,
-                description=f'Deleting message {data.id}',
-            )
-            try:
-                self._delete_message(data.id)
-                self._mstats.deleted()
-                for c in range(1, self._ws.max_column + 1):
-                    self._ws.cell(row_idx, c, value='')
-            except Exception as e:
-                self._mstats.error(str(e), row_idx)
-
-    def sync(self):  # noqa: CCR001
+        if self._plan:
+            return self._mstats.deleted
+        self._progress.update(
+            task,
+            description=f'Deleting message {data.id}',
+        )
+        try:
+            self._delete_message(data.id)
+        except Exception as e:
+            return partial(self._mstats.error, str(e), row_idx)
+
+        def record_deleted():
+            self._mstats.deleted()
+            for c in range(1, self._ws.max_column + 1):
+                self._ws.cell(row_idx, c, value='')
+
+        return record_deleted
+
+    def sync(self):
         self._ws = self._wb['Messages']
         task = self._progress.add_task('Processing messages', total=self._ws.max_row - 1)
+        self._execute_rows(task, self._iter_rows(task))
+        self._progress.update(task, completed=self._ws.max_row - 1)
+
+    def _iter_rows(self, task):
         for row_idx in range(2, self._ws.max_row + 1):
             data = _RowData(*[self._ws.cell(row_idx, col_idx).value for col_idx in range(1, 6)])
-            self._progress.update(
-                task,
-                description=f'Processing message {data.id}',
-                advance=1,
-            )
-            if data.action == '-':
-                self._mstats.skipped()
-                continue
-
-            row_errors = self._validate_row(data)
-            if row_errors:
-                self._mstats.error(row_errors, row_idx)
-                continue
-
-            if data.action == 'create':
-                self._process_create(row_idx, data, task)
-            elif data.action == 'update':
-                self._process_update(row_idx, data, task)
-            elif data.action == 'delete':
-                self._process_delete(row_idx, data, task)
-
-        self._progress.update(task, completed=self._ws.max_row - 1)
+            yield data.external_id or data.id, partial(self._sync_row, task, row_idx, data)
+
+    def _sync_row(self, task, row_idx, data):
+        self._progress.update(
+            task,
+            description=f'Processing message {data.id}',
+        )
+        if data.action == '-':
+            return self._mstats.skipped
+
+        row_errors = self._validate_row(data)
+        if row_errors:
+            return partial(self._mstats.error, row_errors, row_idx)
+        if data.action == 'update' and self._is_unchanged_since_export(data):
+            return self._mstats.unchanged
+
+        if data.action == 'create':
+            return self._process_create(row_idx, data, task)
+        elif data.action == 'update':
+            return self._process_update(row_idx, data, task)
+        elif data.action == 'delete':
+            return self._process_delete(row_idx, data, task)
 
     def _validate_row(self, row):  # noqa: CCR001
         errors = []
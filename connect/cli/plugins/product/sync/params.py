@@ -4,7 +4,10 @@
 # Copyright (c) 2025 CloudBlue. All rights reserved.
 import json
 import re
+import threading
+import weakref
 from collections import namedtuple
+from functools import partial
 from json.decoder import JSONDecodeError
 
 from connect.client import ClientError
@@ -20,16 +23,78 @@ fields = (v.replace(' ', '_').lower() for v in PARAMS_COLS_HEADERS.values())
 
 _RowData = namedtuple('RowData', fields)
 
+_params_indexes = weakref.WeakKeyDictionary()
+_params_indexes_lock = threading.Lock()
+
+
+class _ParamsIndex:
+    """
+    Parameters of a product indexed by ID and by name. They are listed with a
+    single request the first time one of them is looked up; parameters created,
+    updated or deleted afterwards are reflected in the index.
+    """
+
+    def __init__(self, client, product_id):
+        self._client = client
+        self._product_id = product_id
+        self._lock = threading.Lock()
+        self._by_id = None
+        self._by_name = None
+
+    def get(self, param_id=None, name=None):
+        with self._lock:
+            if self._by_id is None:
+                params = list(self._client.products[self._product_id].parameters.all())
+                self._by_id = {}
+                self._by_name = {}
+                for param in params:
+                    self._add(param)
+            if param_id:
+                return self._by_id.get(param_id)
+            return self._by_name.get(name)
+
+    def add(self, param):
+        with self._lock:
+            if self._by_id is not None:
+                self._add(param)
+
+    def remove(self, param_id):
+        with self._lock:
+            if self._by_id is not None:
+                param = self._by_id.pop(param_id, None)
+                if param:
+                    self._by_name.pop(param['name'], None)
+
+    def _add(self, param):
+        previous = self._by_id.get(param['id'])
+        if previous:
+            self._by_name.pop(previous['name'], None)
+        self._by_id[param['id']] = param
+        self._by_name[param['name']] = param
+
+
+def _get_params_index(client, product_id):
+    """
+    Return the parameters index of `product_id`, shared by all the parameters
+    synchronizers using the same client.
+    """
+    with _params_indexes_lock:
+        indexes = _params_indexes.setdefault(client, {})
+        if product_id not in indexes:
+            indexes[product_id] = _ParamsIndex(client, product_id)
+        return indexes[product_id]
+
 
 class ParamsSynchronizer(ProductSynchronizer):
-    def __init__(self, client, progress, stats):
+    def __init__(self, client, progress, stats, workers=1, plan=False, skip_unchanged=False):
         self._param_type = None
         self._worksheet_name = None
         self.__stats = stats
         self._mstats = None
         self._id_mapping = {}
         self._param_deps = {}
-        super(ParamsSynchronizer, self).__init__(client, progress)
+        self._counted_params = set()
+        super(ParamsSynchronizer, self).__init__(client, progress, workers, plan, skip_unchanged)
 
     def open(self, input_file, worksheet):
         if worksheet == 'Ordering Parameters':
@@ -40,98 +105,139 @@ class ParamsSynchronizer(ProductSynchronizer):
             self._param_type = 'configuration'
         self._worksheet_name = worksheet
         self._mstats = self.__stats[self._worksheet_name]
-        return super(ParamsSynchronizer, self).open(input_file, worksheet)
+        product_id = super(ParamsSynchronizer, self).open(input_file, worksheet)
+        self._params = _get_params_index(self._client, product_id)
+        return product_id
 
-    def sync(self):  # noqa: CCR001
+    def sync(self):
         ws = self._wb[self._worksheet_name]
 
         task = self._progress.add_task('Processing param', total=ws.max_row - 1)
+        self._execute_rows(task, self._iter_rows(ws, task))
+        self._progress.update(task, completed=ws.max_row - 1)
+
+        if self._param_type == 'ordering' and not self._plan:
+            self._process_constraints_dependency(ws)
+
+    def _iter_rows(self, ws, task):
         for row_idx in range(2, ws.max_row + 1):
             data = _RowData(*[ws.cell(row_idx, col_idx).value for col_idx in range(1, 15)])
-            self._progress.update(
-                task,
-                description=f'Processing param {data.id}',
-                advance=1,
-            )
-            if data.action == '-':
-                self._mstats.skipped()
-                continue
-            row_errors = self._validate_row(data)
+            yield data.id, partial(self._sync_row, ws, task, row_idx, data)
 
-            if row_errors:
-                self._mstats.error(row_errors, row_idx)
-                continue
+    def _sync_row(self, ws, task, row_idx, data):  # noqa: CCR001
+        self._progress.update(
+            task,
+            description=f'Processing param {data.id}',
+        )
+        if data.action == '-':
+            return self._mstats.skipped
+        row_errors = self._validate_row(data)
 
-            if data.action == 'delete':
-                try:
-                    self._client.products[self._product_id].parameters[data.verbose_id].delete()
-                except ClientError:
-                    pass
-                self._mstats.deleted()
-                continue
+        if row_errors:
+            return partial(self._mstats.error, row_errors, row_idx)
 
-            param_payload = {}
-            dependency = None
-            if data.json_properties:
-                param_payload = json.loads(data.json_properties)
-            param_payload['name'] = data.id
-            param_payload['title'] = data.title
-            param_payload['description'] = data.description
-            param_payload['phase'] = data.phase
-            param_payload['scope'] = data.scope
-            param_payload['type'] = data.type
-            if 'constraints' not in param_payload:
-                param_payload['constraints'] = {}
-            if 'dependency' in param_payload['constraints']:
-                dependency = param_payload['constraints']['dependency']
-                del param_payload['constraints']['dependency']
-            param_payload['constraints']['required'] = False if data.required == '-' else True
-            param_payload['constraints']['unique'] = False if data.unique == '-' else True
-            param_payload['constraints']['hidden'] = False if data.hidden == '-' else True
-
-            if data.action == 'update':
-                try:
-                    original_param = self._get_original_param(data)
-                    if original_param:
-                        self._compare_param(original_param, data)
-
-                    param = (
-                        self._client.products[self._product_id]
-                        .parameters[data.verbose_id]
-                        .update(
+        if data.action == 'delete':
+            if self._plan:
+                return self._mstats.deleted
+            try:
+                self._client.products[self._product_id].parameters[data.verbose_id].delete()
+            except ClientError:
+                pass
+            self._params.remove(data.verbose_id)
+            return self._mstats.deleted
+
+        param_payload = {}
+        dependency = None
+        if data.json_properties:
+            param_payload = json.loads(data.json_properties)
+        param_payload['name'] = data.id
+        param_payload['title'] = data.title
+        param_payload['description'] = data.description
+        param_payload['phase'] = data.phase
+        param_payload['scope'] = data.scope
+        param_payload['type'] = data.type
+        if 'constraints' not in param_payload:
+            param_payload['constraints'] = {}
+        if 'dependency' in param_payload['constraints']:
+            dependency = param_payload['constraints']['dependency']
+            del param_payload['constraints']['dependency']
+        param_payload['constraints']['required'] = False if data.required == '-' else True
+        param_payload['constraints']['unique'] = False if data.unique == '-' else True
+        param_payload['constraints']['hidden'] = False if data.hidden == '-' else True
+
+        if data.action == 'update':
+            if self._is_unchanged_since_export(data):
+                return partial(
+                    self._record_unchanged,
+                    ws,
+                    row_idx,
+                    data,
+                    data.verbose_id,
+                    param_payload,
+                    dependency,
+                )
+            try:
+                original_param = self._get_original_param(data)
+                if original_param:
+                    self._compare_param(original_param, data)
+                    if self._skip_unchanged and self._is_unchanged(original_param, param_payload):
+                        return partial(
+                            self._record_unchanged,
+                            ws,
+                            row_idx,
+                            data,
+                            original_param['id'],
                             param_payload,
+                            dependency,
+                            original_param,
                         )
-                    )
-                    self._update_sheet_row(ws, row_idx, param)
-                    self._mstats.updated()
-                    self._id_mapping[data.id] = param['id']
-                    if dependency:
-                        self._param_deps[param['id']] = dependency
-                except Exception as e:
-                    self._mstats.error(str(e), row_idx)
-
-            if data.action == 'create':
-                try:
-                    original_param = self._get_original_param(data)
-                    if original_param:
-                        self._updated_or_skipped(ws, row_idx, original_param, param_payload)
-                        self._id_mapping[data.id] = original_param['id']
-                        continue
-                    param = self._client.products[self._product_id].parameters.create(
+                if self._plan:
+                    return self._mstats.updated
+
+                param = (
+                    self._client.products[self._product_id]
+                    .parameters[data.verbose_id]
+                    .update(
                         param_payload,
                     )
-                    self._update_sheet_row(ws, row_idx, param)
-                    self._mstats.created()
-                    self._id_mapping[data.id] = param['id']
-                    if dependency:
-                        self._param_deps[param['id']] = dependency
-                except Exception as e:
-                    self._mstats.error(str(e), row_idx)
+                )
+                self._params.add(param)
+            except Exception as e:
+                return partial(self._mstats.error, str(e), row_idx)
 
-        self._progress.update(task, completed=ws.max_row - 1)
+            def record_updated():
+                self._update_sheet_row(ws, row_idx, param)
+                self._mstats.updated()
+                self._record_param(row_idx, data, param['id'], param_payload, dependency)
 
-        if self._param_type == 'ordering':
-            self._process_constraints_dependency(ws)
+            return record_updated
+
+        if data.action == 'create':
+            try:
+                original_param = self._get_original_param(data)
+                if original_param:
+                    record = self._updated_or_skipped(ws, row_idx, original_param, param_payload)
+
+                    def record_existing():
+                        record()
+                        self._id_mapping[data.id] = original_param['id']
+
+                    return record_existing
+                if self._plan:
+                    return self._mstats.created
+                param = self._client.products[self._product_id].parameters.create(
+                    param_payload,
+                )
+                self._params.add(param)
+            except Exception as e:
+                return partial(self._mstats.error, str(e), row_idx)
+
+            def record_created():
+                self._update_sheet_row(ws, row_idx, param)
+                self._mstats.created()
+                self._record_param(row_idx, data, param['id'], param_payload, dependency)
+
+            return record_created
 
     @staticmethod
     def _update_sheet_row(ws, row_idx, param=None):
@@ -237,66 +343,123 @@ class ParamsSynchronizer(ProductSynchronizer):
                 )
         return errors
 
+    def _record_unchanged(self, ws, row_idx, data, param_id, payload, dependency, original=None):
+        """
+        Record a parameter whose properties are unchanged. Its dependency is only
+        updated, and the parameter counted as updated then, if it differs from the
+        one of `original`; a row unchanged since it was exported keeps the
+        dependency it was exported with.
+        """
+        self._update_sheet_row(ws, row_idx)
+        if (
+            dependency
+            and original
+            and not self._is_same_dependency(dependency, original['constraints'].get('dependency'))
+        ):
+            self._record_param(row_idx, data, param_id, payload, dependency, counted=False)
+            return
+        self._mstats.unchanged()
+        self._record_param(row_idx, data, param_id, payload, None)
+
+    @staticmethod
+    def _is_same_dependency(dependency, original):
+        if not original:
+            return False
+        parameter = dependency.get('parameter') or {}
+        original_parameter = original.get('parameter') or {}
+        key = 'name' if parameter.get('name') else 'id'
+        if parameter.get(key) != original_parameter.get(key):
+            return False
+        return {k: v for k, v in dependency.items() if k != 'parameter'} == {
+            k: v for k, v in original.items() if k != 'parameter'
+        }
+
+    def _record_param(self, row_idx, data, param_id, payload, dependency, counted=True):
+        self._id_mapping[data.id] = param_id
+        if counted:
+            self._counted_params.add(param_id)
+        if dependency:
+            self._param_deps[param_id] = (row_idx, data.id, payload['constraints'], dependency)
+
     def _get_original_param(self, data):
-        filter_kwargs = {}
         if data.verbose_id:
-            filter_kwargs['id'] = data.verbose_id
-        else:
-            filter_kwargs['name'] = data.id
-        return self._client.products[self._product_id].parameters.filter(**filter_kwargs).first()
+            return self._params.get(param_id=data.verbose_id)
+        return self._params.get(name=data.id)
 
     def _updated_or_skipped(self, ws, row_idx, original, payload):
-        original_filter = {k: v for k, v in original.items() if k in payload.keys()}
-
-        if original_filter == payload:
-            self._update_sheet_row(ws, row_idx)
-            self._mstats.skipped()
-        else:
-            param = (
-                self._client.products[self._product_id]
-                .parameters[original['id']]
-                .update(
-                    payload,
-                )
+        if self._is_unchanged(original, payload):
+
+            def record_skipped():
+                self._update_sheet_row(ws, row_idx)
+                self._mstats.skipped()
+
+            return record_skipped
+        if self._plan:
+            return self._mstats.updated
+        param = (
+            self._client.products[self._product_id]
+            .parameters[original['id']]
+            .update(
+                payload,
             )
+        )
+        self._params.add(param)
+
+        def record_updated():
             self._update_sheet_row(ws, row_idx, param)
             self._mstats.updated()
 
+        return record_updated
+
+    def _get_dependency_id(self, name):
+        """
+        Return the ID of the parameter named `name` a parameter depends on: the one
+        synchronized in this run or, for a parameter not in the sheet, like the
+        unchanged ones left out of an incremental export, the one of the product.
+        """
+        if name in self._id_mapping:
+            return self._id_mapping[name]
+        try:
+            param = self._params.get(name=name)
+        except ClientError:
+            return None
+        return param['id'] if param else None
+
     def _process_constraints_dependency(self, ws):
         task = self._progress.add_task(
             'Processing param dependencies',
             total=len(self._param_deps.keys()),
         )
-        for row_idx in range(2, ws.max_row + 1):
-            data = _RowData(*[ws.cell(row_idx, col_idx).value for col_idx in range(1, 15)])
-            if data.verbose_id not in self._param_deps:
-                continue
-
+        for param_id, (row_idx, name, constraints, dependency) in self._param_deps.items():
             self._progress.update(
                 task,
-                description=f'Processing param dependency {data.id}',
+                description=f'Processing param dependency {name}',
                 advance=1,
             )
 
-            param_payload = {'constraints': json.loads(data.json_properties)['constraints']}
-            param_payload['constraints']['required'] = False if data.required == '-' else True
-            param_payload['constraints']['unique'] = False if data.unique == '-' else True
-            param_payload['constraints']['hidden'] = False if data.hidden == '-' else True
-
-            dependency = self._param_deps[data.verbose_id]
-            dependency['parameter']['id'] = self._id_mapping[dependency['parameter']['name']]
-            param_payload['constraints']['dependency'] = dependency
+            dependency_id = self._get_dependency_id(dependency['parameter']['name'])
+            if not dependency_id:
+                self._mstats.error(
+                    f'Parameter {name} depends on {dependency["parameter"]["name"]}, which was '
+                    'not found in the product.',
+                    row_idx,
+                )
+                continue
+            dependency['parameter']['id'] = dependency_id
+            param_payload = {'constraints': dict(constraints, dependency=dependency)}
 
             try:
                 param = (
                     self._client.products[self._product_id]
-                    .parameters[data.verbose_id]
+                    .parameters[param_id]
                     .update(
                         param_payload,
                     )
                 )
-                self._update_sheet_row(ws, row_idx, param)
-                self._mstats.updated()
+                self._params.add(param)
+                self._apply(partial(self._update_sheet_row, ws, row_idx, param))
+                if param_id not in self._counted_params:
+                    self._mstats.updated()
             except Exception as e:
                 self._mstats.error(str(e), row_idx)
 
@@ -1,7 +1,8 @@
 from collections import namedtuple
+from functools import partial
 from urllib.parse import urlparse
 
-from connect.cli.plugins.product.utils import cleanup_product_for_update
+from connect.cli.plugins.product.sync.general import ProductDocument
 from connect.cli.plugins.shared.base import ProductSynchronizer
 from connect.cli.plugins.shared.constants import STATIC_LINK_HEADERS
 
@@ -12,9 +13,10 @@ _RowData = namedtuple('RowData', fields)
 
 
 class StaticResourcesSynchronizer(ProductSynchronizer):
-    def __init__(self, client, progress, stats):
+    def __init__(self, client, progress, stats, document=None):
         super().__init__(client, progress)
         self._mstats = stats['Static Resources']
+        self._document = document
 
     def sync(self):  # noqa: CCR001
         ws = self._wb['Embedding Static Resources']
@@ -23,6 +25,7 @@ class StaticResourcesSynchronizer(ProductSynchronizer):
 
         download = []
         documentation = []
+        saved_rows = []
         for row_idx in range(2, ws.max_row + 1):
             data = _RowData(*[ws.cell(row_idx, col_idx).value for col_idx in range(1, 5)])
             self._progress.update(
@@ -38,7 +41,7 @@ class StaticResourcesSynchronizer(ProductSynchronizer):
                 self._mstats.error(row_errors, row_idx)
                 continue
             if data.action == 'delete':
-                self._mstats.deleted()
+                saved_rows.append((row_idx, self._mstats.deleted))
                 continue
             if data.type == 'Download':
                 download.append(
@@ -58,16 +61,32 @@ class StaticResourcesSynchronizer(ProductSynchronizer):
             if data.action == '-':
                 self._mstats.skipped()
             else:
-                self._mstats.created()
+                saved_rows.append((row_idx, self._mstats.created))
 
         self._progress.update(task, completed=ws.max_row - 1)
-        product = cleanup_product_for_update(self._client.products[self._product_id].get())
+        document = self._document or ProductDocument(self._client, self._product_id)
         try:
+            product = document.product
             product['customer_ui_settings']['download_links'] = download
             product['customer_ui_settings']['documents'] = documentation
-            self._client.products[self._product_id].update(product)
+            document.modified()
         except Exception as e:
-            self._mstats.error(str(e), 1)
+            self._record_saved(saved_rows, e)
+            return
+        document.on_save(partial(self._record_saved, saved_rows))
+        if self._document is None:
+            try:
+                document.save()
+            except Exception:
+                # Already recorded against the rows by _record_saved.
+                pass
+
+    def _record_saved(self, rows, error):
+        for row_idx, count in rows:
+            if error:
+                self._mstats.error(str(error), row_idx)
+            else:
+                count()
 
     @staticmethod
     def _validate_row(data):
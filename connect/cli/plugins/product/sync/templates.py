@@ -3,7 +3,9 @@
 # This file is part of the CloudBlue Connect connect-cli.
 # Copyright (c) 2025 CloudBlue. All rights reserved.
 
+import threading
 from collections import namedtuple
+from functools import partial
 
 from connect.client import ClientError
 
@@ -17,61 +19,93 @@ _RowData = namedtuple('RowData', fields)
 
 
 class TemplatesSynchronizer(ProductSynchronizer):
-    def __init__(self, client, progress, stats):
-        super().__init__(client, progress)
+    def __init__(self, client, progress, stats, workers=1, plan=False, skip_unchanged=False):
+        super().__init__(client, progress, workers, plan, skip_unchanged)
         self._mstats = stats['Templates']
+        self._templates = None
+        self._templates_lock = threading.Lock()
         self._action_handlers = {
             'create': self._action_create,
             'update': self._action_update,
             'delete': self._action_delete,
         }
+        self._action_stats = {
+            'create': self._mstats.created,
+            'update': self._mstats.updated,
+            'delete': self._mstats.deleted,
+        }
 
     def sync(self):
         ws = self._wb['Templates']
 
         task = self._progress.add_task('Processing Template', total=ws.max_row - 1)
+        self._execute_rows(task, self._iter_rows(ws, task))
+
+    def _iter_rows(self, ws, task):
         for row_idx in range(2, ws.max_row + 1):
             data = _RowData(*[ws.cell(row_idx, col_idx).value for col_idx in range(1, 9)])
-            self._progress.update(
-                task,
-                description=f'Processing Template {data.id or data.title}',
-                advance=1,
-            )
-            try:
-                if data.action == '-':
-                    self._mstats.skipped()
-                else:
-                    self._process_row(data, ws, task, row_idx)
-            except Exception as e:
-                self._mstats.error(str(e).split('\n'), row_idx)
+            yield data.id, partial(self._sync_row, ws, task, row_idx, data)
+
+    def _sync_row(self, ws, task, row_idx, data):
+        self._progress.update(
+            task,
+            description=f'Processing Template {data.id or data.title}',
+        )
+        try:
+            if data.action == '-':
+                return self._mstats.skipped
+            return self._process_row(data, ws, task, row_idx)
+        except Exception as e:
+            return partial(self._mstats.error, str(e).split('\n'), row_idx)
 
     def _process_row(self, data, ws, task, row_idx):
         row_errors = self._validate_row(data)
         if row_errors:
             raise Exception('\n'.join(row_errors))
+        if data.action == 'update' and self._is_unchanged_since_export(data):
+            return self._mstats.unchanged
+        if data.action == 'update':
+            current = self._get_current_template(data)
+            if self._skip_unchanged and self._is_unchanged(current, self._row_to_payload(data)):
+                return self._mstats.unchanged
+        if self._plan:
+            return self._action_stats[data.action]
         template = self._action_handlers[data.action](data, task)
-        if template:
-            self._update_sheet_row(ws, row_idx, template)
+
+        def record():
+            self._action_stats[data.action]()
+            if template:
+                self._update_sheet_row(ws, row_idx, template)
+
+        return record
 
     def _action_create(self, data, task):
         self._progress.update(task, description=f'Creating template {data.title}')
         payload = self._row_to_payload(data)
         template = self._client.products[self._product_id].templates.create(payload)
-        self._mstats.created()
         return template
 
     def _action_update(self, data, task):
         self._progress.update(task, description=f'Updating template {data.id}')
+        payload = self._row_to_payload(data)
+        template = self._client.products[self._product_id].templates[data.id].update(payload)
+        return template
 
-        try:
-            current = self._client.products[self._product_id].templates[data.id].get()
-        except ClientError as e:
-            if e.status_code == 404:
-                raise Exception(
-                    f'Cannot update template {data.id} since does not exist in the product. '
-                    'Create it instead',
-                ) from e
-            raise e
+    def _get_current_template(self, data):
+        if self._plan:
+            current = self._get_templates().get(data.id)
+        else:
+            try:
+                current = self._client.products[self._product_id].templates[data.id].get()
+            except ClientError as e:
+                if e.status_code != 404:
+                    raise e
+                current = None
+        if not current:
+            raise Exception(
+                f'Cannot update template {data.id} since does not exist in the product. '
+                'Create it instead',
+            )
 
         payload = self._row_to_payload(data)
         # check not changing scope or type before update
@@ -81,9 +115,16 @@ class TemplatesSynchronizer(ProductSynchronizer):
                 f'Original scope {current["scope"]}, requested scope {payload["scope"]}. '
                 f'Original type {current.get("type")}, requested type {payload.get("type")}',
             )
-        template = self._client.products[self._product_id].templates[data.id].update(payload)
-        self._mstats.updated()
-        return template
+        return current
+
+    def _get_templates(self):
+        with self._templates_lock:
+            if self._templates is None:
+                self._templates = {
+                    template['id']: template
+                    for template in self._client.products[self._product_id].templates.all()
+                }
+            return self._templates
 
     def _action_delete(self, data, task):
         self._progress.update(task, description=f'Deleting template {data.id}')
@@ -93,7 +134,6 @@ class TemplatesSynchronizer(ProductSynchronizer):
             # if the template doesn't exist, perform as success deletion
             if e.status_code != 404:
                 raise
-        self._mstats.deleted()
 
     @staticmethod
     def _row_to_payload(data):
@@ -6,14 +6,14 @@ from datetime import datetime
 
 import pytz
 from click import ClickException
-from connect.client import AsyncConnectClient, ConnectClient
+from connect.client import AsyncConnectClient
 from connect.reports.constants import CLI_ENV
 from connect.reports.datamodels import Account, Report
 from connect.reports.parser import parse
 from connect.reports.renderers import get_renderer
 from connect.reports.validator import validate, validate_with_schema
 
-from connect.cli.core.http import RequestLogger, get_user_agent
+from connect.cli.core.http import ConnectClient, RequestLogger, get_user_agent
 from connect.cli.core.terminal import console
 from connect.cli.core.utils import field_to_check_mark
 from connect.cli.plugins.report.constants import AVAILABLE_REPORTS
@@ -3,27 +3,170 @@
 # This file is part of the CloudBlue Connect connect-cli.
 # Copyright (c) 2019-2025 CloudBlue. All Rights Reserved.
 
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import SimpleQueue
 from zipfile import BadZipFile
 
 from click import ClickException
 from openpyxl import load_workbook
 from openpyxl.utils.exceptions import InvalidFileException
 
+from connect.cli.plugins.shared.constants import ROW_HASHES_SHEET
 from connect.cli.plugins.shared.exceptions import SheetNotFoundError
 from connect.cli.plugins.shared.utils import (
     get_col_headers_by_ws_type,
     get_col_limit_by_ws_type,
+    get_row_hash,
     get_ws_type_by_worksheet_name,
 )
 
 
+def load_input_workbook(input_file):
+    try:
+        return load_workbook(
+            input_file,
+            data_only=True,
+        )
+    except InvalidFileException as ife:
+        raise ClickException(str(ife))
+    except BadZipFile:
+        raise ClickException(f'{input_file} is not a valid xlsx file.')
+
+
+class WorkbookSession:
+    """
+    Workbook shared by all the synchronizers of a sync run: the input file is
+    loaded the first time a synchronizer opens it and is written back once, when
+    the session is closed. If `checkpoint` is given, the workbook is also written
+    every `checkpoint` saves so a long run doesn't lose all its progress on failure.
+    If `workbook` is given, that in-memory workbook is synchronized instead and is
+    never written. The media files are read from the `media` folder next to the
+    input file unless a `media` store, with `exists(name)` and `open(name)`, is given.
+
+    openpyxl workbooks are not thread-safe, so synchronizers running concurrently
+    write to the workbook through `apply`, and the writes are applied one at a
+    time on the thread that called `run`.
+    """
+
+    def __init__(self, input_file, checkpoint=None, workbook=None, media=None):
+        self.input_file = input_file
+        self.media = media
+        self._checkpoint = checkpoint
+        self._wb = workbook
+        self._in_memory = workbook is not None
+        self._pending_saves = 0
+        self._writes = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def workbook(self):
+        if self._wb is None:
+            self._wb = load_input_workbook(self.input_file)
+        return self._wb
+
+    @property
+    def sheetnames(self):
+        return self.workbook.sheetnames
+
+    def save(self):
+        self._pending_saves += 1
+        if self._checkpoint and self._pending_saves >= self._checkpoint:
+            self.flush()
+
+    def flush(self):
+        if self._pending_saves and not self._in_memory:
+            self._wb.save(self.input_file)
+        self._pending_saves = 0
+
+    def close(self):
+        self.flush()
+
+    def run(self, fn):
+        """
+        Run `fn` on another thread and apply the writes it, or the threads it
+        starts, send to `apply` on the calling thread until it returns. Return the
+        result of `fn` or raise its error.
+        """
+        self._writes = SimpleQueue()
+        self._writer = threading.get_ident()
+        result = Future()
+
+        def target():
+            try:
+                result.set_result(fn())
+            except BaseException as e:
+                result.set_exception(e)
+            finally:
+                self._writes.put(None)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        try:
+            while True:
+                write = self._writes.get()
+                if write is None:
+                    break
+                record, future = write
+                try:
+                    future.set_result(record())
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            thread.join()
+            self._writes = None
+            self._writer = None
+        return result.result()
+
+    def apply(self, record):
+        """
+        Call `record`, a function writing to the workbook, on the thread running
+        `run` and wait for it, or call it right away outside `run`.
+        """
+        writes = self._writes
+        if writes is None or threading.get_ident() == self._writer:
+            return record()
+        future = Future()
+        writes.put((record, future))
+        return future.result()
+
+
+_existing_products = weakref.WeakKeyDictionary()
+_existing_products_lock = threading.Lock()
+
+
+def _run_chain(chain):
+    for operation, future in chain:
+        if not future.set_running_or_notify_cancel():
+            continue
+        try:
+            future.set_result(operation())
+        except BaseException as e:
+            future.set_exception(e)
+
+
 class ProductSynchronizer:
-    def __init__(self, client, progress):
+    def __init__(self, client, progress, workers=1, plan=False, skip_unchanged=False):
         self._client = client
         self._progress = progress
+        self._workers = workers
+        self._plan = plan
+        self._skip_unchanged = plan or skip_unchanged
+        self._row_hashes = None
         self._product_id = None
+        self._input_file = None
+        self._media = None
         self._wb = None
         self._ws = None
+        self._session = None
 
     def open(self, input_file, worksheet):
         self._open_workbook(input_file)
@@ -31,7 +174,7 @@ class ProductSynchronizer:
             raise SheetNotFoundError(f'File does not contain {worksheet} to synchronize, skipping')
         ws = self._wb['General Information']
         product_id = ws['B5'].value
-        if not self._client.products[product_id].exists():
+        if not self._product_exists(product_id):
             raise ClickException(f'Product {product_id} not found, create it first.')
         self._ws = self._wb[worksheet]
         self._validate_worksheet_sheet(self._ws, worksheet)
@@ -42,19 +185,136 @@ class ProductSynchronizer:
     def sync(self):
         raise NotImplementedError('Not implemented')
 
+    def _product_exists(self, product_id):
+        """
+        Check whether the product exists, asking Connect only the first time a
+        product is checked through the same client.
+        """
+        with _existing_products_lock:
+            existing = _existing_products.setdefault(self._client, set())
+            if product_id not in existing:
+                if not self._client.products[product_id].exists():
+                    return False
+                existing.add(product_id)
+            return True
+
     def save(self, output_file):
-        self._wb.save(output_file)
+        if self._plan:
+            return
+        if isinstance(output_file, WorkbookSession):
+            output_file.save()
+        else:
+            self._wb.save(output_file)
 
-    def _open_workbook(self, input_file):
+    def _execute_rows(self, task, rows):
+        """
+        Run the operations of the rows of a sheet and record their outcome.
+
+        `rows` yields `(key, operation)` tuples in row order. `operation()` performs
+        the remote calls of a row and returns a function, or None, that records the
+        outcome of the row, i.e. its stats and the write-back to the sheet.
+        Operations run on up to `workers` threads, one after the other for rows
+        sharing the same not None key, while outcomes are recorded on the calling
+        thread in row order, as if the rows were processed one by one.
+        """
+        if self._workers == 1:
+            for _, operation in rows:
+                self._record_row(task, operation())
+            return
+
+        chains = {}
+        futures = []
+        for key, operation in rows:
+            future = Future()
+            futures.append(future)
+            if key is None or key not in chains:
+                chains[key if key is not None else object()] = [(operation, future)]
+            else:
+                chains[key].append((operation, future))
+
+        executor = ThreadPoolExecutor(max_workers=self._workers)
         try:
-            self._wb = load_workbook(
-                input_file,
-                data_only=True,
-            )
-        except InvalidFileException as ife:
-            raise ClickException(str(ife))
-        except BadZipFile:
-            raise ClickException(f'{input_file} is not a valid xlsx file.')
+            for chain in chains.values():
+                executor.submit(_run_chain, chain)
+            for future in futures:
+                self._record_row(task, future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _record_row(self, task, record):
+        if record:
+            self._apply(record)
+        self._progress.update(task, advance=1)
+
+    def _apply(self, record):
+        """
+        Call `record`, which writes to the workbook, through the session of the
+        workbook if it is shared.
+        """
+        if self._session is not None:
+            return self._session.apply(record)
+        return record()
+
+    @classmethod
+    def _is_unchanged(cls, original, payload):
+        """
+        Return True if updating `original` with `payload` would not change it, i.e.
+        every field of the payload, recursively, has the same value in `original`.
+        """
+        if not isinstance(payload, dict):
+            return original == payload
+        if not isinstance(original, dict):
+            return False
+        return all(k in original and cls._is_unchanged(original[k], v) for k, v in payload.items())
+
+    def _is_unchanged_since_export(self, data):
+        """
+        Return True if skipping unchanged rows and the row `data`, but its action,
+        is still as it was exported, according to the hashes stored by the export
+        in the hidden `Row Hashes` sheet.
+        """
+        if not self._skip_unchanged:
+            return False
+        if self._row_hashes is None:
+            row_hashes = {}
+            if ROW_HASHES_SHEET in self._wb.sheetnames:
+                hashes_ws = self._wb[ROW_HASHES_SHEET]
+                for sheet, row_hash in hashes_ws.iter_rows(min_row=2, max_col=2, values_only=True):
+                    row_hashes.setdefault(sheet, set()).add(row_hash)
+            self._row_hashes = row_hashes
+        row_hash = get_row_hash(
+            value for field, value in zip(data._fields, data) if field != 'action'
+        )
+        return row_hash in self._row_hashes.get(self._ws.title, ())
+
+    def _open_workbook(self, input_file):
+        """
+        Open `input_file`, which is either the path of the file to synchronize or
+        a `WorkbookSession` shared with other synchronizers.
+        """
+        if isinstance(input_file, WorkbookSession):
+            self._session = input_file
+            self._input_file = input_file.input_file
+            self._media = input_file.media
+            self._wb = input_file.workbook
+        else:
+            self._input_file = input_file
+            self._wb = load_input_workbook(input_file)
+
+    def _get_media_file_path(self, file_name):
+        return os.path.join(os.path.dirname(self._input_file), 'media', file_name)
+
+    def _media_file_exists(self, file_name):
+        if self._media is not None:
+            return self._media.exists(file_name)
+        return os.path.isfile(self._get_media_file_path(file_name))
+
+    def _open_media_file(self, file_name):
+        if self._media is not None:
+            return self._media.open(file_name)
+        return open(self._get_media_file_path(file_name), 'rb')
 
     @staticmethod
     def _validate_worksheet_sheet(ws, worksheet):
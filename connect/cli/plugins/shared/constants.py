@@ -121,3 +121,5 @@ MESSAGES_HEADERS = {
     'D': 'Value',
     'E': 'Auto',
 }
+
+ROW_HASHES_SHEET = 'Row Hashes'
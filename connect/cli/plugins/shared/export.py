@@ -4,8 +4,10 @@ from io import BytesIO
 from click import ClickException
 from connect.client import ClientError
 from openpyxl import load_workbook
+from openpyxl.cell import Cell, MergedCell, WriteOnlyCell
 from openpyxl.styles import Alignment
 from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_to_tuple, range_boundaries
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.worksheet.filters import AutoFilter
 
@@ -66,3 +68,96 @@ def alter_attributes_sheet(ws):
     ws.auto_filter = AutoFilter(ref=f'A:{get_column_letter(ws.max_column)}')
     for col_idx in range(1, ws.max_column + 1):
         ws.auto_filter.add_filter_column(col_idx, [], blank=False)
+
+
+class StreamingWorksheet:
+    """
+    Random access facade over a write-only worksheet.
+
+    Cells are buffered by row and streamed to the underlying worksheet as soon
+    as a cell of a later row is written, so rows must be filled in order and
+    column dimensions must be set up before the second row is written. The
+    remaining rows are streamed when the worksheet is closed by saving the
+    workbook.
+    """
+
+    def __init__(self, ws):
+        self._ws = ws
+        self._rows = {}
+        self._next_row = 1
+        self.max_row = 0
+        self._close = ws.close
+        ws.close = self.close
+
+    def __getattr__(self, name):
+        return getattr(self._ws, name)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            key = f'{key.start}:{key.stop}'
+        if ':' in key:
+            min_col, min_row, max_col, max_row = range_boundaries(key)
+            return tuple(
+                tuple(self.cell(row, col) for col in range(min_col, max_col + 1))
+                for row in range(min_row, max_row + 1)
+            )
+        return self.cell(*coordinate_to_tuple(key))
+
+    def add_data_validation(self, data_validation):
+        self._ws.data_validations.append(data_validation)
+
+    def cell(self, row, column, value=None):
+        if row < self._next_row:
+            raise ValueError(f'Row {row} of {self._ws.title} has already been written.')
+        if row > self.max_row:
+            self._flush(row)
+            self.max_row = row
+        cells = self._rows.setdefault(row, {})
+        if column not in cells:
+            cells[column] = Cell(self._ws, row=row, column=column)
+        if value is not None:
+            cells[column].value = value
+        return cells[column]
+
+    def close(self):
+        self._flush(self.max_row + 1)
+        self._close()
+
+    def _flush(self, until_row):
+        for row in sorted(r for r in self._rows if r < until_row):
+            while self._next_row < row:
+                self._ws.append([])
+                self._next_row += 1
+            cells = self._rows.pop(row)
+            self._ws.append([cells.get(col) for col in range(1, max(cells) + 1)])
+            self._next_row += 1
+
+
+def stream_worksheet(src, dst):
+    """
+    Copy a regular worksheet, including its styles, column widths, merged cells,
+    data validations and auto filter, into a write-only worksheet.
+    """
+    for key, dimension in src.column_dimensions.items():
+        dst.column_dimensions[key].width = dimension.width
+        dst.column_dimensions[key].bestFit = dimension.bestFit
+    for merged_range in src.merged_cells.ranges:
+        dst.merged_cells.add(merged_range.coord)
+    for data_validation in src.data_validations.dataValidation:
+        dst.data_validations.append(data_validation)
+    dst.auto_filter = src.auto_filter
+
+    for row in src.iter_rows(min_row=1, max_row=src.max_row):
+        cells = []
+        for cell in row:
+            if isinstance(cell, MergedCell) or (cell.value is None and not cell.has_style):
+                cells.append(None)
+                continue
+            new_cell = WriteOnlyCell(dst, cell.value)
+            if cell.has_style:
+                new_cell.font = copy(cell.font)
+                new_cell.fill = copy(cell.fill)
+                new_cell.alignment = copy(cell.alignment)
+                new_cell.number_format = cell.number_format
+            cells.append(new_cell)
+        dst.append(cells)
@@ -17,6 +17,7 @@ class SynchronizerStats(dict):
 
     stats['module name'].updated()  # +1 updated
     stats['module name'].deleted(3)  # +3 deleted
+    stats['module name'].unchanged()  # +1 skipped since it is already up to date
 
     To track errors:
 
@@ -24,6 +25,10 @@ class SynchronizerStats(dict):
     stats['module name'].error('first error', 7)  # add an error in row #7
     stats['module name'].error(['second error', 'third error'], 7)  # add more errors in row #7
     stats['module name'].error('the error', range(1, 11))  # add an error in rows #1 to #10
+
+    To track how long each stage of the operation took:
+
+    stats.timings['stage name'] = 1.5  # seconds
     """
 
     COLUMNS = (
@@ -35,11 +40,26 @@ class SynchronizerStats(dict):
         ('right', 'Skipped'),
         ('right', 'Errors'),
     )
+    PLAN_COLUMNS = (
+        'Module',
+        ('right', 'Rows'),
+        ('right', 'Create'),
+        ('right', 'Update'),
+        ('right', 'Delete'),
+        ('right', 'No-op'),
+        ('right', 'Skip'),
+        ('right', 'Errors'),
+    )
+    TIMINGS_COLUMNS = (
+        'Stage',
+        ('right', 'Seconds'),
+    )
 
     def __init__(self, *args, operation='Sync', header='Results of synchronization'):
         self._initial_modules = args
         self.operation = operation
         self.header = header
+        self.timings = {}
         self.reset()
 
     def __str__(self):
@@ -47,7 +67,8 @@ class SynchronizerStats(dict):
 
     def __getitem__(self, key):
         if key not in self:
-            self[key] = _SynchronizerStatsModule(key)
+            # setdefault so that modules first used concurrently are created once
+            self.setdefault(key, _SynchronizerStatsModule(key))
         return super().__getitem__(key)
 
     def reset(self):
@@ -61,23 +82,38 @@ class SynchronizerStats(dict):
     def print(self):
         console.header(self.header)
         self.print_results()
+        self.print_timings()
         self.print_errors()
 
     def print_results(self):
-        console.table(
-            columns=self.COLUMNS,
-            rows=[
+        if self.operation == 'Plan':
+            columns = self.PLAN_COLUMNS
+            rows = [
+                (module_stats.name, *module_stats.get_plan_counts_as_tuple())
+                for module_stats in self.values()
+            ]
+        else:
+            columns = self.COLUMNS
+            rows = [
                 (module_stats.name, *module_stats.get_counts_as_tuple())
                 for module_stats in self.values()
-            ],
-            expand=True,
-        )
+            ]
+        console.table(columns=columns, rows=rows, expand=True)
+
+    def print_timings(self):
+        if not self.timings:
+            return
+        rows = [(stage, f'{seconds:.2f}') for stage, seconds in self.timings.items()]
+        console.table(columns=self.TIMINGS_COLUMNS, rows=rows, expand=True)
 
-    def print_errors(self):  # noqa: CCR001
-        total_error_count = sum(
+    def get_error_count(self):
+        return sum(
             len(module_stats._errors) + len(module_stats._row_errors)
             for module_stats in self.values()
         )
+
+    def print_errors(self):
+        total_error_count = self.get_error_count()
         if total_error_count == 0:
             return
 
@@ -87,6 +123,9 @@ class SynchronizerStats(dict):
         )
 
         console.echo('')
+        self.print_error_details()
+
+    def print_error_details(self):  # noqa: CCR001
         for module_stats in filter(lambda ms: ms._errors or ms._row_errors, self.values()):
             console.secho(f'Module {module_stats.name}:\n', fg='magenta')
 
@@ -120,6 +159,77 @@ class SynchronizerStats(dict):
         console.echo('')
 
 
+class CombinedSynchronizerStats(dict):
+    """
+    Stats of the same operation run against several targets, like a product cloned
+    to several accounts, printed together. Each target has its own SynchronizerStats:
+
+    stats['VA-000']['module name'].created()
+    """
+
+    def __init__(
+        self,
+        targets,
+        operation='Sync',
+        header='Results of synchronization',
+        target_column='Target',
+    ):
+        super().__init__(
+            (target, SynchronizerStats(operation=operation, header=header)) for target in targets
+        )
+        self.operation = operation
+        self.header = header
+        self.target_column = target_column
+
+    def print(self):
+        console.header(self.header)
+        self.print_results()
+        self.print_timings()
+        self.print_errors()
+
+    def print_results(self):
+        rows = [
+            (target, module_stats.name, *module_stats.get_counts_as_tuple())
+            for target, stats in self.items()
+            for module_stats in stats.values()
+        ]
+        console.table(
+            columns=(self.target_column, *SynchronizerStats.COLUMNS),
+            rows=rows,
+            expand=True,
+        )
+
+    def print_timings(self):
+        rows = [
+            (target, stage, f'{seconds:.2f}')
+            for target, stats in self.items()
+            for stage, seconds in stats.timings.items()
+        ]
+        if not rows:
+            return
+        console.table(
+            columns=(self.target_column, *SynchronizerStats.TIMINGS_COLUMNS),
+            rows=rows,
+            expand=True,
+        )
+
+    def print_errors(self):
+        total_error_count = sum(stats.get_error_count() for stats in self.values())
+        if total_error_count == 0:
+            return
+
+        console.confirm(
+            f'\n{self.operation} operation had {total_error_count} errors, do you want to see them?',
+            abort=True,
+        )
+
+        console.echo('')
+        for target, stats in self.items():
+            if stats.get_error_count():
+                console.secho(f'{self.target_column} {target}:\n', fg='blue')
+                stats.print_error_details()
+
+
 class _SynchronizerStatsModule:
     def __init__(self, name):
         self.name = name
@@ -133,6 +243,7 @@ class _SynchronizerStatsModule:
         self._created = 0
         self._deleted = 0
         self._skipped = 0
+        self._unchanged = 0
         self._errors = []
         self._row_errors = defaultdict(list)
 
@@ -148,6 +259,14 @@ class _SynchronizerStatsModule:
     def skipped(self, count=1):
         self._skipped += count
 
+    def unchanged(self, count=1):
+        """
+        Track rows skipped because they match the remote object they refer to.
+        They are counted as skipped too.
+        """
+        self._unchanged += count
+        self._skipped += count
+
     def error(self, err, row=None):
         if not isinstance(err, (list, tuple)):
             err = [err]
@@ -190,6 +309,17 @@ class _SynchronizerStatsModule:
             len(self._errors) + len(self._row_errors),
         )
 
+    def get_plan_counts_as_tuple(self):
+        return (
+            self.get_processed_count(),
+            self._created,
+            self._updated,
+            self._deleted,
+            self._unchanged,
+            self._skipped - self._unchanged,
+            len(self._errors) + len(self._row_errors),
+        )
+
 
 class SynchronizerStatsSingleModule(_SynchronizerStatsModule):
     """
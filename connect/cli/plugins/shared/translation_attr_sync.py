@@ -4,13 +4,11 @@
 # Copyright (c) 2019-2025 CloudBlue. All Rights Reserved.
 import math
 from collections import namedtuple
-from zipfile import BadZipFile
 
 import click
 from connect.client import ClientError
-from openpyxl import load_workbook
-from openpyxl.utils.exceptions import InvalidFileException
 
+from connect.cli.plugins.shared.base import WorkbookSession, load_input_workbook
 from connect.cli.plugins.shared.constants import ATTRIBUTES_SHEET_COLUMNS
 from connect.cli.plugins.shared.exceptions import SheetNotFoundError
 from connect.cli.plugins.shared.sync_stats import SynchronizerStats
@@ -46,7 +44,10 @@ class TranslationAttributesSynchronizer:
         self._validate_attributes_worksheet(self._ws)
 
     def save(self, output_file):
-        self._wb.save(output_file)
+        if isinstance(output_file, WorkbookSession):
+            output_file.save()
+        else:
+            self._wb.save(output_file)
 
     def sync(self, translation, is_clone=False):
         translation_id = self._get_translation_id(translation)
@@ -55,12 +56,10 @@ class TranslationAttributesSynchronizer:
             self._update_attributes(translation_id, attributes, self._ws)
 
     def _open_workbook(self, input_file):
-        try:
-            self._wb = load_workbook(input_file, data_only=True)
-        except InvalidFileException as ife:
-            raise click.ClickException(str(ife))
-        except BadZipFile:
-            raise click.ClickException(f'{input_file} is not a valid xlsx file.')
+        if isinstance(input_file, WorkbookSession):
+            self._wb = input_file.workbook
+        else:
+            self._wb = load_input_workbook(input_file)
 
     @staticmethod
     def _validate_attributes_worksheet(ws):
@@ -2,8 +2,12 @@
 
 # This file is part of the CloudBlue Connect connect-cli.
 # Copyright (c) 2019-2025 CloudBlue. All Rights Reserved.
+import hashlib
+import json
 import re
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import SimpleQueue
+from time import monotonic, sleep
 
 import click
 from connect.client import ClientError
@@ -204,3 +208,106 @@ def setup_locale_data_validation(general_ws, translations_ws):
     )
     translations_ws.add_data_validation(locales_validation)
     locales_validation.add(f'G2:G{translations_ws.max_row}')
+
+
+def run_concurrently(tasks, workers, progress=None, description=None):
+    """
+    Run the callables of the `tasks` dict in a pool of `workers` threads and
+    return a dict with their results under the same keys. The first error
+    cancels the tasks not started yet and is re-raised.
+    """
+    results = {}
+    if not tasks:
+        return results
+
+    task = progress.add_task(description, total=len(tasks)) if progress else None
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(fn): key for key, fn in tasks.items()}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if progress:
+                progress.update(task, advance=1)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def split_workers(workers, count):
+    """
+    Split a budget of `workers` threads between a pool that runs `count` tasks
+    and the pools each of those tasks runs, so nested pools use at most `workers`
+    threads in total. Return the size of the outer and of every inner pool.
+    """
+    outer = max(1, min(workers, count))
+    return outer, max(1, workers // outer)
+
+
+def _run_timed(fn):
+    start = monotonic()
+    fn()
+    return monotonic() - start
+
+
+def run_dag(tasks, workers, progress=None, description=None):
+    """
+    Run the tasks of the `tasks` dict, whose values are `(callable, dependencies)`
+    tuples, in a pool of `workers` threads. Each task starts as soon as all the
+    tasks it depends on are done. Return a dict with the seconds each task took,
+    in the order they finished. The first error cancels the tasks not started yet
+    and is re-raised.
+    """
+    for key, (_, dependencies) in tasks.items():
+        unknown = set(dependencies) - set(tasks)
+        if unknown:
+            raise ValueError(f'Task {key} depends on unknown tasks: {", ".join(sorted(unknown))}.')
+
+    timings = {}
+    waiting = {}
+    dependents = {key: [] for key in tasks}
+    for key, (_, dependencies) in tasks.items():
+        waiting[key] = len(set(dependencies))
+        for dependency in set(dependencies):
+            dependents[dependency].append(key)
+    finished = SimpleQueue()
+    task = progress.add_task(description, total=len(tasks)) if progress else None
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    def submit(key):
+        future = executor.submit(_run_timed, tasks[key][0])
+        future.add_done_callback(lambda f: finished.put((key, f)))
+
+    try:
+        running = 0
+        for key, count in waiting.items():
+            if not count:
+                submit(key)
+                running += 1
+        while running:
+            key, future = finished.get()
+            running -= 1
+            timings[key] = future.result()
+            if progress:
+                progress.update(task, advance=1)
+            for dependent in dependents[key]:
+                waiting[dependent] -= 1
+                if not waiting[dependent]:
+                    submit(dependent)
+                    running += 1
+        if len(timings) < len(tasks):
+            raise ValueError(
+                'Circular dependency between tasks: '
+                f'{", ".join(sorted(set(tasks) - set(timings)))}.',
+            )
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return timings
+
+
+def get_row_hash(values):
+    """
+    Return the hash of the values of a sheet row. Values are compared as text, so
+    the hash of a row is the same when it is written and when it is read back.
+    """
+    content = json.dumps(['' if value is None else str(value) for value in values])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
@@ -1,7 +1,12 @@
 import click
-from connect.client import ClientError, ConnectClient
+from connect.client import ClientError
 
-from connect.cli.core.http import RequestLogger, format_http_status, handle_http_error
+from connect.cli.core.http import (
+    ConnectClient,
+    RequestLogger,
+    format_http_status,
+    handle_http_error,
+)
 
 
 def primarize_translation(
@@ -1,6 +1,14 @@
+import click
+import pytest
 from click.testing import CliRunner
 
-from connect.cli.core.base import cli, print_version
+from connect.cli.core.base import (
+    LazyGroup,
+    cli,
+    get_config_dir,
+    print_version,
+)
+from connect.cli.core.constants import DEFAULT_CONFIG_DIR
 
 
 def test_cli_confdir_exists(mocker, fs):
@@ -26,3 +34,47 @@ def test_cli_print_version(mocker, capsys):
     captured = capsys.readouterr()
     assert 'CloudBlue Connect CLI, version 1.0.0' in captured.out
     mocked.assert_called_once()
+
+
+def test_lazy_group_loads_on_resolve(mocker):
+    grp = LazyGroup('root')
+    command = click.Command('lazy', short_help='Lazy command.')
+    loader = mocker.MagicMock(return_value=command)
+
+    grp.add_lazy_command('lazy', loader, 'Lazy command.')
+
+    assert grp.list_commands(None) == ['lazy']
+    loader.assert_not_called()
+    assert grp.get_command(None, 'lazy') is command
+    assert grp.get_command(None, 'lazy') is command
+    loader.assert_called_once()
+    assert 'lazy' in grp.commands
+    assert 'lazy' not in grp.lazy_commands
+
+
+def test_lazy_group_help_does_not_load(mocker):
+    grp = LazyGroup('root')
+    grp.add_command(click.Command('eager', short_help='Eager command.'))
+    loader = mocker.MagicMock()
+    grp.add_lazy_command('lazy', loader, 'Lazy command.')
+
+    result = CliRunner().invoke(grp, ['--help'])
+
+    assert result.exit_code == 0
+    assert 'eager  Eager command.' in result.output
+    assert 'lazy   Lazy command.' in result.output
+    loader.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ('args', 'expected'),
+    (
+        ([], DEFAULT_CONFIG_DIR),
+        (['-c', '/config', 'account', 'list'], '/config'),
+        (['--config-dir=/config', '--help'], '/config'),
+        (['product', 'sync', '-c', '/config'], DEFAULT_CONFIG_DIR),
+        (['--unknown'], DEFAULT_CONFIG_DIR),
+    ),
+)
+def test_get_config_dir(args, expected):
+    assert get_config_dir(args) == expected
@@ -13,6 +13,7 @@ def test_load(config_mocker, mocker):
     assert config.active is not None
     assert config.active.id == 'VA-000'
     assert len(config.accounts) == 2
+    assert config.config_dir == '/tmp'
 
 
 def test_store(mocker):
@@ -172,3 +173,21 @@ def test_config_validate():
     )
 
     assert config.validate() is None
+
+
+def test_load_does_not_build_clients(config_mocker, mocker):
+    mocked_client = mocker.patch('connect.cli.core.config.ConnectClient')
+    config = Config()
+    config.load('/tmp')
+
+    mocked_client.assert_not_called()
+
+    assert config.active.client is mocked_client.return_value
+    assert config.active.client is mocked_client.return_value
+    mocked_client.assert_called_once_with(
+        'ApiKey XXXX:YYYY',
+        endpoint=config.active.endpoint,
+        use_specs=False,
+        max_retries=3,
+        logger=mocker.ANY,
+    )
@@ -5,9 +5,14 @@ from click import ClickException
 from connect.client import ClientError
 
 from connect.cli import get_version
+from connect.cli.core.constants import DEFAULT_HTTP_POOL_SIZE
 from connect.cli.core.http import (
+    ConnectClient,
     RequestLogger,
     format_http_status,
+    get_pool_size,
+    get_session,
+    get_transport,
     get_user_agent,
     handle_http_error,
 )
@@ -75,3 +80,60 @@ def test_request_logger_creation_empty(mocker):
     mocker.patch('connect.cli.core.http.console', mocked_console)
     req_logger = RequestLogger()
     assert req_logger._file is None
+
+
+def test_request_logger_shares_devnull(mocker):
+    mocked_console = mocker.MagicMock()
+    mocked_console.verbose = False
+    mocker.patch('connect.cli.core.http.console', mocked_console)
+
+    assert RequestLogger()._file is RequestLogger()._file
+
+
+def test_get_transport_shared_by_origin(mocker):
+    mocker.patch.dict('connect.cli.core.http._TRANSPORTS', clear=True)
+    mocker.patch.dict('os.environ', {'CCLI_HTTP_POOL_SIZE': '25'})
+
+    transport = get_transport('https://api.example.com/public/v1')
+
+    assert get_transport('https://api.example.com/media/image.png') is transport
+    assert get_transport('https://other.example.com/public/v1') is not transport
+    assert transport._pool_maxsize == 25
+
+
+@pytest.mark.parametrize('value', ('', 'wrong'))
+def test_get_pool_size_invalid(mocker, value):
+    mocker.patch.dict('os.environ', {'CCLI_HTTP_POOL_SIZE': value})
+
+    assert get_pool_size() == DEFAULT_HTTP_POOL_SIZE
+
+
+def test_get_session_reuses_transport(mocker):
+    mocker.patch.dict('connect.cli.core.http._TRANSPORTS', clear=True)
+
+    session = get_session('https://api.example.com/media/image.png')
+
+    assert get_session('https://pypi.org/pypi/connect-cli/json') is session
+    assert session.get_adapter('https://api.example.com/other') is get_transport(
+        'https://api.example.com',
+    )
+
+
+def test_connect_client_uses_shared_transport(mocker):
+    mocker.patch.dict('connect.cli.core.http._TRANSPORTS', clear=True)
+
+    client1 = ConnectClient('ApiKey 1', endpoint='https://api.example.com/public/v1')
+    client2 = ConnectClient('ApiKey 2', endpoint='https://api.example.com/public/v1')
+
+    assert client1.session is not client2.session
+    assert client1.session.get_adapter(
+        'https://api.example.com/public/v1/products',
+    ) is client2.session.get_adapter('https://api.example.com/public/v1/products')
+
+
+def test_connect_client_shared_transport_requests(mocked_responses):
+    mocked_responses.add('GET', 'https://api.example.com/public/v1/products/PRD-000', json={})
+
+    client = ConnectClient('ApiKey 1', endpoint='https://api.example.com/public/v1')
+
+    assert client.products['PRD-000'].get() == {}
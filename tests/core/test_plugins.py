@@ -1,8 +1,12 @@
+import json
+import os
 from importlib.metadata import EntryPoint
 
 import click
+import pytest
 
-from connect.cli.core.plugins import load_plugins
+from connect.cli.core.base import LazyGroup
+from connect.cli.core.plugins import get_environment_fingerprint, load_plugins
 
 
 def test_load_plugins(mocker):
@@ -60,3 +64,133 @@ def test_load_no_external(mocker):
 
     assert 'internal' in cli.commands
     assert 'plugin' not in cli.commands
+
+
+def _mock_entrypoints(mocker):
+    groups = {
+        'locales': click.Group('locale', short_help='List all locales available.'),
+        'external': click.Group('external', help='External plugin.\n\nWith a long help.'),
+    }
+    mocked_load = mocker.patch.object(
+        EntryPoint,
+        'load',
+        autospec=True,
+        side_effect=lambda entrypoint: lambda: groups[entrypoint.name],
+    )
+    mocked_iter = mocker.patch(
+        'connect.cli.core.plugins.iter_entry_points',
+        side_effect=lambda group: iter(
+            [
+                EntryPoint('locales', 'connect.cli.plugins.locale.commands:get_group', None),
+                EntryPoint('external', 'external.cli.plugin:get_group', None),
+            ],
+        ),
+    )
+    return mocked_iter, mocked_load
+
+
+def test_load_plugins_without_cache(mocker):
+    _, mocked_load = _mock_entrypoints(mocker)
+
+    cli = LazyGroup()
+    load_plugins(cli)
+
+    assert mocked_load.call_count == 2
+    assert cli.commands['locale'].name == 'locale'
+    assert cli.commands['plugin'].commands['external'].name == 'external'
+
+
+def test_load_plugins_writes_cache(mocker, tmp_path):
+    _mock_entrypoints(mocker)
+
+    load_plugins(LazyGroup(), cache_dir=str(tmp_path))
+
+    data = json.load(open(tmp_path / 'plugins.json'))
+    assert data['fingerprint'] == get_environment_fingerprint()
+    assert data['plugins'] == [
+        {
+            'name': 'locales',
+            'value': 'connect.cli.plugins.locale.commands:get_group',
+            'command': 'locale',
+            'short_help': 'List all locales available.',
+        },
+        {
+            'name': 'external',
+            'value': 'external.cli.plugin:get_group',
+            'command': 'external',
+            'short_help': 'External plugin.',
+        },
+    ]
+
+
+def test_load_plugins_from_cache(mocker, tmp_path):
+    mocked_iter, mocked_load = _mock_entrypoints(mocker)
+    load_plugins(LazyGroup(), cache_dir=str(tmp_path))
+    mocked_iter.reset_mock()
+    mocked_load.reset_mock()
+
+    cli = LazyGroup()
+    load_plugins(cli, cache_dir=str(tmp_path))
+
+    mocked_iter.assert_not_called()
+    mocked_load.assert_not_called()
+    assert 'locale' in cli.lazy_commands
+    assert cli.commands['plugin'].lazy_commands['external'][1] == 'External plugin.'
+
+    assert cli.commands['plugin'].get_command(None, 'external').name == 'external'
+    mocked_load.assert_called_once()
+
+
+def test_load_plugins_cache_invalidated(mocker, tmp_path):
+    mocked_iter, _ = _mock_entrypoints(mocker)
+    load_plugins(LazyGroup(), cache_dir=str(tmp_path))
+    mocked_iter.reset_mock()
+
+    mocker.patch(
+        'connect.cli.core.plugins.get_environment_fingerprint',
+        return_value={'version': 'other'},
+    )
+    load_plugins(LazyGroup(), cache_dir=str(tmp_path))
+
+    mocked_iter.assert_called_once()
+    data = json.load(open(tmp_path / 'plugins.json'))
+    assert data['fingerprint'] == {'version': 'other'}
+
+
+def test_load_plugins_corrupted_cache(mocker, tmp_path):
+    mocked_iter, _ = _mock_entrypoints(mocker)
+    (tmp_path / 'plugins.json').write_text('not json')
+
+    cli = LazyGroup()
+    load_plugins(cli, cache_dir=str(tmp_path))
+
+    mocked_iter.assert_called_once()
+    assert 'locale' in cli.commands
+
+
+def test_environment_fingerprint_changes_on_install(tmp_path, mocker):
+    mocker.patch('connect.cli.core.plugins.sys.path', ['', str(tmp_path), '/not/existing'])
+
+    before = get_environment_fingerprint()
+    assert [p for p, _ in before['paths']] == [str(tmp_path)]
+
+    os.utime(tmp_path, ns=(0, 0))
+    assert get_environment_fingerprint() != before
+
+
+def test_load_plugins_import_error(mocker, tmp_path):
+    mocker.patch.object(EntryPoint, 'load', side_effect=OSError('no library called "cairo"'))
+    mocker.patch(
+        'connect.cli.core.plugins.iter_entry_points',
+        return_value=iter(
+            [EntryPoint('report', 'connect.cli.plugins.report.commands:get_group', None)],
+        ),
+    )
+
+    cli = LazyGroup()
+    load_plugins(cli, cache_dir=str(tmp_path))
+
+    assert 'report' in cli.lazy_commands
+    assert json.load(open(tmp_path / 'plugins.json'))['plugins'][0]['command'] == 'report'
+    with pytest.raises(OSError):
+        cli.get_command(None, 'report')
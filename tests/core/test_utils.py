@@ -171,7 +171,8 @@ def test_check_for_updates_no_matching_version_upgrade(mocker, capsys, mocked_re
 
 
 def test_check_for_updates_version_exception(mocker, capsys, mocked_responses):
-    mocker.patch('connect.cli.core.utils.requests.get', side_effect=RequestException())
+    mocked_session = mocker.patch('connect.cli.core.utils.get_session').return_value
+    mocked_session.get.side_effect = RequestException()
 
     utils.check_for_updates()
 
@@ -182,7 +183,8 @@ def test_check_for_updates_version_exception(mocker, capsys, mocked_responses):
 def test_check_for_updates_exception(mocker, capsys, mocked_responses):
     mocker.patch('connect.cli.core.utils.get_version', return_value='1.0.0')
     mocker.patch('connect.cli.core.utils.get_connect_version', return_value='1.0.0')
-    mocker.patch('connect.cli.core.utils.requests.get', side_effect=RequestException())
+    mocked_session = mocker.patch('connect.cli.core.utils.get_session').return_value
+    mocked_session.get.side_effect = RequestException()
 
     utils.check_for_updates()
 
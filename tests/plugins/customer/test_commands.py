@@ -43,3 +43,70 @@ def test_sync_customers(mocker, config_mocker, ccli, filename):
     mocked_sync.sync.assert_called_once()
     mocked_sync.save.assert_called_once()
     mocked_sync.stats.print.assert_called_once()
+
+
+def test_sync_customers_workers(mocker, config_mocker, ccli):
+    mocked_synchronizer = mocker.patch(
+        'connect.cli.plugins.customer.commands.CustomerSynchronizer',
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(ccli, ['customer', 'sync', 'customers.xlsx', '--workers', '8'])
+
+    assert result.exit_code == 0
+    assert mocked_synchronizer.call_args.kwargs['workers'] == 8
+
+
+@pytest.mark.parametrize(
+    ('args', 'skip_unchanged'),
+    (([], True), (['--no-skip-unchanged'], False)),
+)
+def test_sync_customers_skip_unchanged(mocker, config_mocker, ccli, args, skip_unchanged):
+    mocked_synchronizer = mocker.patch(
+        'connect.cli.plugins.customer.commands.CustomerSynchronizer',
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(ccli, ['customer', 'sync', 'customers.xlsx', *args])
+
+    assert result.exit_code == 0
+    assert mocked_synchronizer.call_args.kwargs['skip_unchanged'] is skip_unchanged
+
+
+def test_export_customers_since(mocker, config_mocker, ccli):
+    mocked_dump = mocker.patch(
+        'connect.cli.plugins.customer.commands.dump_customers',
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(ccli, ['customer', 'export', '--since', '2021-03-01'])
+
+    assert result.exit_code == 0
+    assert mocked_dump.call_args.kwargs['since'] == '2021-03-01T00:00:00'
+
+
+def test_export_customers_format(mocker, config_mocker, ccli):
+    mocked_dump = mocker.patch(
+        'connect.cli.plugins.customer.commands.dump_customers',
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(ccli, ['customer', 'export', '--format', 'ndjson'])
+
+    assert result.exit_code == 0
+    assert mocked_dump.call_args.kwargs['output_format'] == 'ndjson'
+
+
+def test_sync_customers_rows_file(mocker, config_mocker, ccli):
+    mocked_sync = mocker.MagicMock()
+    mocker.patch(
+        'connect.cli.plugins.customer.commands.CustomerSynchronizer',
+        return_value=mocked_sync,
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(ccli, ['customer', 'sync', 'customers.csv'])
+
+    assert result.exit_code == 0
+    mocked_sync.open.assert_called_once_with('customers.csv', 'Customers')
+    mocked_sync.save.assert_called_once_with('customers.csv')
@@ -1,9 +1,15 @@
+import json
+import os
 import warnings
+from datetime import datetime
 
+import pytest
+from click import ClickException
 from connect.client import ConnectClient
 from openpyxl import load_workbook
 
-from connect.cli.plugins.customer.export import dump_customers
+from connect.cli.plugins.customer.export import _get_watermark, _to_utc, dump_customers
+from connect.cli.plugins.customer.rows import read_customer_rows
 
 
 def test_dump_customers(fs, mocked_responses, mocked_customer, mocked_reseller):
@@ -34,6 +40,11 @@ def test_dump_customers(fs, mocked_responses, mocked_customer, mocked_reseller):
     ws = customers_wb['Customers']
     assert len(ws['A']) == 3
     assert ws['A2'].value == mocked_customer['id']
+    assert ws['A1'].value == 'ID'
+    assert ws.column_dimensions['J'].width == 50
+    assert [str(dv.sqref) for dv in ws.data_validations.dataValidation] == ['D2:D3', 'F2:F3']
+    assert customers_wb.sheetnames == ['Customers', 'Countries']
+    assert customers_wb['Countries']['A1'].value == '2 letters country code'
 
 
 def test_dump_customers_client_error(mocker, fs, mocked_responses):
@@ -59,3 +70,152 @@ def test_dump_customers_client_error(mocker, fs, mocked_responses):
     )
 
     mocked_handle_error.assert_called_once()
+
+
+def _get_client():
+    return ConnectClient(
+        'ApiKey XXX',
+        endpoint='https://localhost/public/v1',
+        use_specs=False,
+    )
+
+
+def test_dump_customers_incremental(fs, mocked_responses, mocked_customer, mocked_reseller):
+    warnings.filterwarnings('ignore', category=UserWarning)
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/tier/accounts',
+        json=[mocked_customer, mocked_reseller],
+        headers={
+            'Content-Range': 'items 0-1/2',
+        },
+    )
+    output_file = dump_customers(
+        _get_client(),
+        account_id='PA-1234',
+        output_path=fs.root_path,
+        output_file='Customers.xlsx',
+    )
+    watermark_file = os.path.join(fs.root_path, 'PA-1234', 'Customers.watermark.json')
+    with open(watermark_file) as f:
+        assert json.load(f) == {'updated_at': '2021-03-01T16:56:45+00:00'}
+
+    mocked_responses.remove('GET', 'https://localhost/public/v1/tier/accounts')
+    updated_reseller = {
+        **mocked_reseller,
+        'name': 'Renamed reseller',
+        'events': {'updated': {'at': '2021-03-02T10:00:00+00:00'}},
+    }
+    new_customer = {**mocked_customer, 'id': 'TA-NEW'}
+    query = (
+        '?or(ge(events.updated.at,2021-03-01T16:56:45+00:00),'
+        'ge(events.created.at,2021-03-01T16:56:45+00:00))'
+    )
+    for limit, accounts in ((0, []), (100, [updated_reseller, new_customer])):
+        mocked_responses.add(
+            method='GET',
+            url=f'https://localhost/public/v1/tier/accounts{query}&limit={limit}&offset=0',
+            json=accounts,
+            headers={
+                'Content-Range': 'items 0-1/2',
+            },
+        )
+    assert (
+        dump_customers(
+            _get_client(),
+            account_id='PA-1234',
+            output_path=fs.root_path,
+            output_file='Customers.xlsx',
+            incremental=True,
+        )
+        == output_file
+    )
+
+    ws = load_workbook(output_file)['Customers']
+    assert [ws.cell(row_idx, 1).value for row_idx in range(2, ws.max_row + 1)] == [
+        mocked_customer['id'],
+        mocked_reseller['id'],
+        'TA-NEW',
+    ]
+    assert ws['J3'].value == 'Renamed reseller'
+    assert [str(dv.sqref) for dv in ws.data_validations.dataValidation] == ['D2:D4', 'F2:F4']
+    with open(watermark_file) as f:
+        assert json.load(f) == {'updated_at': '2021-03-02T10:00:00+00:00'}
+
+
+def test_get_watermark_utc_designator(mocker):
+    # Parse like Python 3.10, which does not accept the Z designator.
+    mocked_datetime = mocker.patch('connect.cli.plugins.customer.export.datetime')
+    mocked_datetime.fromisoformat.side_effect = lambda value: datetime.fromisoformat(
+        value.replace('Z', '!'),
+    )
+    customer = {
+        'events': {
+            'created': {'at': '2021-03-01T10:00:00Z'},
+            'updated': {'at': '2021-03-02T10:00:00Z'},
+        },
+    }
+
+    assert _to_utc('2021-03-02T10:00:00Z') == datetime(2021, 3, 2, 10)
+    assert _get_watermark('2021-03-02T11:00:00+02:00', customer) == '2021-03-02T10:00:00Z'
+    assert _get_watermark('2021-03-02T13:00:00+02:00', customer) == '2021-03-02T13:00:00+02:00'
+
+
+def test_dump_customers_incremental_no_previous_export(fs):
+    with pytest.raises(ClickException) as e:
+        dump_customers(
+            _get_client(),
+            account_id='PA-1234',
+            output_path=fs.root_path,
+            output_file='Customers.xlsx',
+            incremental=True,
+        )
+
+    assert 'No previous export' in str(e.value)
+
+
+@pytest.mark.parametrize('output_format', ('csv', 'ndjson'))
+def test_dump_customers_rows_file(
+    fs,
+    mocked_responses,
+    mocked_customer,
+    mocked_reseller,
+    output_format,
+):
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/tier/accounts',
+        json=[mocked_customer, mocked_reseller],
+        headers={
+            'Content-Range': 'items 0-1/2',
+        },
+    )
+
+    output_file = dump_customers(
+        _get_client(),
+        account_id='PA-1234',
+        output_path=fs.root_path,
+        output_file=None,
+        output_format=output_format,
+    )
+
+    assert output_file == os.path.join(fs.root_path, 'PA-1234', f'customers.{output_format}')
+    with open(output_file, newline='') as f:
+        rows = [values for _, values in read_customer_rows(f, output_format)]
+    assert [values[0] for values in rows] == [mocked_customer['id'], mocked_reseller['id']]
+    assert rows[0][5:7] == ['id', mocked_customer['parent']['id']]
+    assert len(rows[0]) == 20
+
+
+def test_dump_customers_rows_file_incremental(fs):
+    with pytest.raises(ClickException) as e:
+        dump_customers(
+            _get_client(),
+            account_id='PA-1234',
+            output_path=fs.root_path,
+            output_file=None,
+            incremental=True,
+            output_format='csv',
+        )
+
+    assert str(e.value) == 'Incremental exports are only supported for xlsx files.'
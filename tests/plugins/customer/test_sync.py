@@ -1,3 +1,5 @@
+import json
+import os
 from zipfile import BadZipFile
 
 import pytest
@@ -5,6 +7,7 @@ from click import ClickException
 from openpyxl import Workbook
 from openpyxl.utils.exceptions import InvalidFileException
 
+from connect.cli.plugins.customer.rows import CustomerRowWriter, read_customer_rows
 from connect.cli.plugins.customer.sync import CustomerSynchronizer
 from connect.cli.plugins.shared.exceptions import SheetNotFoundError
 
@@ -123,8 +126,14 @@ def test_update_customer_no_account_connect(fs, customers_workbook, mocked_respo
 
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/tier/accounts/TA-7374-0753-1907',
-        status=404,
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            '?in(id,(TA-7374-0753-1907))&limit=100&offset=0'
+        ),
+        json=[],
+        headers={
+            'Content-Range': 'items 0-0/0',
+        },
     )
     synchronizer = CustomerSynchronizer(
         account_id='VA-123',
@@ -137,6 +146,126 @@ def test_update_customer_no_account_connect(fs, customers_workbook, mocked_respo
     }
 
 
+def test_update_customer_lookup_error(fs, customers_workbook, mocked_responses, client):
+    customers_workbook['Customers']['D2'] = 'update'
+    customers_workbook.save(f'{fs.root_path}/test.xlsx')
+
+    mocked_responses.add(
+        method='GET',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            '?in(id,(TA-7374-0753-1907))&limit=100&offset=0'
+        ),
+        status=500,
+    )
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+    )
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Customers')
+    synchronizer.sync()
+    assert synchronizer.stats._row_errors == {
+        2: ['Error when obtaining account data from Connect'],
+    }
+
+
+@pytest.mark.parametrize('skip_unchanged', (True, False))
+def test_update_accounts_fetched_once(
+    fs,
+    customers_workbook,
+    mocked_responses,
+    mocked_reseller,
+    mocked_customer,
+    client,
+    skip_unchanged,
+):
+    ws = customers_workbook['Customers']
+    ws['D2'] = 'update'
+    ws['J2'] = 'New name'
+    ws['D3'] = 'update'
+    customers_workbook.save(f'{fs.root_path}/test.xlsx')
+    customer = {
+        **mocked_customer,
+        'id': ws['A3'].value,
+        'external_id': ws['B3'].value,
+        'external_uid': ws['C3'].value,
+        'type': ws['H3'].value,
+        'name': ws['J3'].value,
+        'parent': {'id': mocked_reseller['id']},
+        'contact_info': {
+            'address_line1': ws['K3'].value,
+            'address_line2': ws['L3'].value,
+            'city': ws['M3'].value,
+            'state': ws['N3'].value,
+            'postal_code': ws['O3'].value,
+            'country': ws['P3'].value,
+            'contact': {
+                'first_name': ws['Q3'].value,
+                'last_name': ws['R3'].value,
+                'email': ws['S3'].value,
+                'phone_number': {
+                    'country_code': '+968',
+                    'area_code': '',
+                    'extension': '-',
+                    'phone_number': '23123456',
+                },
+            },
+        },
+    }
+
+    mocked_responses.add(
+        method='GET',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(id,({customer["id"]},{mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
+        json=[mocked_reseller, customer],
+        headers={
+            'Content-Range': 'items 0-1/2',
+        },
+    )
+    mocked_responses.add(
+        method='GET',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(id,({mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
+        json=[mocked_reseller],
+        headers={
+            'Content-Range': 'items 0-0/1',
+        },
+    )
+    mocked_responses.add(
+        method='PUT',
+        url=f'https://localhost/public/v1/tier/accounts/{mocked_reseller["id"]}',
+        json=mocked_reseller,
+    )
+    if not skip_unchanged:
+        mocked_responses.add(
+            method='PUT',
+            url=f'https://localhost/public/v1/tier/accounts/{customer["id"]}',
+            json=customer,
+        )
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+        skip_unchanged=skip_unchanged,
+    )
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Customers')
+    synchronizer.sync()
+
+    assert synchronizer.stats.get_counts_as_dict() == {
+        'processed': 2,
+        'created': 0,
+        'updated': 1 + (not skip_unchanged),
+        'deleted': 0,
+        'skipped': int(skip_unchanged),
+        'errors': 0,
+    }
+    assert synchronizer.stats._unchanged == int(skip_unchanged)
+    assert json.loads(mocked_responses.calls[2].request.body)['name'] == 'New name'
+
+
 def test_create_account_connect(fs, customers_workbook, mocked_responses, mocked_reseller, client):
     customers_workbook['Customers']['D2'] = 'create'
     customers_workbook['Customers']['A2'] = None
@@ -195,13 +324,19 @@ def test_create_account_connect_parent_id(
     customers_workbook.save(f'{fs.root_path}/test.xlsx')
 
     mocked_responses.add(
-        method='POST',
-        url='https://localhost/public/v1/tier/accounts',
-        json=mocked_reseller,
+        method='GET',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(id,({mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
+        json=[mocked_reseller],
+        headers={
+            'Content-Range': 'items 0-0/1',
+        },
     )
     mocked_responses.add(
-        method='GET',
-        url=f'https://localhost/public/v1/tier/accounts/{mocked_reseller["id"]}',
+        method='POST',
+        url='https://localhost/public/v1/tier/accounts',
         json=mocked_reseller,
     )
     synchronizer = CustomerSynchronizer(
@@ -227,8 +362,14 @@ def test_create_account_connect_parent_id_not_found(
 
     mocked_responses.add(
         method='GET',
-        url=f'https://localhost/public/v1/tier/accounts/{mocked_reseller["id"]}',
-        status=404,
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(id,({mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
+        json=[],
+        headers={
+            'Content-Range': 'items 0-0/0',
+        },
     )
     synchronizer = CustomerSynchronizer(
         account_id='VA-123',
@@ -256,18 +397,13 @@ def test_create_account_connect_parent_external_id(
 
     mocked_responses.add(
         method='GET',
-        url=f'https://localhost/public/v1/tier/accounts?eq(external_id,{mocked_reseller["id"]})&limit=0&offset=0',
-        json=[mocked_reseller],
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(external_id,({mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
+        json=[{**mocked_reseller, 'external_id': mocked_reseller['id']}],
         headers={
-            'Content-Range': 'items 0-1/1',
-        },
-    )
-    mocked_responses.add(
-        method='GET',
-        url=f'https://localhost/public/v1/tier/accounts?eq(external_id,{mocked_reseller["id"]})&limit=1&offset=0',
-        json=[mocked_reseller],
-        headers={
-            'Content-Range': 'items 0-1/1',
+            'Content-Range': 'items 0-0/1',
         },
     )
     mocked_responses.add(
@@ -299,7 +435,10 @@ def test_create_account_connect_parent_external_id_not_found(
 
     mocked_responses.add(
         method='GET',
-        url=f'https://localhost/public/v1/tier/accounts?eq(external_id,{mocked_reseller["id"]})&limit=0&offset=0',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(external_id,({mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
         json=[],
         headers={
             'Content-Range': 'items 0-0/0',
@@ -331,10 +470,16 @@ def test_create_account_connect_parent_external_id_more_than_one(
 
     mocked_responses.add(
         method='GET',
-        url=f'https://localhost/public/v1/tier/accounts?eq(external_id,{mocked_reseller["id"]})&limit=0&offset=0',
-        json=[],
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(external_id,({mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
+        json=[
+            {**mocked_reseller, 'external_id': mocked_reseller['id']},
+            {**mocked_reseller, 'id': 'TA-0000-0000-0000', 'external_id': mocked_reseller['id']},
+        ],
         headers={
-            'Content-Range': 'items 0-2/2',
+            'Content-Range': 'items 0-1/2',
         },
     )
     synchronizer = CustomerSynchronizer(
@@ -363,18 +508,13 @@ def test_create_account_connect_parent_external_uid(
 
     mocked_responses.add(
         method='GET',
-        url=f'https://localhost/public/v1/tier/accounts?eq(external_uid,{mocked_reseller["id"]})&limit=0&offset=0',
-        json=[mocked_reseller],
-        headers={
-            'Content-Range': 'items 0-1/1',
-        },
-    )
-    mocked_responses.add(
-        method='GET',
-        url=f'https://localhost/public/v1/tier/accounts?eq(external_uid,{mocked_reseller["id"]})&limit=1&offset=0',
-        json=[mocked_reseller],
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(external_uid,({mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
+        json=[{**mocked_reseller, 'external_uid': mocked_reseller['id']}],
         headers={
-            'Content-Range': 'items 0-1/1',
+            'Content-Range': 'items 0-0/1',
         },
     )
     mocked_responses.add(
@@ -406,7 +546,10 @@ def test_create_account_connect_parent_external_uid_not_found(
 
     mocked_responses.add(
         method='GET',
-        url=f'https://localhost/public/v1/tier/accounts?eq(external_uid,{mocked_reseller["id"]})&limit=0&offset=0',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(external_uid,({mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
         json=[],
         headers={
             'Content-Range': 'items 0-0/0',
@@ -438,10 +581,16 @@ def test_create_account_connect_parent_external_uid_more_than_one(
 
     mocked_responses.add(
         method='GET',
-        url=f'https://localhost/public/v1/tier/accounts?eq(external_uid,{mocked_reseller["id"]})&limit=0&offset=0',
-        json=[],
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(external_uid,({mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
+        json=[
+            {**mocked_reseller, 'external_uid': mocked_reseller['id']},
+            {**mocked_reseller, 'id': 'TA-0000-0000-0000', 'external_uid': mocked_reseller['id']},
+        ],
         headers={
-            'Content-Range': 'items 0-2/2',
+            'Content-Range': 'items 0-1/2',
         },
     )
     synchronizer = CustomerSynchronizer(
@@ -455,6 +604,321 @@ def test_create_account_connect_parent_external_uid_more_than_one(
     }
 
 
+def _copy_customer_row(ws, src_row, dst_row):
+    for col_idx in range(1, 21):
+        ws.cell(dst_row, col_idx, value=ws.cell(src_row, col_idx).value)
+
+
+def test_parents_resolved_in_chunks(
+    fs,
+    mocker,
+    customers_workbook,
+    mocked_responses,
+    mocked_reseller,
+    client,
+):
+    mocker.patch('connect.cli.plugins.customer.sync.LOOKUP_CHUNK_SIZE', 1)
+    ws = customers_workbook['Customers']
+    ws['D2'] = '-'
+    ws['A3'] = None
+    ws['C3'] = None
+    ws['D3'] = 'create'
+    for row_idx in (4, 5, 6):
+        _copy_customer_row(ws, 3, row_idx)
+    ws['G6'] = 'TA-0000-0000-0000'
+    customers_workbook.save(f'{fs.root_path}/test.xlsx')
+
+    for parent in (mocked_reseller, {**mocked_reseller, 'id': 'TA-0000-0000-0000'}):
+        mocked_responses.add(
+            method='GET',
+            url=(
+                'https://localhost/public/v1/tier/accounts'
+                f'?in(id,({parent["id"]}))&limit=100&offset=0'
+            ),
+            json=[parent],
+            headers={
+                'Content-Range': 'items 0-0/1',
+            },
+        )
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/tier/accounts',
+        json=mocked_reseller,
+    )
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+    )
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Customers')
+    synchronizer.sync()
+
+    assert synchronizer.stats._created == 4
+    assert [call.request.method for call in mocked_responses.calls].count('GET') == 2
+    posted = [json.loads(call.request.body) for call in mocked_responses.calls[2:]]
+    assert [model['parent']['id'] for model in posted] == [
+        'TA-7374-0753-1907',
+        'TA-7374-0753-1907',
+        'TA-7374-0753-1907',
+        'TA-0000-0000-0000',
+    ]
+
+
+def test_parent_created_in_sheet(
+    fs,
+    customers_workbook,
+    mocked_responses,
+    mocked_reseller,
+    client,
+):
+    ws = customers_workbook['Customers']
+    ws['A2'] = None
+    ws['B2'] = 'NEW-RESELLER'
+    ws['C2'] = None
+    ws['D2'] = 'create'
+    ws['A3'] = None
+    ws['C3'] = None
+    ws['D3'] = 'create'
+    ws['F3'] = 'external_id'
+    ws['G3'] = 'NEW-RESELLER'
+    customers_workbook.save(f'{fs.root_path}/test.xlsx')
+
+    mocked_responses.add(
+        method='GET',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            '?in(external_id,(NEW-RESELLER))&limit=100&offset=0'
+        ),
+        json=[],
+        headers={
+            'Content-Range': 'items 0-0/0',
+        },
+    )
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/tier/accounts',
+        json={**mocked_reseller, 'id': 'TA-NEW', 'external_id': 'NEW-RESELLER'},
+    )
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/tier/accounts',
+        json=mocked_reseller,
+    )
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+    )
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Customers')
+    synchronizer.sync()
+
+    assert synchronizer.stats._created == 2
+    assert json.loads(mocked_responses.calls[2].request.body)['parent'] == {'id': 'TA-NEW'}
+
+
+def test_parent_created_in_sheet_concurrently(
+    fs,
+    customers_workbook,
+    mocked_responses,
+    mocked_reseller,
+    client,
+):
+    ws = customers_workbook['Customers']
+    ws['A2'] = None
+    ws['B2'] = 'NEW-RESELLER'
+    ws['C2'] = None
+    ws['D2'] = 'create'
+    ws['A3'] = None
+    ws['C3'] = None
+    ws['D3'] = 'create'
+    ws['F3'] = 'external_id'
+    ws['G3'] = 'NEW-RESELLER'
+    for row_idx in (4, 5, 6):
+        _copy_customer_row(ws, 3, row_idx)
+    customers_workbook.save(f'{fs.root_path}/test.xlsx')
+
+    mocked_responses.add(
+        method='GET',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            '?in(external_id,(NEW-RESELLER))&limit=100&offset=0'
+        ),
+        json=[],
+        headers={
+            'Content-Range': 'items 0-0/0',
+        },
+    )
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/tier/accounts',
+        json={**mocked_reseller, 'id': 'TA-NEW', 'external_id': 'NEW-RESELLER'},
+    )
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/tier/accounts',
+        json=mocked_reseller,
+    )
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+        workers=4,
+    )
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Customers')
+    synchronizer.sync()
+
+    assert synchronizer.stats._created == 5
+    posted = [json.loads(call.request.body) for call in mocked_responses.calls[1:]]
+    assert 'parent' not in posted[0]
+    assert [model['parent'] for model in posted[1:]] == [{'id': 'TA-NEW'}] * 4
+    ws = synchronizer._wb['Customers']
+    assert [ws.cell(row_idx, 1).value for row_idx in range(2, 7)] == [
+        'TA-NEW',
+        mocked_reseller['id'],
+        mocked_reseller['id'],
+        mocked_reseller['id'],
+        mocked_reseller['id'],
+    ]
+
+
+def test_parent_created_in_later_row_concurrently(
+    fs,
+    customers_workbook,
+    mocked_responses,
+    mocked_reseller,
+    client,
+):
+    ws = customers_workbook['Customers']
+    _copy_customer_row(ws, 2, 6)
+    ws['A6'] = None
+    ws['B6'] = 'NEW-RESELLER'
+    ws['C6'] = None
+    ws['D6'] = 'create'
+    ws['A3'] = None
+    ws['C3'] = None
+    ws['D3'] = 'create'
+    ws['F3'] = 'external_id'
+    ws['G3'] = 'NEW-RESELLER'
+    for row_idx in (2, 4, 5):
+        _copy_customer_row(ws, 3, row_idx)
+    ws['A2'] = None
+    ws['C2'] = None
+    customers_workbook.save(f'{fs.root_path}/test.xlsx')
+
+    mocked_responses.add(
+        method='GET',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            '?in(external_id,(NEW-RESELLER))&limit=100&offset=0'
+        ),
+        json=[],
+        headers={
+            'Content-Range': 'items 0-0/0',
+        },
+    )
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/tier/accounts',
+        json={**mocked_reseller, 'id': 'TA-NEW', 'external_id': 'NEW-RESELLER'},
+    )
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+        workers=4,
+    )
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Customers')
+    synchronizer.sync()
+
+    assert synchronizer.stats._created == 1
+    assert synchronizer.stats._row_errors == {
+        row_idx: ['Parent with external_id NEW-RESELLER not found'] for row_idx in range(2, 6)
+    }
+    assert len(mocked_responses.calls) == 2
+
+
+def test_parent_created_twice_in_sheet_concurrently(
+    fs,
+    customers_workbook,
+    mocked_responses,
+    mocked_reseller,
+    client,
+):
+    ws = customers_workbook['Customers']
+    _copy_customer_row(ws, 3, 4)
+    ws['A2'] = None
+    ws['B2'] = 'NEW-RESELLER'
+    ws['C2'] = None
+    ws['D2'] = 'create'
+    _copy_customer_row(ws, 2, 3)
+    ws['A3'] = None
+    ws['C3'] = None
+    ws['A4'] = None
+    ws['C4'] = None
+    ws['D4'] = 'create'
+    ws['F4'] = 'external_id'
+    ws['G4'] = 'NEW-RESELLER'
+    customers_workbook.save(f'{fs.root_path}/test.xlsx')
+
+    mocked_responses.add(
+        method='GET',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            '?in(external_id,(NEW-RESELLER))&limit=100&offset=0'
+        ),
+        json=[],
+        headers={
+            'Content-Range': 'items 0-0/0',
+        },
+    )
+    for account_id in ('TA-NEW-1', 'TA-NEW-2'):
+        mocked_responses.add(
+            method='POST',
+            url='https://localhost/public/v1/tier/accounts',
+            json={**mocked_reseller, 'id': account_id, 'external_id': 'NEW-RESELLER'},
+        )
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+        workers=4,
+    )
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Customers')
+    synchronizer.sync()
+
+    assert synchronizer.stats._created == 2
+    assert synchronizer.stats._row_errors == {
+        4: ['More than one Parent with external_id NEW-RESELLER'],
+    }
+
+
+def test_parent_lookup_error(
+    fs,
+    customers_workbook,
+    mocked_responses,
+    mocked_reseller,
+    client,
+):
+    customers_workbook['Customers']['D3'] = 'create'
+    customers_workbook['Customers']['A3'] = None
+    customers_workbook['Customers']['C3'] = None
+    customers_workbook['Customers']['F3'] = 'external_id'
+    customers_workbook.save(f'{fs.root_path}/test.xlsx')
+
+    mocked_responses.add(
+        method='GET',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            f'?in(external_id,({mocked_reseller["id"]}))&limit=100&offset=0'
+        ),
+        status=500,
+    )
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+    )
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Customers')
+    synchronizer.sync()
+    assert synchronizer.stats._row_errors == {
+        3: ['Error when obtaining parent data from Connect'],
+    }
+
+
 def test_parent_search_criteria(
     fs,
     mocker,
@@ -620,3 +1084,107 @@ def test_save(mocker):
     synchronizer.save('file.xlsx')
 
     synchronizer._wb.save.assert_called_once_with('file.xlsx')
+
+
+def _save_customer_rows(ws, path, file_format):
+    with open(path, 'w', newline='') as f:
+        writer = CustomerRowWriter(f, file_format)
+        writer.write_header()
+        for values in ws.iter_rows(min_row=2, values_only=True):
+            writer.write(list(values))
+
+
+@pytest.mark.parametrize('file_format', ('csv', 'ndjson'))
+def test_sync_rows_file(
+    fs,
+    mocker,
+    customers_workbook,
+    mocked_responses,
+    mocked_reseller,
+    client,
+    file_format,
+):
+    mocker.patch('connect.cli.plugins.customer.sync.STREAM_BATCH_SIZE', 1)
+    ws = customers_workbook['Customers']
+    ws['A2'] = None
+    ws['B2'] = 'NEW-RESELLER'
+    ws['C2'] = None
+    ws['D2'] = 'create'
+    ws['A3'] = None
+    ws['C3'] = None
+    ws['D3'] = 'create'
+    ws['F3'] = 'external_id'
+    ws['G3'] = 'NEW-RESELLER'
+    path = f'{fs.root_path}/customers.{file_format}'
+    _save_customer_rows(ws, path, file_format)
+
+    new_reseller = {**mocked_reseller, 'id': 'TA-NEW', 'external_id': 'NEW-RESELLER'}
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/tier/accounts',
+        json=new_reseller,
+    )
+    mocked_responses.add(
+        method='GET',
+        url=(
+            'https://localhost/public/v1/tier/accounts'
+            '?in(external_id,(NEW-RESELLER))&limit=100&offset=0'
+        ),
+        json=[new_reseller],
+        headers={
+            'Content-Range': 'items 0-0/1',
+        },
+    )
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/tier/accounts',
+        json=mocked_reseller,
+    )
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+    )
+    synchronizer.open(path, 'Customers')
+    synchronizer.sync()
+    synchronizer.save(path)
+
+    assert synchronizer.stats._created == 2
+    assert json.loads(mocked_responses.calls[2].request.body)['parent'] == {'id': 'TA-NEW'}
+    with open(path, newline='') as f:
+        rows = [values for _, values in read_customer_rows(f, file_format)]
+    assert [(values[0], values[2], values[3]) for values in rows] == [
+        ('TA-NEW', new_reseller['external_uid'], '-'),
+        (mocked_reseller['id'], mocked_reseller['external_uid'], '-'),
+    ]
+    assert rows[1][6] == 'NEW-RESELLER'
+    assert os.listdir(fs.root_path) == [f'customers.{file_format}']
+
+
+def test_sync_rows_file_invalid_header(fs, client):
+    path = f'{fs.root_path}/customers.csv'
+    with open(path, 'w') as f:
+        f.write('ID,External UID\n')
+
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+    )
+    with pytest.raises(ClickException) as e:
+        synchronizer.open(path, 'Customers')
+
+    assert str(e.value) == 'Column `B1` must be `External ID` and is `External UID`.'
+
+
+def test_sync_rows_file_unknown_columns(fs, client):
+    path = f'{fs.root_path}/customers.ndjson'
+    with open(path, 'w') as f:
+        f.write('{"ID": "TA-1", "Name": "test"}\n')
+
+    synchronizer = CustomerSynchronizer(
+        account_id='VA-123',
+        client=client,
+    )
+    with pytest.raises(ClickException) as e:
+        synchronizer.open(path, 'Customers')
+
+    assert str(e.value) == 'Line 1 has unknown columns: Name.'
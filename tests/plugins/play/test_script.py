@@ -2,8 +2,7 @@
 
 # This file is part of the CloudBlue Connect connect-cli.
 # Copyright (c) 2025 CloudBlue. All rights reserved.
-from connect.client import ConnectClient
-
+from connect.cli.core.http import ConnectClient
 from connect.cli.plugins.play.context import Context
 from connect.cli.plugins.play.script import OptionWrapper, Script
 
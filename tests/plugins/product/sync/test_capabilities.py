@@ -1,3 +1,4 @@
+import json
 from copy import deepcopy
 
 import pytest
@@ -202,6 +203,47 @@ def test_ppu_enable_qt(
     }
 
 
+def test_save_error(
+    mocker,
+    fs,
+    get_sync_capabilities_env,
+    mocked_responses,
+):
+    get_sync_capabilities_env['Capabilities']['B2'].value = 'update'
+    get_sync_capabilities_env['Capabilities']['C2'].value = 'QT'
+    get_sync_capabilities_env.save(f'{fs.root_path}/test.xlsx')
+
+    stats = SynchronizerStats()
+    synchronizer = CapabilitiesSynchronizer(
+        client=ConnectClient(
+            use_specs=False,
+            api_key='ApiKey SU:123',
+            endpoint='https://localhost/public/v1',
+        ),
+        progress=mocker.MagicMock(),
+        stats=stats,
+    )
+
+    mocked_responses.add(
+        method='PUT',
+        url='https://localhost/public/v1/products/PRD-276-377-545',
+        status=400,
+    )
+
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Capabilities')
+    synchronizer.sync()
+
+    assert stats['Capabilities'].get_counts_as_dict() == {
+        'processed': 10,
+        'created': 0,
+        'updated': 0,
+        'deleted': 0,
+        'skipped': 9,
+        'errors': 1,
+    }
+    assert list(stats['Capabilities']._row_errors) == [2]
+
+
 def test_ppu_change_schema(
     mocker,
     fs,
@@ -935,3 +977,47 @@ def test_tier_level_feature(
         'skipped': 9,
         'errors': 0,
     }
+
+
+def test_ppu_enable_qt_and_dynamic_single_update(
+    mocker,
+    fs,
+    get_sync_capabilities_env,
+    mocked_responses,
+    mocked_product_response,
+):
+    get_sync_capabilities_env['Capabilities']['B2'].value = 'update'
+    get_sync_capabilities_env['Capabilities']['C2'].value = 'QT'
+    get_sync_capabilities_env['Capabilities']['B3'].value = 'update'
+    get_sync_capabilities_env['Capabilities']['C3'].value = 'Enabled'
+    get_sync_capabilities_env.save(f'{fs.root_path}/test.xlsx')
+
+    stats = SynchronizerStats()
+    synchronizer = CapabilitiesSynchronizer(
+        client=ConnectClient(
+            use_specs=False,
+            api_key='ApiKey SU:123',
+            endpoint='https://localhost/public/v1',
+        ),
+        progress=mocker.MagicMock(),
+        stats=stats,
+    )
+
+    mocked_responses.add(
+        method='PUT',
+        url='https://localhost/public/v1/products/PRD-276-377-545',
+        json=mocked_product_response,
+    )
+
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Capabilities')
+    synchronizer.sync()
+
+    assert stats['Capabilities'].get_counts_as_dict()['updated'] == 2
+    updates = [call for call in mocked_responses.calls if call.request.method == 'PUT']
+    assert len(updates) == 1
+    assert json.loads(updates[0].request.body)['capabilities']['ppu'] == {
+        'schema': 'QT',
+        'dynamic': True,
+        'future': False,
+        'late': False,
+    }
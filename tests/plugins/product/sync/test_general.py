@@ -5,7 +5,7 @@ from click import ClickException
 from connect.client import ConnectClient
 from openpyxl import load_workbook
 
-from connect.cli.plugins.product.sync.general import GeneralSynchronizer
+from connect.cli.plugins.product.sync.general import GeneralSynchronizer, ProductDocument
 
 
 GENERAL_ERROR = 'Errors has been detected on General Information tab:'
@@ -323,3 +323,38 @@ def test_sync(fs, get_general_env, mocked_responses):
 
         assert product_id == 'PRD-276-377-545'
         assert errors == []
+
+
+def test_sync_document(fs, get_general_env, mocked_responses):
+    get_general_env.save(f'{fs.root_path}/test.xlsx')
+    client = ConnectClient(
+        use_specs=False,
+        api_key='ApiKey SU:123',
+        endpoint='https://localhost/public/v1',
+    )
+    synchronizer = GeneralSynchronizer(client=client, progress=None)
+    product_id = synchronizer.open(
+        f'{fs.root_path}/test.xlsx',
+        'General Information',
+    )
+    document = ProductDocument(client, product_id)
+
+    errors = synchronizer.sync(document)
+    document.product['customer_ui_settings']['documents'] = []
+    document.modified()
+
+    assert errors == []
+    assert not [call for call in mocked_responses.calls if call.request.method == 'PUT']
+
+    with open('./tests/fixtures/product_response.json') as prod_response:
+        mocked_responses.add(
+            method='PUT',
+            url='https://localhost/public/v1/products/PRD-276-377-545',
+            json=json.load(prod_response),
+        )
+    document.save()
+    document.save()
+
+    updates = [call for call in mocked_responses.calls if call.request.method == 'PUT']
+    assert len(updates) == 1
+    assert b'\\"documents\\": []' in updates[0].request.body
@@ -1,6 +1,8 @@
 import pytest
 from connect.client import ConnectClient
+from openpyxl import load_workbook
 
+from connect.cli.plugins.product.export import _dump_row_hashes, _fill_item_row
 from connect.cli.plugins.product.sync.items import ItemSynchronizer
 from connect.cli.plugins.shared.sync_stats import SynchronizerStats
 
@@ -464,8 +466,7 @@ def test_create_item_exists_in_connect(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[mocked_items_response[0]],
     )
     stats = SynchronizerStats()
@@ -511,8 +512,7 @@ def test_create_item_connect_exception(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -562,8 +562,7 @@ def test_create_item(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -611,8 +610,7 @@ def test_create_item_one_time(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -660,8 +658,7 @@ def test_create_item_monthly_trial(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -710,8 +707,7 @@ def test_create_item_multi_year(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -759,8 +755,7 @@ def test_create_item_yearly(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -809,8 +804,7 @@ def test_create_item_1_to_1_yearly(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -1074,8 +1068,7 @@ def test_update_item(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[mocked_items_response[0]],
     )
 
@@ -1123,8 +1116,7 @@ def test_delete_item(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[mocked_items_response[0]],
     )
 
@@ -1171,8 +1163,7 @@ def test_update_item_no_connect_item(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -1217,8 +1208,7 @@ def test_update_item_no_item_connect(
 
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -1265,8 +1255,7 @@ def test_update_item_draft(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[item],
     )
 
@@ -1318,8 +1307,7 @@ def test_update_item_draft_ppu(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[item],
     )
 
@@ -1369,8 +1357,7 @@ def test_update_item_draft_connect_exception(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[item],
     )
 
@@ -1421,8 +1408,7 @@ def test_delete_item_not_exists(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -1467,8 +1453,7 @@ def test_delete_item_connect_error(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[mocked_items_response[0]],
     )
 
@@ -1519,8 +1504,7 @@ def test_create_item_custom_uom(
     get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
     mocked_responses.add(
         method='GET',
-        url='https://localhost/public/v1/products/PRD-276-377-545/items?eq(mpn,'
-        'MPN-R-001)&limit=1&offset=0',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
         json=[],
     )
 
@@ -1560,3 +1544,300 @@ def test_create_item_custom_uom(
         'skipped': 0,
         'errors': 0,
     }
+
+
+def test_items_prefetched_once(
+    mocker,
+    fs,
+    get_sync_items_env,
+    mocked_responses,
+    mocked_items_response,
+):
+    ws = get_sync_items_env['Items']
+    ws['A2'].value = None
+    ws['C2'].value = 'create'
+    for col in 'ABCDEFGHIJKLM':
+        ws[f'{col}3'].value = ws[f'{col}2'].value
+        ws[f'{col}4'].value = ws[f'{col}2'].value
+    ws['A4'].value = 'PRD-276-377-545-0002'
+    ws['B4'].value = 'MPN-R-002'
+    ws['C4'].value = 'delete'
+    ws['K4'].value = 'draft'
+
+    get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
+        json=[mocked_items_response[1]],
+    )
+    created = dict(mocked_items_response[0], mpn='MPN-R-001')
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items',
+        json=created,
+    )
+    mocked_responses.add(
+        method='DELETE',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items/PRD-276-377-545-0002',
+        json={},
+    )
+
+    stats = SynchronizerStats()
+    synchronizer = ItemSynchronizer(
+        client=ConnectClient(
+            use_specs=False,
+            api_key='ApiKey SU:123',
+            endpoint='https://localhost/public/v1',
+        ),
+        progress=mocker.MagicMock(),
+        stats=stats,
+    )
+
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Items')
+    synchronizer.sync()
+
+    assert stats['Items'].get_counts_as_dict() == {
+        'processed': 3,
+        'created': 1,
+        'updated': 0,
+        'deleted': 1,
+        'skipped': 0,
+        'errors': 1,
+    }
+    assert stats['Items']._row_errors == {
+        3: [
+            'Cannot create item: item with MPN `MPN-R-001` already exists with ID '
+            f'`{created["id"]}`.',
+        ],
+    }
+    item_calls = [call.request for call in mocked_responses.calls if '/items' in call.request.url]
+    assert [request.method for request in item_calls] == ['GET', 'POST', 'DELETE']
+
+
+def test_update_item_skip_unchanged(
+    mocker,
+    fs,
+    get_sync_items_env,
+    mocked_responses,
+    mocked_items_response,
+):
+    get_sync_items_env['Items']['A2'].value = None
+    get_sync_items_env['Items']['C2'].value = 'update'
+
+    item = mocked_items_response[0]
+    item['status'] = 'draft'
+
+    get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
+        json=[item],
+    )
+
+    stats = SynchronizerStats()
+    synchronizer = ItemSynchronizer(
+        client=ConnectClient(
+            use_specs=False,
+            api_key='ApiKey SU:123',
+            endpoint='https://localhost/public/v1',
+        ),
+        progress=mocker.MagicMock(),
+        stats=stats,
+        skip_unchanged=True,
+    )
+
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Items')
+    synchronizer.sync()
+
+    assert stats['Items'].get_counts_as_dict() == {
+        'processed': 1,
+        'created': 0,
+        'updated': 0,
+        'deleted': 0,
+        'skipped': 1,
+        'errors': 0,
+    }
+    assert stats['Items']._unchanged == 1
+
+
+def test_items_plan(
+    mocker,
+    fs,
+    get_sync_items_env,
+    mocked_responses,
+    mocked_items_response,
+):
+    ws = get_sync_items_env['Items']
+    ws['A2'].value = None
+    ws['C2'].value = 'update'
+    for col in 'ABCDEFGHIJKLM':
+        ws[f'{col}3'].value = ws[f'{col}2'].value
+        ws[f'{col}4'].value = ws[f'{col}2'].value
+        ws[f'{col}5'].value = ws[f'{col}2'].value
+    ws['D3'].value = 'New name'
+    ws['B4'].value = 'MPN-R-NEW'
+    ws['C4'].value = 'create'
+    ws['A5'].value = 'PRD-276-377-545-0002'
+    ws['B5'].value = 'MPN-R-002'
+    ws['C5'].value = 'delete'
+    ws['K5'].value = 'draft'
+
+    item = mocked_items_response[0]
+    item['status'] = 'draft'
+
+    get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
+        json=[item, mocked_items_response[1]],
+    )
+
+    stats = SynchronizerStats(operation='Plan')
+    synchronizer = ItemSynchronizer(
+        client=ConnectClient(
+            use_specs=False,
+            api_key='ApiKey SU:123',
+            endpoint='https://localhost/public/v1',
+        ),
+        progress=mocker.MagicMock(),
+        stats=stats,
+        plan=True,
+    )
+
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Items')
+    synchronizer.sync()
+    synchronizer.save(f'{fs.root_path}/test.xlsx')
+
+    assert stats['Items'].get_plan_counts_as_tuple() == (4, 1, 1, 1, 1, 0, 0)
+    assert load_workbook(f'{fs.root_path}/test.xlsx')['Items']['C4'].value == 'create'
+
+
+def test_update_item_unchanged_since_export(
+    mocker,
+    fs,
+    get_sync_items_env,
+    mocked_responses,
+    mocked_items_response,
+):
+    ws = get_sync_items_env['Items']
+    _fill_item_row(ws, 2, mocked_items_response[0])
+    for col in 'ABCDEFGHIJKLM':
+        ws[f'{col}3'].value = ws[f'{col}2'].value
+    ws['C2'].value = 'update'
+    ws['C3'].value = 'update'
+    ws['D3'].value = 'New name'
+    _dump_row_hashes(
+        get_sync_items_env,
+        {
+            'templates': [],
+            'items': [mocked_items_response[0]],
+            'ordering': [],
+            'fulfillment': [],
+            'configuration': [],
+            'actions': [],
+            'messages': [],
+        },
+    )
+    get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
+
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
+        json=[dict(mocked_items_response[0], name='Renamed after the export')],
+    )
+    mocked_responses.add(
+        method='PUT',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items/PRD-276-377-545-0001',
+        json=mocked_items_response[0],
+    )
+
+    stats = SynchronizerStats()
+    synchronizer = ItemSynchronizer(
+        client=ConnectClient(
+            use_specs=False,
+            api_key='ApiKey SU:123',
+            endpoint='https://localhost/public/v1',
+        ),
+        progress=mocker.MagicMock(),
+        stats=stats,
+        skip_unchanged=True,
+    )
+
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Items')
+    synchronizer.sync()
+
+    assert stats['Items'].get_counts_as_dict() == {
+        'processed': 2,
+        'created': 0,
+        'updated': 1,
+        'deleted': 0,
+        'skipped': 1,
+        'errors': 0,
+    }
+    assert [
+        call.request.method for call in mocked_responses.calls if '/items' in call.request.url
+    ] == ['GET', 'PUT']
+
+
+def test_create_items_new_unit_created_once(
+    mocker,
+    fs,
+    get_sync_items_env,
+    mocked_responses,
+    mocked_items_response,
+):
+    ws = get_sync_items_env['Items']
+    ws['A2'].value = None
+    ws['C2'].value = 'create'
+    ws['H2'].value = 'unitary tests'
+    for col in 'ABCDEFGHIJKLM':
+        ws[f'{col}3'].value = ws[f'{col}2'].value
+    ws['B3'].value = 'MPN-R-NEW'
+
+    get_sync_items_env.save(f'{fs.root_path}/test.xlsx')
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items?limit=100&offset=0',
+        json=[],
+    )
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/products/PRD-276-377-545/items',
+        json=mocked_items_response[0],
+    )
+    mocked_responses.add(
+        method='POST',
+        url='https://localhost/public/v1/settings/units',
+        json={
+            'id': '123',
+        },
+    )
+
+    client = ConnectClient(
+        use_specs=False,
+        api_key='ApiKey SU:123',
+        endpoint='https://localhost/public/v1',
+    )
+    stats = SynchronizerStats()
+    synchronizer = ItemSynchronizer(
+        client=client,
+        progress=mocker.MagicMock(),
+        stats=stats,
+    )
+
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Items')
+    synchronizer.sync()
+    ItemSynchronizer(client=client, progress=mocker.MagicMock(), stats=stats)
+
+    assert stats['Items'].get_counts_as_dict()['created'] == 2
+    unit_calls = [
+        call.request.method
+        for call in mocked_responses.calls
+        if call.request.url.startswith('https://localhost/public/v1/settings/units')
+    ]
+    assert unit_calls == ['GET', 'POST']
+    assert [
+        call.request.body
+        for call in mocked_responses.calls
+        if call.request.url == 'https://localhost/public/v1/products/PRD-276-377-545/items'
+    ][1].count(b'"unit": {"id": "123"}') == 1
@@ -1,6 +1,9 @@
-from connect.client import ConnectClient
+import json
 
-from connect.cli.plugins.product.sync.params import ParamsSynchronizer
+import pytest
+from connect.client import ClientError, ConnectClient
+
+from connect.cli.plugins.product.sync.params import ParamsSynchronizer, _ParamsIndex
 from connect.cli.plugins.shared.sync_stats import SynchronizerStats
 
 
@@ -611,12 +614,15 @@ def test_validate_update_invalid_switch_scope(
     assert stats['Ordering Parameters']._row_errors == {2: ['switching scope is not supported']}
 
 
+@pytest.mark.parametrize(('skip_unchanged', 'updates'), ((False, 2), (True, 1)))
 def test_validate_update(
     mocker,
     fs,
     get_sync_params_env,
     mocked_responses,
     mocked_ordering_params_response,
+    skip_unchanged,
+    updates,
 ):
     get_sync_params_env['Ordering Parameters']['C2'] = 'update'
 
@@ -633,6 +639,7 @@ def test_validate_update(
         ),
         progress=mocker.MagicMock(),
         stats=stats,
+        skip_unchanged=skip_unchanged,
     )
 
     mocked_responses.add(
@@ -651,13 +658,59 @@ def test_validate_update(
     synchronizer.sync()
 
     assert stats['Ordering Parameters'].get_counts_as_dict() == {
-        'processed': 2,
+        'processed': 1,
         'created': 0,
-        'updated': 2,
+        'updated': 1,
         'deleted': 0,
         'skipped': 0,
         'errors': 0,
     }
+    assert len([call for call in mocked_responses.calls if call.request.method == 'PUT']) == updates
+
+
+def test_validate_update_params_listed_once(
+    mocker,
+    fs,
+    get_sync_params_env,
+    mocked_responses,
+    mocked_ordering_params_response,
+):
+    get_sync_params_env['Ordering Parameters']['C2'] = 'update'
+    get_sync_params_env['Ordering Parameters']['D2'] = 'Change on title test'
+    get_sync_params_env.save(f'{fs.root_path}/test.xlsx')
+
+    client = ConnectClient(
+        use_specs=False,
+        api_key='ApiKey SU:123',
+        endpoint='https://localhost/public/v1',
+    )
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-276-377-545/parameters',
+        json=mocked_ordering_params_response,
+    )
+    mocked_responses.add(
+        method='PUT',
+        url='https://localhost/public/v1/products/PRD-276-377-545/parameters/PRM-276-377-545-0008',
+        json=mocked_ordering_params_response[0],
+    )
+
+    for _ in range(2):
+        stats = SynchronizerStats()
+        synchronizer = ParamsSynchronizer(client=client, progress=mocker.MagicMock(), stats=stats)
+        synchronizer.open(f'{fs.root_path}/test.xlsx', 'Ordering Parameters')
+        synchronizer.sync()
+
+    assert (
+        len(
+            [
+                call
+                for call in mocked_responses.calls
+                if call.request.method == 'GET' and '/parameters' in call.request.url
+            ],
+        )
+        == 1
+    )
 
 
 def test_validate_create(
@@ -895,3 +948,174 @@ def test_validate_skip_create_but_update_if_differs_from_source(
         'skipped': 0,
         'errors': 0,
     }
+
+
+def test_process_constraints_dependency(
+    mocker,
+    fs,
+    get_sync_params_env,
+    mocked_responses,
+    mocked_ordering_params_response,
+):
+    get_sync_params_env.save(f'{fs.root_path}/test.xlsx')
+
+    stats = SynchronizerStats()
+    synchronizer = ParamsSynchronizer(
+        client=ConnectClient(
+            use_specs=False,
+            api_key='ApiKey SU:123',
+            endpoint='https://localhost/public/v1',
+        ),
+        progress=mocker.MagicMock(),
+        stats=stats,
+    )
+    mocked_responses.add(
+        method='PUT',
+        url='https://localhost/public/v1/products/PRD-276-377-545/parameters/PRM-276-377-545-0008',
+        json=mocked_ordering_params_response[0],
+    )
+
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Ordering Parameters')
+    synchronizer._id_mapping['other'] = 'PRM-276-377-545-0009'
+    synchronizer._param_deps['PRM-276-377-545-0008'] = (
+        2,
+        'name',
+        {'required': True},
+        {'parameter': {'name': 'other'}, 'values': ['a']},
+    )
+    synchronizer._process_constraints_dependency(synchronizer._wb['Ordering Parameters'])
+
+    assert json.loads(mocked_responses.calls[-1].request.body) == {
+        'constraints': {
+            'required': True,
+            'dependency': {
+                'parameter': {'name': 'other', 'id': 'PRM-276-377-545-0009'},
+                'values': ['a'],
+            },
+        },
+    }
+    assert stats['Ordering Parameters'].get_counts_as_dict()['updated'] == 1
+
+
+def test_process_constraints_dependency_not_in_sheet(
+    mocker,
+    fs,
+    get_sync_params_env,
+    mocked_responses,
+    mocked_ordering_params_response,
+):
+    get_sync_params_env.save(f'{fs.root_path}/test.xlsx')
+
+    stats = SynchronizerStats()
+    synchronizer = ParamsSynchronizer(
+        client=ConnectClient(
+            use_specs=False,
+            api_key='ApiKey SU:123',
+            endpoint='https://localhost/public/v1',
+        ),
+        progress=mocker.MagicMock(),
+        stats=stats,
+    )
+    other = mocked_ordering_params_response[1]
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-276-377-545/parameters',
+        json=mocked_ordering_params_response,
+    )
+    mocked_responses.add(
+        method='PUT',
+        url='https://localhost/public/v1/products/PRD-276-377-545/parameters/PRM-276-377-545-0008',
+        json=mocked_ordering_params_response[0],
+    )
+
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Ordering Parameters')
+    synchronizer._param_deps['PRM-276-377-545-0008'] = (
+        2,
+        'name',
+        {'required': True},
+        {'parameter': {'name': other['name']}, 'values': ['a']},
+    )
+    synchronizer._param_deps['PRM-276-377-545-0009'] = (
+        3,
+        'name',
+        {'required': True},
+        {'parameter': {'name': 'missing'}, 'values': ['a']},
+    )
+    synchronizer._process_constraints_dependency(synchronizer._wb['Ordering Parameters'])
+
+    dependency = json.loads(mocked_responses.calls[-1].request.body)['constraints']['dependency']
+    assert dependency['parameter'] == {'name': other['name'], 'id': other['id']}
+    assert stats['Ordering Parameters'].get_counts_as_dict()['updated'] == 1
+    assert stats['Ordering Parameters']._row_errors == {
+        3: ['Parameter name depends on missing, which was not found in the product.'],
+    }
+
+
+@pytest.mark.parametrize(
+    ('original_values', 'registered'),
+    ((['a'], False), (['b'], True)),
+)
+def test_record_unchanged_dependency(
+    mocker,
+    fs,
+    get_sync_params_env,
+    original_values,
+    registered,
+):
+    get_sync_params_env.save(f'{fs.root_path}/test.xlsx')
+
+    stats = SynchronizerStats()
+    synchronizer = ParamsSynchronizer(
+        client=ConnectClient(
+            use_specs=False,
+            api_key='ApiKey SU:123',
+            endpoint='https://localhost/public/v1',
+        ),
+        progress=mocker.MagicMock(),
+        stats=stats,
+    )
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Ordering Parameters')
+    dependency = {'parameter': {'id': 'PRM-1', 'name': 'other'}, 'values': ['a']}
+    original = {
+        'constraints': {
+            'dependency': {
+                'parameter': {'id': 'PRM-2', 'name': 'other'},
+                'values': original_values,
+            },
+        },
+    }
+
+    synchronizer._record_unchanged(
+        synchronizer._wb['Ordering Parameters'],
+        2,
+        mocker.MagicMock(id='name'),
+        'PRM-276-377-545-0008',
+        {'constraints': {'required': True}},
+        dependency,
+        original,
+    )
+
+    assert ('PRM-276-377-545-0008' in synchronizer._param_deps) is registered
+    assert synchronizer._id_mapping == {'name': 'PRM-276-377-545-0008'}
+    assert stats['Ordering Parameters'].get_counts_as_dict()['skipped'] == int(not registered)
+
+
+def test_params_index_listing_error(mocker):
+    def failing_params():
+        yield {'id': 'PRM-1', 'name': 'one'}
+        raise ClientError('Listing failed')
+
+    parameters = mocker.MagicMock()
+    parameters.all.side_effect = [
+        failing_params(),
+        [{'id': 'PRM-1', 'name': 'one'}, {'id': 'PRM-2', 'name': 'two'}],
+    ]
+    client = mocker.MagicMock()
+    client.products.__getitem__.return_value.parameters = parameters
+    index = _ParamsIndex(client, 'PRD-1')
+
+    with pytest.raises(ClientError):
+        index.get(name='one')
+
+    assert index.get(name='two') == {'id': 'PRM-2', 'name': 'two'}
+    assert index.get(param_id='PRM-1') == {'id': 'PRM-1', 'name': 'one'}
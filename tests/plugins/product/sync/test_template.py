@@ -671,3 +671,44 @@ def test_update_template_for_tier_scope_ignore_type(
         'skipped': 0,
         'errors': 0,
     }
+
+
+def test_plan_template(
+    mocker,
+    fs,
+    get_sync_templates_env,
+    mocked_templates_response,
+    mocked_responses,
+):
+    ws = get_sync_templates_env['Templates']
+    ws['C2'] = 'update'
+    for col in 'ABCDEFGH':
+        ws[f'{col}3'] = ws[f'{col}2'].value
+        ws[f'{col}4'] = ws[f'{col}2'].value
+    ws['F3'] = 'A new body'
+    ws['A4'] = None
+    ws['C4'] = 'create'
+    get_sync_templates_env.save(f'{fs.root_path}/test.xlsx')
+
+    stats = SynchronizerStats(operation='Plan')
+    synchronizer = TemplatesSynchronizer(
+        client=ConnectClient(
+            use_specs=False,
+            api_key='ApiKey SU:123',
+            endpoint='https://localhost/public/v1',
+        ),
+        progress=mocker.MagicMock(),
+        stats=stats,
+        plan=True,
+    )
+
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-276-377-545/templates?limit=100&offset=0',
+        json=[mocked_templates_response[0]],
+    )
+
+    synchronizer.open(f'{fs.root_path}/test.xlsx', 'Templates')
+    synchronizer.sync()
+
+    assert stats['Templates'].get_plan_counts_as_tuple() == (3, 1, 1, 0, 1, 0, 0)
@@ -1,4 +1,6 @@
+import json
 import os
+from datetime import datetime
 
 import pytest
 from click import ClickException
@@ -7,13 +9,14 @@ from openpyxl import load_workbook
 from responses import matchers
 
 from connect.cli.core.config import Config
-from connect.cli.plugins.product.clone import ProductCloner
+from connect.cli.plugins.product import clone
+from connect.cli.plugins.product.clone import CloneIdMap, ProductCloner
 from connect.cli.plugins.shared.sync_stats import SynchronizerStats
 
 
 def test_dump(mocker, config_mocker):
     mock = mocker.patch(
-        'connect.cli.plugins.product.clone.dump_product',
+        'connect.cli.plugins.product.clone.export_product_workbook',
     )
     config = Config()
     config.load('/tmp')
@@ -30,7 +33,15 @@ def test_dump(mocker, config_mocker):
 
     cloner.dump()
 
-    mock.assert_called_once()
+    mock.assert_called_once_with(
+        config.active.client,
+        'PRD-123',
+        None,
+        cloner.progress,
+        remote_media=cloner.media,
+        updated_since=None,
+    )
+    assert cloner.wb == mock.return_value
 
 
 def test_clean_wb(
@@ -51,30 +62,10 @@ def test_clean_wb(
         stats=stats,
     )
 
-    os.mkdir(
-        os.path.join(
-            cloner.fs.root_path,
-            'PRD-123',
-        ),
-    )
-    wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
-    wb.save(
-        os.path.join(
-            cloner.fs.root_path,
-            'PRD-123',
-            'PRD-123.xlsx',
-        ),
-    )
-    cloner.load_wb()
+    cloner.wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
     cloner.clean_wb()
 
-    cloned_wb = load_workbook(
-        os.path.join(
-            cloner.fs.root_path,
-            'PRD-123',
-            'PRD-123.xlsx',
-        ),
-    )
+    cloned_wb = cloner.wb
 
     for row in range(2, 11):
         assert cloned_wb['Capabilities'][f'B{row}'].value == 'update'
@@ -102,6 +93,62 @@ def test_clean_wb(
         assert cloned_wb['ES-AR (TRN-1079-0833-9891)'][f'C{row}'].value == 'update'
 
 
+def test_clean_wb_save_workbook(mocker, config_mocker, fs):
+    config = Config()
+    config.load('/tmp')
+
+    cloner = ProductCloner(
+        config=config,
+        source_account='VA-000',
+        destination_account='VA-000',
+        product_id='PRD-123',
+        progress=mocker.MagicMock(),
+        stats=SynchronizerStats(),
+        workbook_file=os.path.join(fs.root_path, 'clone.xlsx'),
+    )
+    cloner.wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
+    cloner.clean_wb()
+
+    saved_wb = load_workbook(os.path.join(fs.root_path, 'clone.xlsx'))
+    assert saved_wb['Items']['C2'].value == 'create'
+
+
+def test_for_destination(mocker, config_mocker):
+    config = Config()
+    config.load('/tmp')
+
+    source = ProductCloner(
+        config=config,
+        source_account='VA-000',
+        destination_account=None,
+        product_id='PRD-123',
+        progress=mocker.MagicMock(),
+        stats=None,
+        workers=2,
+    )
+    source.wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
+    save = mocker.spy(source.wb, 'save')
+
+    stats = SynchronizerStats()
+    first = source.for_destination('VA-001', stats, workbook_file='clone.xlsx')
+    second = source.for_destination('VA-002', SynchronizerStats(), workers=1)
+
+    save.assert_called_once()
+    assert first.destination_account == 'VA-001'
+    assert first.source_account == 'VA-000'
+    assert first.stats is stats
+    assert first.workbook_file == 'clone.xlsx'
+    assert first.workers == 2
+    assert second.workers == 1
+    assert first.media is source.media
+    assert second.media is source.media
+    assert first.wb is not second.wb
+    first.wb['General Information']['B5'].value = 'PRD-NEW'
+    assert second.wb['General Information']['B5'].value == (
+        source.wb['General Information']['B5'].value
+    )
+
+
 @freeze_time('2022-04-05 20:15:00')
 def test_create_product(
     mocker,
@@ -147,32 +194,11 @@ def test_create_product(
         json=mocked_product_response,
     )
 
-    os.mkdir(
-        os.path.join(
-            cloner.fs.root_path,
-            'PRD-123',
-        ),
-    )
-    wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
-    wb.save(
-        os.path.join(
-            cloner.fs.root_path,
-            'PRD-123',
-            'PRD-123.xlsx',
-        ),
-    )
-    cloner.load_wb()
+    cloner.wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
     cloner.create_product()
 
-    wb = load_workbook(
-        os.path.join(
-            cloner.fs.root_path,
-            'PRD-123',
-            'PRD-123.xlsx',
-        ),
-    )
-
-    assert wb['General Information']['B5'].value == 'PRD-276-377-545'
+    assert cloner.wb['General Information']['B5'].value == 'PRD-276-377-545'
+    assert not os.path.exists(cloner.input_file)
 
 
 def test_create_product_errordef(
@@ -208,21 +234,7 @@ def test_create_product_errordef(
         status=500,
     )
 
-    os.mkdir(
-        os.path.join(
-            cloner.fs.root_path,
-            'PRD-123',
-        ),
-    )
-    wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
-    wb.save(
-        os.path.join(
-            cloner.fs.root_path,
-            'PRD-123',
-            'PRD-123.xlsx',
-        ),
-    )
-    cloner.load_wb()
+    cloner.wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
     with pytest.raises(ClickException) as e:
         cloner.create_product()
 
@@ -236,7 +248,7 @@ def test_inject(
     mocker,
 ):
     config = Config()
-    config.load('/tmp')
+    config.load(fs.root_path)
     config.add_account('VA-000', 'Account 0', 'Api 0', 'https://localhost/public/v1')
 
     stats = SynchronizerStats()
@@ -247,22 +259,10 @@ def test_inject(
         product_id='PRD-123',
         progress=mocker.MagicMock(),
         stats=stats,
+        workers=16,
     )
 
-    os.mkdir(
-        os.path.join(
-            cloner.fs.root_path,
-            'PRD-123',
-        ),
-    )
-    wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
-    wb.save(
-        os.path.join(
-            cloner.fs.root_path,
-            'PRD-123',
-            'PRD-123.xlsx',
-        ),
-    )
+    cloner.wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
 
     mocker.patch(
         'connect.cli.plugins.product.clone.GeneralSynchronizer',
@@ -276,7 +276,7 @@ def test_inject(
     mocker.patch(
         'connect.cli.plugins.product.clone.ParamsSynchronizer',
     )
-    mocker.patch(
+    actions = mocker.patch(
         'connect.cli.plugins.product.clone.ActionsSynchronizer',
     )
     mocker.patch(
@@ -310,8 +310,237 @@ def test_inject(
         method='DELETE',
         url='https://localhost/public/v1/products/PRD-276-377-545/templates/TMP-ID',
     )
+    run_dag = mocker.spy(clone, 'run_dag')
+    cloner.inject()
+
+    assert run_dag.call_args[0][1] == 8
+    actions.assert_called_once_with(mocker.ANY, cloner.progress, stats, 2)
+
+    assert list(stats.timings)[0] == 'General Information'
+    assert list(stats.timings)[-1] == 'Translations'
+    assert set(stats.timings) == {
+        'General Information',
+        'Items',
+        'Templates',
+        'Parameters',
+        'Actions',
+        'Media',
+        'Messages',
+        'Translations',
+    }
+
+
+def test_dump_incremental(mocker, config_mocker, fs):
+    mock = mocker.patch(
+        'connect.cli.plugins.product.clone.export_product_workbook',
+    )
+    config = Config()
+    config.load(fs.root_path)
+    CloneIdMap(
+        CloneIdMap.get_path(config, 'PRD-123', 'VA-000'),
+        'PRD-456',
+        '2022-04-05T20:15:00',
+    ).save()
+
+    cloner = ProductCloner(
+        config=config,
+        source_account='VA-000',
+        destination_account='VA-000',
+        product_id='PRD-123',
+        progress=mocker.MagicMock(),
+        stats=SynchronizerStats(),
+        incremental=True,
+    )
+    cloner.dump()
+
+    mock.assert_called_once_with(
+        config.active.client,
+        'PRD-123',
+        None,
+        cloner.progress,
+        remote_media=cloner.media,
+        updated_since='2022-04-05T20:15:00',
+    )
+
+
+def test_dump_incremental_not_cloned(mocker, config_mocker, fs):
+    config = Config()
+    config.load(fs.root_path)
+
+    cloner = ProductCloner(
+        config=config,
+        source_account='VA-000',
+        destination_account='VA-001',
+        product_id='PRD-123',
+        progress=mocker.MagicMock(),
+        stats=SynchronizerStats(),
+        incremental=True,
+    )
+    with pytest.raises(ClickException) as e:
+        cloner.dump()
+
+    assert str(e.value) == (
+        'No previous clone of PRD-123 to account VA-001 was found, '
+        'clone it without --incremental first.'
+    )
+
+
+def test_clone_saves_id_map(mocker, config_mocker, fs):
+    config = Config()
+    config.load(fs.root_path)
+    cloner = ProductCloner(
+        config=config,
+        source_account='VA-000',
+        destination_account='VA-001',
+        product_id='PRD-123',
+        progress=mocker.MagicMock(),
+        stats=SynchronizerStats(),
+    )
+    mocker.patch.object(cloner, '_get_stages', return_value={})
+    cloner.wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
+    cloner.destination_product = 'PRD-456'
+    cloner.clean_wb()
+    cloner.wb['Items']['A2'].value = 'PRD-456-0001'
+    cloner.wb['Actions']['A2'].value = 'ACT-456-001'
+
     cloner.inject()
 
+    with open(CloneIdMap.get_path(config, 'PRD-123', 'VA-001')) as f:
+        assert json.load(f) == {
+            'destination_product': 'PRD-456',
+            'updated_at': '2020-11-27T08:37:16',
+            'ids': {
+                'PRD-276-377-545-0001': 'PRD-456-0001',
+                'ACT-276-377-545-001': 'ACT-456-001',
+            },
+        }
+
+
+def test_clone_incremental(mocker, config_mocker, fs):
+    config = Config()
+    config.load(fs.root_path)
+    CloneIdMap(
+        CloneIdMap.get_path(config, 'PRD-123', 'VA-001'),
+        'PRD-456',
+        '2022-04-05T20:15:00',
+        {'PRD-276-377-545-0001': 'PRD-456-0001', 'PRD-276-377-545-0099': 'PRD-456-0099'},
+    ).save()
+    mocked_items = mocker.patch('connect.cli.plugins.product.clone.ItemSynchronizer')
+    mocker.patch('connect.cli.plugins.product.clone.TemplatesSynchronizer')
+    mocker.patch('connect.cli.plugins.product.clone.ParamsSynchronizer')
+    mocker.patch('connect.cli.plugins.product.clone.ActionsSynchronizer')
+    mocked_general = mocker.patch('connect.cli.plugins.product.clone.GeneralSynchronizer')
+    mocked_media = mocker.patch('connect.cli.plugins.product.clone.MediaSynchronizer')
+
+    stats = SynchronizerStats()
+    cloner = ProductCloner(
+        config=config,
+        source_account='VA-000',
+        destination_account='VA-001',
+        product_id='PRD-123',
+        progress=mocker.MagicMock(),
+        stats=stats,
+        incremental=True,
+    )
+    cloner.wb = load_workbook('./tests/fixtures/comparation_product.xlsx')
+    cloner.create_product()
+    cloner.clean_wb()
+
+    ws = cloner.wb['Items']
+    assert cloner.destination_product == 'PRD-456'
+    assert cloner.wb['General Information']['B5'].value == 'PRD-456'
+    assert (ws['A2'].value, ws['C2'].value) == ('PRD-456-0001', 'update')
+    assert (ws['A3'].value, ws['C3'].value) == ('', 'create')
+
+    ws['A3'].value = 'PRD-456-0002'
+    cloner.inject()
+
+    assert set(stats.timings) == {'Items', 'Templates', 'Parameters', 'Actions'}
+    mocked_items.return_value.sync.assert_called_once()
+    mocked_general.assert_not_called()
+    mocked_media.assert_not_called()
+    with open(CloneIdMap.get_path(config, 'PRD-123', 'VA-001')) as f:
+        id_map = json.load(f)
+    assert id_map['updated_at'] == '2022-04-05T20:15:00'
+    assert id_map['ids'] == {
+        'PRD-276-377-545-0001': 'PRD-456-0001',
+        'PRD-276-377-545-0002': 'PRD-456-0002',
+        'PRD-276-377-545-0099': 'PRD-456-0099',
+    }
+
+
+def test_clone_incremental_no_item_changes(
+    mocker,
+    config_mocker,
+    fs,
+    mocked_responses,
+    mocked_product_response,
+    mocked_categories_response,
+):
+    config = Config()
+    config.load(fs.root_path)
+    CloneIdMap(
+        CloneIdMap.get_path(config, 'PRD-276-377-545', 'VA-001'),
+        'PRD-456',
+        '2022-04-05T20:15:00',
+        {'PRD-276-377-545-0001': 'PRD-456-0001'},
+    ).save()
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-276-377-545',
+        json=mocked_product_response,
+    )
+    mocker.patch(
+        'connect.cli.plugins.product.export._fetch_product_data',
+        return_value={
+            'locales': [],
+            'categories': mocked_categories_response,
+            'primary_translation': None,
+            'attributes': {},
+            **{
+                collection: []
+                for collection in (
+                    'media',
+                    'templates',
+                    'items',
+                    'ordering',
+                    'fulfillment',
+                    'configuration',
+                    'actions',
+                    'configurations',
+                    'translations',
+                    'messages',
+                )
+            },
+        },
+    )
+    mocked_items = mocker.patch('connect.cli.plugins.product.clone.ItemSynchronizer')
+    mocker.patch('connect.cli.plugins.product.clone.TemplatesSynchronizer')
+    mocker.patch('connect.cli.plugins.product.clone.ParamsSynchronizer')
+    mocker.patch('connect.cli.plugins.product.clone.ActionsSynchronizer')
+
+    stats = SynchronizerStats()
+    cloner = ProductCloner(
+        config=config,
+        source_account='VA-000',
+        destination_account='VA-001',
+        product_id='PRD-276-377-545',
+        progress=mocker.MagicMock(),
+        stats=stats,
+        incremental=True,
+    )
+    cloner.dump()
+    cloner.create_product()
+    cloner.clean_wb()
+    cloner.inject()
+
+    assert cloner.wb['Items'].max_row == 1
+    mocked_items.return_value.sync.assert_called_once()
+    with open(CloneIdMap.get_path(config, 'PRD-276-377-545', 'VA-001')) as f:
+        id_map = json.load(f)
+    assert id_map['updated_at'] == '2022-04-05T20:15:00'
+    assert id_map['ids'] == {'PRD-276-377-545-0001': 'PRD-456-0001'}
+
 
 class FakeItemSynchronizer:
     @staticmethod
@@ -321,3 +550,14 @@ class FakeItemSynchronizer:
     @staticmethod
     def sync():
         pass
+
+
+def test_to_utc_designator(mocker):
+    # Parse like Python 3.10, which does not accept the Z designator.
+    mocked_datetime = mocker.patch('connect.cli.plugins.product.clone.datetime')
+    mocked_datetime.fromisoformat.side_effect = lambda value: datetime.fromisoformat(
+        value.replace('Z', '!'),
+    )
+
+    assert ProductCloner._to_utc('2022-04-05T20:15:00Z') == '2022-04-05T20:15:00'
+    assert ProductCloner._to_utc('2022-04-05T22:15:00+02:00') == '2022-04-05T20:15:00'
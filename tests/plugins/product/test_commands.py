@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 import re
@@ -6,13 +7,21 @@ import string
 import pytest
 from click import ClickException
 from click.testing import CliRunner
-from connect.client import ConnectClient
+from connect.client import ClientError, ConnectClient
 from openpyxl import load_workbook
 from responses import matchers
 
 from connect.cli.core.config import Config
-from connect.cli.plugins.product.export import _calculate_commitment, _dump_image, dump_product
+from connect.cli.plugins.product.constants import DEFAULT_WORKERS
+from connect.cli.plugins.product.export import (
+    RemoteMedia,
+    _calculate_commitment,
+    _dump_image,
+    _fetch_product_data,
+    dump_product,
+)
 from connect.cli.plugins.product.sync import GeneralSynchronizer
+from connect.cli.plugins.shared.constants import ROW_HASHES_SHEET
 
 
 def test_sync_general_sync(fs, ccli, mocked_responses, get_general_env):
@@ -89,6 +98,193 @@ def test_sync_general_sync_general_errors(fs, mocker, ccli):
     assert 'Error synchronizing general product information: error1\nerror2' in result.output
 
 
+def test_sync_checkpoint(fs, mocker, ccli):
+    config = Config()
+    config.load(fs.root_path)
+    config.add_account(
+        'VA-000',
+        'Account 1',
+        'ApiKey XXXX:YYYY',
+        endpoint='https://localhost/public/v1',
+    )
+    config.activate('VA-000')
+    config.store()
+
+    mocked_session = mocker.patch('connect.cli.plugins.product.commands.WorkbookSession')
+    mocker.patch.object(GeneralSynchronizer, 'open')
+    mocker.patch.object(GeneralSynchronizer, 'sync', return_value=['error1'])
+    runner = CliRunner()
+    result = runner.invoke(
+        ccli,
+        [
+            '-c',
+            fs.root_path,
+            '--yes',
+            'product',
+            'sync',
+            f'{fs.root_path}/test.xlsx',
+            '--checkpoint',
+            '3',
+        ],
+    )
+    assert result.exit_code != 0
+    mocked_session.assert_called_once_with(f'{fs.root_path}/test.xlsx', 3)
+    GeneralSynchronizer.open.assert_called_once_with(
+        mocked_session.return_value.__enter__.return_value,
+        'General Information',
+    )
+
+
+@pytest.mark.parametrize(
+    ('args', 'skip_unchanged'),
+    (([], True), (['--no-skip-unchanged'], False)),
+)
+def test_sync_workers(fs, mocker, ccli, args, skip_unchanged):
+    config = Config()
+    config.load(fs.root_path)
+    config.add_account(
+        'VA-000',
+        'Account 1',
+        'ApiKey XXXX:YYYY',
+        endpoint='https://localhost/public/v1',
+    )
+    config.activate('VA-000')
+    config.store()
+
+    mocker.patch('connect.cli.plugins.product.commands.WorkbookSession')
+    mocker.patch.object(GeneralSynchronizer, 'open')
+    mocker.patch.object(GeneralSynchronizer, 'sync', return_value=[])
+    mocker.patch('connect.cli.plugins.product.commands.sync_product_translations')
+    mocked_items = mocker.patch('connect.cli.plugins.product.commands.ItemSynchronizer')
+    mocked_capabilities = mocker.patch(
+        'connect.cli.plugins.product.commands.CapabilitiesSynchronizer',
+    )
+    for name in (
+        'StaticResourcesSynchronizer',
+        'TemplatesSynchronizer',
+        'ParamsSynchronizer',
+        'ActionsSynchronizer',
+        'MediaSynchronizer',
+        'ConfigurationValuesSynchronizer',
+        'MessageSynchronizer',
+    ):
+        mocker.patch(f'connect.cli.plugins.product.commands.{name}')
+    runner = CliRunner()
+    result = runner.invoke(
+        ccli,
+        [
+            '-c',
+            fs.root_path,
+            '--yes',
+            'product',
+            'sync',
+            f'{fs.root_path}/test.xlsx',
+            '--workers',
+            '8',
+            *args,
+        ],
+    )
+    assert result.exit_code == 0
+    assert mocked_items.call_args[0][3:] == (8, False, skip_unchanged)
+    assert len(mocked_capabilities.call_args[0]) == 3
+
+
+def test_sync_document_save_error(fs, mocker, ccli):
+    config = Config()
+    config.load(fs.root_path)
+    config.add_account(
+        'VA-000',
+        'Account 1',
+        'ApiKey XXXX:YYYY',
+        endpoint='https://localhost/public/v1',
+    )
+    config.activate('VA-000')
+    config.store()
+
+    mocker.patch('connect.cli.plugins.product.commands.WorkbookSession')
+    mocker.patch.object(GeneralSynchronizer, 'open')
+    mocker.patch.object(GeneralSynchronizer, 'sync', return_value=[])
+    mocker.patch('connect.cli.plugins.product.commands.sync_product_translations')
+    mocked_document = mocker.patch('connect.cli.plugins.product.commands.ProductDocument')
+    mocked_document.return_value.save.side_effect = ClientError('Product update failed')
+    mocked_items = mocker.patch('connect.cli.plugins.product.commands.ItemSynchronizer')
+    for name in (
+        'CapabilitiesSynchronizer',
+        'StaticResourcesSynchronizer',
+        'TemplatesSynchronizer',
+        'ParamsSynchronizer',
+        'ActionsSynchronizer',
+        'MediaSynchronizer',
+        'ConfigurationValuesSynchronizer',
+        'MessageSynchronizer',
+    ):
+        mocker.patch(f'connect.cli.plugins.product.commands.{name}')
+    runner = CliRunner()
+    result = runner.invoke(
+        ccli,
+        ['-c', fs.root_path, '--yes', 'product', 'sync', f'{fs.root_path}/test.xlsx'],
+    )
+    assert result.exit_code == 0
+    mocked_items.return_value.sync.assert_called_once()
+    assert 'Error while updating general product information' in result.output
+
+
+def test_sync_plan(fs, mocker, ccli):
+    config = Config()
+    config.load(fs.root_path)
+    config.add_account(
+        'VA-000',
+        'Account 1',
+        'ApiKey XXXX:YYYY',
+        endpoint='https://localhost/public/v1',
+    )
+    config.activate('VA-000')
+    config.store()
+
+    mocker.patch('connect.cli.plugins.product.commands.WorkbookSession')
+    mocker.patch.object(GeneralSynchronizer, 'open', return_value='PRD-000')
+    mocker.patch.object(GeneralSynchronizer, 'sync')
+    mocked_translations = mocker.patch(
+        'connect.cli.plugins.product.commands.sync_product_translations',
+    )
+    mocked_stats = mocker.patch('connect.cli.plugins.product.commands.SynchronizerStats')
+    mocked_items = mocker.patch('connect.cli.plugins.product.commands.ItemSynchronizer')
+    mocked_capabilities = mocker.patch(
+        'connect.cli.plugins.product.commands.CapabilitiesSynchronizer',
+    )
+    for name in (
+        'StaticResourcesSynchronizer',
+        'TemplatesSynchronizer',
+        'ParamsSynchronizer',
+        'ActionsSynchronizer',
+        'MediaSynchronizer',
+        'ConfigurationValuesSynchronizer',
+        'MessageSynchronizer',
+    ):
+        mocker.patch(f'connect.cli.plugins.product.commands.{name}')
+    runner = CliRunner()
+    result = runner.invoke(
+        ccli,
+        [
+            '-c',
+            fs.root_path,
+            'product',
+            'sync',
+            f'{fs.root_path}/test.xlsx',
+            '--plan',
+        ],
+    )
+    assert result.exit_code == 0
+    mocked_stats.assert_called_once_with(
+        operation='Plan',
+        header='Plan of synchronizing PRD-000',
+    )
+    assert mocked_items.call_args[0][4:] == (True, True)
+    GeneralSynchronizer.sync.assert_not_called()
+    mocked_capabilities.assert_not_called()
+    mocked_translations.assert_not_called()
+
+
 def test_list_products(mocker, fs, mocked_responses, ccli):
     base_url = 'https://localhost/public/v1/products'
     with open('./tests/fixtures/product_response.json') as prod_response:
@@ -186,6 +382,8 @@ def test_export(config_mocker, mocker, ccli):
     mock.assert_called_once()
     assert mock.mock_calls[0][1][1] == 'PRD-000'
     assert mock.mock_calls[0][1][2] is None
+    assert mock.mock_calls[0][1][5] == DEFAULT_WORKERS
+    assert mock.mock_calls[0][1][6] is False
     assert result.exit_code == 0
     assert 'The product PRD-000 has been successfully exported to PRD-000.xlsx.\n' in result.output
 
@@ -217,6 +415,47 @@ def test_export_custom_file(config_mocker, mocker, ccli):
     )
 
 
+def test_export_workers(config_mocker, mocker, ccli):
+    mock = mocker.patch(
+        'connect.cli.plugins.product.commands.dump_product',
+        side_effect=lambda *args: 'PRD-000.xlsx',
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(
+        ccli,
+        [
+            'product',
+            'export',
+            'PRD-000',
+            '--workers',
+            '8',
+        ],
+    )
+    assert result.exit_code == 0
+    assert mock.mock_calls[0][1][5] == 8
+
+
+def test_export_write_only(config_mocker, mocker, ccli):
+    mock = mocker.patch(
+        'connect.cli.plugins.product.commands.dump_product',
+        side_effect=lambda *args: 'PRD-000.xlsx',
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(
+        ccli,
+        [
+            'product',
+            'export',
+            'PRD-000',
+            '--write-only',
+        ],
+    )
+    assert result.exit_code == 0
+    assert mock.mock_calls[0][1][6] is True
+
+
 def test_export_product_not_exists(mocker, fs, mocked_responses):
     mocked_responses.add(
         method='GET',
@@ -239,7 +478,9 @@ def test_export_product_not_exists(mocker, fs, mocked_responses):
     assert str(e.value) == '404 - Not Found: Product PRD-0000 not found.'
 
 
+@pytest.mark.parametrize('write_only', (False, True))
 def test_export_product(
+    write_only,
     mocker,
     fs,
     mocked_responses,
@@ -385,19 +626,6 @@ def test_export_product(
         ],
         json=mocked_product_translations_response[0:1],
     )
-    mocked_responses.add(
-        method='GET',
-        url='https://localhost/public/v1/localization/translations',
-        match=[
-            matchers.query_string_matcher(
-                'eq(context.instance_id,PRD-276-377-545)&limit=0&offset=0',
-            ),
-        ],
-        json=mocked_product_translations_response,
-        headers={
-            'Content-Range': 'items 0-1/1',
-        },
-    )
     mocked_responses.add(
         method='GET',
         url='https://localhost/public/v1/localization/translations',
@@ -441,12 +669,19 @@ def test_export_product(
         output_file='output.xlsx',
         output_path=fs.root_path,
         progress=mocker.MagicMock(),
+        write_only=write_only,
     )
 
     product_wb = load_workbook(output_file)
     for name in sample_product_workbook.sheetnames:
         assert name in product_wb.sheetnames
 
+    hashes_ws = product_wb[ROW_HASHES_SHEET]
+    assert hashes_ws.sheet_state == 'hidden'
+    hashed_sheets = [sheet for sheet, _ in hashes_ws.iter_rows(min_row=2, values_only=True)]
+    assert hashed_sheets.count('Items') == len(mocked_items_response)
+    assert hashed_sheets.count('Templates') == len(mocked_templates_response)
+
     ignore_sheet_cells = {
         'General Information': ['B7'],
     }
@@ -467,15 +702,131 @@ def test_export_product(
 def test_dump_image(mocker):
     mocked_image_request = mocker.MagicMock()
     mocked_image_request.status_code = 404
-    mocker.patch(
-        'connect.cli.plugins.product.export.requests.get',
-        return_value=mocked_image_request,
-    )
+    mocked_session = mocker.patch('connect.cli.plugins.product.export.get_session')
+    mocked_session.return_value.get.return_value = mocked_image_request
     with pytest.raises(ClickException) as err:
         _dump_image('path', None, None)
     assert str(err.value) == 'Error obtaining image from path'
 
 
+def test_remote_media(mocker):
+    responses = {
+        'https://a/image.png': [b'ima', b'ge'],
+        'https://b/image.png': [b'image'],
+    }
+
+    def get(location, stream):
+        response = mocker.MagicMock(status_code=200)
+        response.iter_content.return_value = iter(responses[location])
+        return response
+
+    mocked_session = mocker.patch('connect.cli.plugins.product.export.get_session')
+    mocked_session.return_value.get.side_effect = get
+    media = RemoteMedia()
+    media.add('image.png', 'https://a/image.png')
+    media.add('icon.png', 'https://a/image.png')
+    media.add('copy.png', 'https://b/image.png')
+
+    assert media.exists('image.png') is True
+    assert media.exists('missing.png') is False
+    assert media.open('image.png').read() == b'image'
+    assert media.open('icon.png').read() == b'image'
+    assert media.open('copy.png').read() == b'image'
+    assert mocked_session.return_value.get.call_count == 2
+    assert len(media._contents) == 1
+
+
+def test_remote_media_same_content(mocker):
+    def get(location, stream):
+        response = mocker.MagicMock(status_code=200)
+        response.iter_content.return_value = iter([b'image'])
+        return response
+
+    mocked_session = mocker.patch('connect.cli.plugins.product.export.get_session')
+    mocked_session.return_value.get.side_effect = get
+    sha256 = mocker.spy(hashlib, 'sha256')
+    media = RemoteMedia()
+    media.add('image.png', 'https://a/image.png')
+    media.add('icon.png', 'https://a/image.png')
+
+    assert media.open('image.png').read() == b'image'
+    assert media.open('icon.png').read() == b'image'
+    mocked_session.return_value.get.assert_called_once_with('https://a/image.png', stream=True)
+    sha256.assert_called_once()
+    assert len(media._contents) == 1
+
+
+def test_remote_media_large_content(mocker):
+    responses = {
+        'https://a/image.png': [b'ima', b'ge'],
+        'https://b/image.png': [b'image'],
+        'https://c/icon.png': [b'icon'],
+    }
+
+    def get(location, stream):
+        response = mocker.MagicMock(status_code=200)
+        response.iter_content.return_value = iter(responses[location])
+        return response
+
+    mocker.patch.object(RemoteMedia, 'MEMORY_SIZE', 4)
+    mocked_session = mocker.patch('connect.cli.plugins.product.export.get_session')
+    mocked_session.return_value.get.side_effect = get
+    media = RemoteMedia()
+    media.add('image.png', 'https://a/image.png')
+    media.add('copy.png', 'https://b/image.png')
+    media.add('icon.png', 'https://c/icon.png')
+
+    with media.open('image.png') as f:
+        assert f.read() == b'image'
+    with media.open('copy.png') as f:
+        assert f.read() == b'image'
+    assert media.open('icon.png').read() == b'icon'
+    path = media._contents[hashlib.sha256(b'image').hexdigest()]
+    assert os.listdir(media._tmp_dir.name) == [os.path.basename(path)]
+
+
+def test_remote_media_error(mocker):
+    mocked_session = mocker.patch('connect.cli.plugins.product.export.get_session')
+    mocked_session.return_value.get.return_value.status_code = 404
+    media = RemoteMedia()
+    media.add('image.png', 'path')
+    with pytest.raises(ClickException) as err:
+        media.open('image.png')
+    assert str(err.value) == 'Error obtaining image from path'
+
+
+def test_fetch_product_data_updated_since(mocker):
+    client = mocker.MagicMock()
+    product_rs = client.products['PRD-000']
+    product_rs.items.filter.return_value = [{'id': 'PRD-000-0001'}]
+    product = {'id': 'PRD-000', 'icon': '/icon.png', 'name': 'Product'}
+
+    data = _fetch_product_data(
+        client,
+        product,
+        'https://localhost',
+        None,
+        None,
+        1,
+        RemoteMedia(),
+        updated_since='2022-04-05T20:15:00',
+    )
+
+    changed = (
+        'or(ge(events.updated.at,2022-04-05T20:15:00),' 'ge(events.created.at,2022-04-05T20:15:00))'
+    )
+    assert data['items'] == [{'id': 'PRD-000-0001'}]
+    assert str(product_rs.items.filter.call_args.args[0]) == changed
+    assert [str(call.args[0]) for call in product_rs.parameters.filter.call_args_list] == [
+        f'and(eq(phase,{phase}),{changed})'
+        for phase in ('ordering', 'fulfillment', 'configuration')
+    ]
+    for collection in ('media', 'configurations', 'translations', 'messages'):
+        assert data[collection] == []
+    product_rs.media.all.assert_not_called()
+    product_rs.messages.all.assert_not_called()
+
+
 def test_calculate_commitment_with_none():
     assert _calculate_commitment({'period': None}) == '-'
     assert _calculate_commitment({'period': 'x', 'commitment': None}) == '-'
@@ -574,9 +925,11 @@ def test_clone(fs, ccli, mocker, mocked_responses):
         product_id='PRD-000',
         progress=mocker.ANY,
         stats=mocker.ANY,
+        workbook_file=None,
+        workers=DEFAULT_WORKERS,
+        incremental=False,
     )
     synchronizer.dump.assert_called_once()
-    synchronizer.load_wb.assert_called_once()
     synchronizer.create_product.assert_called_once_with(name=None)
     synchronizer.clean_wb.assert_called_once()
     synchronizer.inject.assert_called_once()
@@ -631,14 +984,120 @@ def test_clone_different_dest_account(fs, ccli, mocker, mocked_responses):
         product_id='PRD-000',
         progress=mocker.ANY,
         stats=mocker.ANY,
+        workbook_file=None,
+        workers=DEFAULT_WORKERS,
+        incremental=False,
     )
     synchronizer.dump.assert_called_once()
-    synchronizer.load_wb.assert_called_once()
     synchronizer.create_product.assert_called_once_with(name=None)
     synchronizer.clean_wb.assert_called_once()
     synchronizer.inject.assert_called_once()
 
 
+@pytest.mark.parametrize(
+    'error',
+    (ClickException('Error while cloning'), KeyError('PRM-000')),
+)
+def test_clone_multiple_dest_accounts(fs, ccli, mocker, mocked_responses, error):
+    mocker.patch('connect.cli.plugins.product.commands.console.confirm')
+    source = mocker.MagicMock()
+    mocked_cloner = mocker.patch(
+        'connect.cli.plugins.product.commands.ProductCloner',
+        return_value=source,
+    )
+    destinations = {}
+
+    def for_destination(account, stats, workbook_file=None, incremental=False, workers=None):
+        destinations[account] = mocker.MagicMock(
+            stats=stats,
+            workbook_file=workbook_file,
+            workers=workers,
+            destination_product=f'PRD-{account}',
+        )
+        if account == 'VA-002':
+            destinations[account].inject.side_effect = error
+        return destinations[account]
+
+    source.for_destination.side_effect = for_destination
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-000',
+    )
+    config = Config()
+    config.load(fs.root_path)
+    for account in ('VA-000', 'VA-001', 'VA-002'):
+        config.add_account(
+            account,
+            f'Account {account}',
+            'ApiKey XXXX:YYYY',
+            endpoint='https://localhost/public/v1',
+        )
+    config.activate('VA-000')
+    config.store()
+    runner = CliRunner()
+    result = runner.invoke(
+        ccli,
+        [
+            '-c',
+            fs.root_path,
+            'product',
+            'clone',
+            '-d',
+            'VA-001',
+            '-d',
+            'VA-002',
+            '-d',
+            'VA-001',
+            '--save-workbook',
+            'clone.xlsx',
+            'PRD-000',
+        ],
+    )
+    assert result.exit_code == 0
+    mocked_cloner.assert_called_once_with(
+        config=mocker.ANY,
+        source_account='VA-000',
+        destination_account=None,
+        product_id='PRD-000',
+        progress=mocker.ANY,
+        stats=None,
+        workers=DEFAULT_WORKERS,
+    )
+    source.dump.assert_called_once_with(updated_since=None)
+    assert set(destinations) == {'VA-001', 'VA-002'}
+    assert destinations['VA-001'].workbook_file == 'clone_VA-001.xlsx'
+    for cloner in destinations.values():
+        assert cloner.workers == max(1, DEFAULT_WORKERS // 2)
+        cloner.create_product.assert_called_once_with(name=None)
+        cloner.clean_wb.assert_called_once()
+        cloner.inject.assert_called_once()
+    assert destinations['VA-002'].stats.get_error_count() == 1
+    assert destinations['VA-001'].stats.get_error_count() == 0
+    assert 'New product id PRD-VA-001 on account VA-001' in result.output
+    assert 'New product id PRD-VA-002 on account VA-002' in result.output
+
+
+def test_clone_multiple_dest_accounts_not_exists(fs, ccli):
+    config = Config()
+    config.load(fs.root_path)
+    config.add_account(
+        'VA-000',
+        'Account 1',
+        'ApiKey XXXX:YYYY',
+        endpoint='https://localhost/public/v1',
+    )
+    config.activate('VA-000')
+    config.store()
+    runner = CliRunner()
+    result = runner.invoke(
+        ccli,
+        ['-c', fs.root_path, 'product', 'clone', '-d', 'VA-000', '-d', 'VA-001', 'PRD-000'],
+    )
+
+    assert result.exit_code != 0
+    assert 'The destination account VA-001 does not exist.' in result.output
+
+
 def test_clone_only_vendor(fs, ccli):
     config = Config()
     config.load(fs.root_path)
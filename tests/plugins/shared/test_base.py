@@ -1,4 +1,8 @@
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from shutil import copy2
 
 import pytest
@@ -6,7 +10,7 @@ from click import ClickException
 from connect.client import ConnectClient
 from openpyxl import load_workbook
 
-from connect.cli.plugins.shared.base import ProductSynchronizer
+from connect.cli.plugins.shared.base import ProductSynchronizer, WorkbookSession
 from connect.cli.plugins.shared.exceptions import SheetNotFoundError
 
 
@@ -182,3 +186,161 @@ def test_save(fs, mocked_responses, mocked_product_response):
     synchronizer.save(f'{fs.root_path}//test.xlsx')
 
     assert os.path.isfile(f'{fs.root_path}/test.xlsx')
+
+
+def test_save_session(fs, mocker, mocked_responses, mocked_product_response):
+    copy2('./tests/fixtures/comparation_product.xlsx', f'{fs.root_path}/test.xlsx')
+    mocked_responses.add(
+        method='GET',
+        url='https://localhost/public/v1/products/PRD-276-377-545',
+        json=mocked_product_response,
+    )
+    client = ConnectClient(
+        use_specs=False,
+        api_key='ApiKey SU:123',
+        endpoint='https://localhost/public/v1',
+    )
+    mocked_load = mocker.patch(
+        'connect.cli.plugins.shared.base.load_workbook',
+        wraps=load_workbook,
+    )
+
+    with WorkbookSession(f'{fs.root_path}/test.xlsx') as session:
+        mocked_save = mocker.patch.object(session.workbook, 'save')
+        for worksheet in ('Items', 'Media'):
+            synchronizer = ProductSynchronizer(client=client, progress=None)
+            synchronizer.open(session, worksheet)
+            synchronizer.save(session)
+        mocked_save.assert_not_called()
+
+    mocked_load.assert_called_once()
+    assert len(mocked_responses.calls) == 1
+    mocked_save.assert_called_once_with(f'{fs.root_path}/test.xlsx')
+
+
+def test_session_checkpoint(mocker):
+    session = WorkbookSession('test.xlsx', checkpoint=2)
+    mocked_wb = mocker.patch.object(session, '_wb')
+
+    session.save()
+    mocked_wb.save.assert_not_called()
+    session.save()
+    mocked_wb.save.assert_called_once_with('test.xlsx')
+    session.close()
+    mocked_wb.save.assert_called_once_with('test.xlsx')
+
+
+def test_session_not_modified(mocker):
+    mocked_load = mocker.patch('connect.cli.plugins.shared.base.load_workbook')
+
+    with WorkbookSession('test.xlsx'):
+        pass
+
+    mocked_load.assert_not_called()
+
+
+def test_session_in_memory(mocker):
+    mocked_load = mocker.patch('connect.cli.plugins.shared.base.load_workbook')
+    wb = mocker.MagicMock()
+
+    with WorkbookSession('test.xlsx', workbook=wb) as session:
+        assert session.workbook == wb
+        session.save()
+
+    mocked_load.assert_not_called()
+    wb.save.assert_not_called()
+
+
+def test_session_run_applies_writes_on_calling_thread(mocker):
+    session = WorkbookSession('test.xlsx', workbook=mocker.MagicMock())
+    writers = []
+
+    def write(idx):
+        writers.append((idx, threading.get_ident()))
+        return idx
+
+    def stage():
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            return sorted(executor.map(lambda idx: session.apply(partial(write, idx)), range(8)))
+
+    assert session.run(stage) == list(range(8))
+    assert {thread for _, thread in writers} == {threading.get_ident()}
+    assert session.apply(partial(write, 8)) == 8
+
+
+def test_session_run_error(mocker):
+    session = WorkbookSession('test.xlsx', workbook=mocker.MagicMock())
+
+    def fail():
+        raise ClickException('failed')
+
+    with pytest.raises(ClickException) as e:
+        session.run(lambda: session.apply(fail))
+
+    assert str(e.value) == 'failed'
+
+
+@pytest.mark.parametrize('workers', (1, 4))
+def test_execute_rows(mocker, workers):
+    synchronizer = ProductSynchronizer(client=None, progress=mocker.MagicMock(), workers=workers)
+    started = []
+    recorded = []
+    lock = threading.Lock()
+
+    def operation(key, idx):
+        def run():
+            with lock:
+                started.append((key, idx))
+            time.sleep(0.01 * (3 - idx))
+            return partial(recorded.append, (key, idx))
+
+        return run
+
+    rows = [
+        ('a', operation('a', 0)),
+        ('b', operation('b', 1)),
+        ('a', operation('a', 2)),
+        (None, operation(None, 3)),
+    ]
+    synchronizer._execute_rows('task', rows)
+
+    assert recorded == [('a', 0), ('b', 1), ('a', 2), (None, 3)]
+    assert started.index(('a', 0)) < started.index(('a', 2))
+    assert synchronizer._progress.update.call_count == 4
+
+
+def test_execute_rows_error(mocker):
+    synchronizer = ProductSynchronizer(client=None, progress=mocker.MagicMock(), workers=2)
+    recorded = []
+
+    def fail():
+        raise ValueError('boom')
+
+    rows = [
+        ('a', lambda: partial(recorded.append, 'a')),
+        ('b', fail),
+        ('c', lambda: partial(recorded.append, 'c')),
+    ]
+    with pytest.raises(ValueError):
+        synchronizer._execute_rows('task', rows)
+
+    assert recorded == ['a']
+
+
+@pytest.mark.parametrize(
+    ('payload', 'unchanged'),
+    (
+        ({'name': 'Item', 'unit': {'id': 'unit'}}, True),
+        ({'name': 'Item', 'unit': {'id': 'other'}}, False),
+        ({'name': 'Item', 'ui': {'visibility': True}}, False),
+        ({'name': 'Other'}, False),
+    ),
+)
+def test_is_unchanged(payload, unchanged):
+    original = {
+        'id': 'PRD-000-000-000-0001',
+        'name': 'Item',
+        'unit': {'id': 'unit', 'name': 'Unit'},
+    }
+
+    assert ProductSynchronizer._is_unchanged(original, payload) is unchanged
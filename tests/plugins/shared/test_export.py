@@ -0,0 +1,69 @@
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Alignment, Font
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from connect.cli.plugins.shared.export import StreamingWorksheet, stream_worksheet
+
+
+def test_streaming_worksheet(tmp_path):
+    wb = Workbook(write_only=True)
+    ws = StreamingWorksheet(wb.create_sheet('Items'))
+    for cell in ws['A1':'C1'][0]:
+        ws.column_dimensions[cell.column_letter].width = 25
+        cell.value = f'Header {cell.column_letter}'
+    validation = DataValidation(type='list', formula1='"-,create"', allow_blank=False)
+    ws.add_data_validation(validation)
+    ws.cell(2, 1, value='ITM-1').alignment = Alignment(wrap_text=True)
+    ws.cell(2, 3, value=10)
+    ws['B4'].value = 'last'
+    validation.add('A2:A4')
+    wb.save(tmp_path / 'out.xlsx')
+
+    saved = load_workbook(tmp_path / 'out.xlsx')['Items']
+    assert [[c.value for c in row] for row in saved.iter_rows()] == [
+        ['Header A', 'Header B', 'Header C'],
+        ['ITM-1', None, 10],
+        [None, None, None],
+        [None, 'last', None],
+    ]
+    assert saved['A2'].alignment.wrap_text is True
+    assert saved.column_dimensions['B'].width == 25
+    assert str(saved.data_validations.dataValidation[0].sqref) == 'A2:A4'
+    assert ws.max_row == 4
+
+
+def test_streaming_worksheet_row_already_written():
+    wb = Workbook(write_only=True)
+    ws = StreamingWorksheet(wb.create_sheet('Items'))
+    ws.cell(1, 1, value='header')
+    ws.cell(2, 1, value='row')
+
+    with pytest.raises(ValueError) as e:
+        ws.cell(1, 2, value='late')
+
+    assert str(e.value) == 'Row 1 of Items has already been written.'
+
+
+def test_stream_worksheet(tmp_path):
+    src = Workbook().active
+    src.title = 'General Information'
+    src.column_dimensions['A'].width = 50
+    src.merge_cells('A1:B1')
+    src['A1'].value = 'Product information'
+    src['A1'].font = Font(sz=24)
+    src['A3'].value = 'Product ID'
+    validation = DataValidation(type='list', formula1='"a,b"', allow_blank=False)
+    src.add_data_validation(validation)
+    validation.add('B3')
+    wb = Workbook(write_only=True)
+    stream_worksheet(src, wb.create_sheet('General Information'))
+    wb.save(tmp_path / 'out.xlsx')
+
+    saved = load_workbook(tmp_path / 'out.xlsx')['General Information']
+    assert saved['A1'].value == 'Product information'
+    assert saved['A1'].font.sz == 24
+    assert saved['A3'].value == 'Product ID'
+    assert saved.column_dimensions['A'].width == 50
+    assert [str(r) for r in saved.merged_cells.ranges] == ['A1:B1']
+    assert str(saved.data_validations.dataValidation[0].sqref) == 'B3'
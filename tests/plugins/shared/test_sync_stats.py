@@ -1,4 +1,8 @@
-from connect.cli.plugins.shared.sync_stats import SynchronizerStats, SynchronizerStatsSingleModule
+from connect.cli.plugins.shared.sync_stats import (
+    CombinedSynchronizerStats,
+    SynchronizerStats,
+    SynchronizerStatsSingleModule,
+)
 
 
 def test_synchronizer_stats_module_get_counts():
@@ -91,6 +95,49 @@ def test_synchronizer_stats_print_no_errors(capsys, mocker):
     assert captured.out == ''
 
 
+def test_synchronizer_stats_print_plan(mocker):
+    mocked_table = mocker.patch(
+        'connect.cli.plugins.shared.sync_stats.console.table',
+    )
+    mocked_header = mocker.patch(
+        'connect.cli.plugins.shared.sync_stats.console.header',
+    )
+
+    stats = SynchronizerStats(operation='Plan', header='Plan of synchronization')
+    stats['module 1'].updated()
+    stats['module 1'].created()
+    stats['module 1'].unchanged(3)
+    stats['module 1'].skipped()
+    stats.print()
+
+    mocked_header.assert_called_once_with('Plan of synchronization')
+    mocked_table.assert_called_once_with(
+        columns=SynchronizerStats.PLAN_COLUMNS,
+        rows=[('module 1', 6, 1, 1, 0, 3, 1, 0)],
+        expand=True,
+    )
+    assert stats['module 1'].get_counts_as_dict()['skipped'] == 4
+
+
+def test_synchronizer_stats_print_timings(mocker):
+    mocked_table = mocker.patch(
+        'connect.cli.plugins.shared.sync_stats.console.table',
+    )
+    mocker.patch('connect.cli.plugins.shared.sync_stats.console.header')
+
+    stats = SynchronizerStats(operation='Clone')
+    stats['module 1'].created()
+    stats.timings['Items'] = 1.234
+    stats.timings['Translations'] = 10
+    stats.print()
+
+    mocked_table.assert_called_with(
+        columns=SynchronizerStats.TIMINGS_COLUMNS,
+        rows=[('Items', '1.23'), ('Translations', '10.00')],
+        expand=True,
+    )
+
+
 def test_synchronizer_stats_print_multi_errors(capsys, mocker):
     mocker.patch('builtins.input', lambda *args: 'y')
     mocked_table = mocker.patch(
@@ -244,3 +291,57 @@ Module module A:
 """
         in captured.out
     )
+
+
+def test_combined_synchronizer_stats_print(capsys, mocker):
+    mocker.patch('builtins.input', lambda *args: 'y')
+    mocked_table = mocker.patch(
+        'connect.cli.plugins.shared.sync_stats.console.table',
+    )
+    mocked_header = mocker.patch(
+        'connect.cli.plugins.shared.sync_stats.console.header',
+    )
+
+    stats = CombinedSynchronizerStats(
+        ['VA-000', 'VA-001'],
+        operation='Clone',
+        header='Results of cloning PRD-000',
+        target_column='Account',
+    )
+    stats['VA-000']['Items'].created(2)
+    stats['VA-000'].timings['Items'] = 1.234
+    stats['VA-001']['Items'].created()
+    stats['VA-001']['Items'].error('error message', 3)
+    stats.print()
+
+    mocked_header.assert_called_once_with('Results of cloning PRD-000')
+    assert mocked_table.call_args_list == [
+        mocker.call(
+            columns=('Account', *SynchronizerStats.COLUMNS),
+            rows=[
+                ('VA-000', 'Items', 2, 2, 0, 0, 0, 0),
+                ('VA-001', 'Items', 2, 1, 0, 0, 0, 1),
+            ],
+            expand=True,
+        ),
+        mocker.call(
+            columns=('Account', *SynchronizerStats.TIMINGS_COLUMNS),
+            rows=[('VA-000', 'Items', '1.23')],
+            expand=True,
+        ),
+    ]
+
+    captured = capsys.readouterr()
+
+    assert 'Clone operation had 1 errors, do you want to see them?' in captured.out
+    assert 'Account VA-000' not in captured.out
+    assert (
+        """Account VA-001:
+
+Module Items:
+
+  Errors at row #3
+    - error message
+"""
+        in captured.out
+    )
@@ -7,6 +7,9 @@ from connect.cli.plugins.shared.utils import (
     get_col_limit_by_ws_type,
     get_translation_attributes_sheets,
     get_ws_type_by_worksheet_name,
+    run_concurrently,
+    run_dag,
+    split_workers,
     wait_for_autotranslation,
 )
 
@@ -145,3 +148,98 @@ def test_update_wait_autotranslate_error(mocker, mocked_responses, mocked_transl
 )
 def test__calculate_translation_completion(translation, result):
     assert _calculate_translation_completion(translation) == result
+
+
+def test_run_concurrently(mocker):
+    progress = mocker.MagicMock()
+
+    results = run_concurrently(
+        {'a': lambda: 1, 'b': lambda: 2, ('c', 1): lambda: 3},
+        2,
+        progress,
+        'Running',
+    )
+
+    assert results == {'a': 1, 'b': 2, ('c', 1): 3}
+    progress.add_task.assert_called_once_with('Running', total=3)
+    assert progress.update.call_count == 3
+
+
+def test_run_concurrently_no_tasks():
+    assert run_concurrently({}, 2) == {}
+
+
+def test_run_concurrently_error():
+    def fail():
+        raise click.ClickException('failed')
+
+    with pytest.raises(click.ClickException) as e:
+        run_concurrently({'a': lambda: 1, 'b': fail}, 1)
+
+    assert str(e.value) == 'failed'
+
+
+@pytest.mark.parametrize(
+    ('workers', 'count', 'expected'),
+    (
+        (4, 2, (2, 2)),
+        (4, 8, (4, 1)),
+        (8, 3, (3, 2)),
+        (1, 5, (1, 1)),
+        (4, 0, (1, 4)),
+    ),
+)
+def test_split_workers(workers, count, expected):
+    assert split_workers(workers, count) == expected
+
+
+def test_run_dag(mocker):
+    progress = mocker.MagicMock()
+    finished = []
+
+    timings = run_dag(
+        {
+            'translations': (lambda: finished.append('translations'), ('items', 'params')),
+            'items': (lambda: finished.append('items'), ('general',)),
+            'params': (lambda: finished.append('params'), ('general',)),
+            'general': (lambda: finished.append('general'), ()),
+        },
+        2,
+        progress,
+        'Running',
+    )
+
+    assert finished[0] == 'general'
+    assert set(finished[1:3]) == {'items', 'params'}
+    assert finished[3] == 'translations'
+    assert list(timings)[0] == 'general'
+    assert set(list(timings)[1:3]) == {'items', 'params'}
+    assert list(timings)[3] == 'translations'
+    progress.add_task.assert_called_once_with('Running', total=4)
+    assert progress.update.call_count == 4
+
+
+def test_run_dag_error():
+    def fail():
+        raise click.ClickException('failed')
+
+    finished = []
+    with pytest.raises(click.ClickException) as e:
+        run_dag({'a': (fail, ()), 'b': (lambda: finished.append('b'), ('a',))}, 2)
+
+    assert str(e.value) == 'failed'
+    assert finished == []
+
+
+@pytest.mark.parametrize(
+    ('tasks', 'error'),
+    (
+        ({'a': (None, ('b',))}, 'Task a depends on unknown tasks: b.'),
+        ({'a': (None, ('b',)), 'b': (None, ('a',))}, 'Circular dependency between tasks: a, b.'),
+    ),
+)
+def test_run_dag_invalid(tasks, error):
+    with pytest.raises(ValueError) as e:
+        run_dag(tasks, 2)
+
+    assert str(e.value) == error
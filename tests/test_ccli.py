@@ -1,6 +1,24 @@
+import json
+import os
+import subprocess
+import sys
+
 import click
+import pytest
+
+from connect.cli.core.constants import CAIRO_NOT_FOUND_ERROR, DEFAULT_CONFIG_DIR
 
-from connect.cli.core.constants import CAIRO_NOT_FOUND_ERROR
+
+STARTUP_FORBIDDEN_MODULES = (
+    'openpyxl',
+    'jinja2',
+    'phonenumbers',
+    'iso3166',
+    'connect.reports',
+    'connect.eaas.core',
+    'connect.cli.plugins.product',
+    'connect.cli.plugins.customer',
+)
 
 
 # `main` is imported inside each test: test_play_commands deletes and reimports
@@ -8,6 +26,11 @@ from connect.cli.core.constants import CAIRO_NOT_FOUND_ERROR
 # object that mocker.patch (which resolves the live module) never touches.
 
 
+@pytest.fixture(autouse=True)
+def argv(mocker):
+    return mocker.patch.object(sys, 'argv', ['ccli'])
+
+
 def test_run_ok(mocker):
     from connect.cli.ccli import main
 
@@ -15,10 +38,21 @@ def test_run_ok(mocker):
     mock_load_plugins = mocker.patch('connect.cli.ccli.load_plugins')
 
     main()
-    mock_load_plugins.assert_called_once_with(mock_cli)
+    mock_load_plugins.assert_called_once_with(mock_cli, cache_dir=DEFAULT_CONFIG_DIR)
     mock_cli.assert_called_once_with(prog_name='ccli', standalone_mode=False)
 
 
+def test_run_config_dir(mocker, argv, tmp_path):
+    from connect.cli.ccli import main
+
+    argv.extend(['-c', str(tmp_path), 'account', 'list'])
+    mock_cli = mocker.patch('connect.cli.ccli.cli')
+    mock_load_plugins = mocker.patch('connect.cli.ccli.load_plugins')
+
+    main()
+    mock_load_plugins.assert_called_once_with(mock_cli, cache_dir=str(tmp_path))
+
+
 def test_run_click_exception(mocker):
     from connect.cli.ccli import main
 
@@ -26,7 +60,7 @@ def test_run_click_exception(mocker):
     mock_load_plugins = mocker.patch('connect.cli.ccli.load_plugins')
     mock_secho = mocker.patch('connect.cli.ccli.click.secho')
     main()
-    mock_load_plugins.assert_called_once_with(mock_cli)
+    mock_load_plugins.assert_called_once_with(mock_cli, cache_dir=DEFAULT_CONFIG_DIR)
     mock_cli.assert_called_once_with(prog_name='ccli', standalone_mode=False)
     mock_secho.assert_called_once_with('test exc', fg='red')
 
@@ -38,7 +72,7 @@ def test_run_abort_exception(mocker):
     mock_load_plugins = mocker.patch('connect.cli.ccli.load_plugins')
     mock_secho = mocker.patch('connect.cli.ccli.click.secho')
     main()
-    mock_load_plugins.assert_called_once_with(mock_cli)
+    mock_load_plugins.assert_called_once_with(mock_cli, cache_dir=DEFAULT_CONFIG_DIR)
     mock_cli.assert_called_once_with(prog_name='ccli', standalone_mode=False)
     mock_secho.assert_not_called()
 
@@ -69,3 +103,33 @@ def test_run_other_os_error(mocker):
 
     main()
     mock_secho.assert_called_once_with('other error', fg='red')
+
+
+@pytest.mark.parametrize(
+    'args',
+    (
+        ['--help'],
+        ['account', 'list'],
+    ),
+)
+def test_startup_import_budget(tmp_path, args):
+    script = (
+        'import json, sys\n'
+        'from connect.cli.ccli import main\n'
+        f'sys.argv = ["ccli", "-c", {str(tmp_path)!r}, *{args!r}]\n'
+        'main()\n'
+        f'json.dump(sorted(sys.modules), open({str(tmp_path / "modules.json")!r}, "w"))\n'
+    )
+    # The first run imports the plugins to cache their commands.
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, '-c', script],
+            check=True,
+            capture_output=True,
+            env={**os.environ, 'HOME': str(tmp_path)},
+        )
+
+    modules = json.load(open(tmp_path / 'modules.json'))
+
+    for heavy in STARTUP_FORBIDDEN_MODULES:
+        assert not any(m == heavy or m.startswith(f'{heavy}.') for m in modules), heavy